@@ -1,17 +1,42 @@
 import os
-from dotenv import load_dotenv
 from pathlib import Path
 
-# Get project root directory and load .env
+# Get project root directory
 BASE_DIR = Path(__file__).resolve().parent.parent
-load_dotenv(BASE_DIR / '.env')
 
-class Config:
-    # API Keys
-    OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
-    CLAUDE_API_KEY = os.getenv('CLAUDE_API_KEY')
-    THREE_COMMAS_API_KEY = os.getenv('THREE_COMMAS_API_KEY')
-    THREE_COMMAS_SECRET = os.getenv('THREE_COMMAS_SECRET')
+# Settings read from the environment (.env) on first access
+ENV_KEYS = (
+    'OPENAI_API_KEY',
+    'CLAUDE_API_KEY',
+    'THREE_COMMAS_API_KEY',
+    'THREE_COMMAS_SECRET'
+)
+
+_env_loaded = False
+
+def load_env():
+    """Load .env into the process environment (once)"""
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    env_path = BASE_DIR / '.env'
+    if env_path.exists():
+        from dotenv import load_dotenv
+        load_dotenv(env_path)
+
+class _EnvConfigMeta(type):
+    """Resolves API keys lazily so importing Config doesn't read .env"""
+
+    def __getattr__(cls, name):
+        if name in ENV_KEYS:
+            load_env()
+            return os.getenv(name)
+        raise AttributeError(f"type object 'Config' has no attribute {name!r}")
+
+class Config(metaclass=_EnvConfigMeta):
+    # API Keys (OPENAI_API_KEY, CLAUDE_API_KEY, THREE_COMMAS_API_KEY and
+    # THREE_COMMAS_SECRET) are resolved from the environment on access
 
     # Trading Parameters
     BASE_TRADE_AMOUNT = 5  # $5 base trade
@@ -23,24 +48,183 @@ class Config:
     
     # Time intervals
     UPDATE_INTERVAL = 300  # 5 minutes
+
+    # Pipeline (workers per stage and queue size between stages)
+    PIPELINE_WORKERS = {
+        'market_data': 4,
+        'analysis': 2,
+        'execution': 1,
+        'status': 1
+    }
+    PIPELINE_QUEUE_SIZE = 10
+
+    # Resilience (retries, circuit breakers and hedging for external calls)
+    RETRY_MAX_ATTEMPTS = 3
+    RETRY_BASE_DELAY = 0.5  # seconds, doubled per attempt before jitter
+    RETRY_MAX_DELAY = 10.0
+    BREAKER_FAILURE_THRESHOLD = 5  # consecutive failures before opening
+    BREAKER_RESET_TIMEOUT = 30.0  # seconds before a trial call is allowed
+    HEDGE_DELAY = 1.0  # seconds before a duplicate idempotent read is sent
+    BINANCE_TIMEOUT = 10.0
+    VENUE_TIMEOUT = 10.0  # other market data venues
+    AI_REQUEST_TIMEOUT = 30.0
+    THREE_COMMAS_TIMEOUT = 10
     
     # Risk Management
     STOP_LOSS_PERCENTAGE = 1.0  # 1%
     TAKE_PROFIT_PERCENTAGE = 1.5  # 1.5%
     MAX_SAFETY_ORDERS = 2
+    # Ladder check before applying new settings (simulated on recent hourly closes)
+    LADDER_MAX_CAPITAL = 50  # $ the full safety-order ladder may tie up
+    LADDER_MAX_STOP_OUT_RATE = 0.5  # share of simulated deals allowed to hit the stop loss
+    LADDER_CHECK_HORIZON = 48  # hours each simulated deal is followed
+    LADDER_CHECK_DAYS = 7  # history used for the simulation
+    # Portfolio allocation of order volumes across pairs
+    MIN_ORDER_VOLUME = 5  # $ smallest base order worth placing
+    PORTFOLIO_COV_HALFLIFE = 288  # cycles (1 day at a 5 minute UPDATE_INTERVAL)
+    PORTFOLIO_MIN_OBSERVATIONS = 12  # returns per pair before covariance replaces snapshot volatility
 
     # AI Configuration
     MIN_CONFIDENCE_THRESHOLD = 75  # Minimum confidence for trade execution
-    AI_AGREEMENT_REQUIRED = True   # Require both AIs to agree
+    # How model answers are combined: 'unanimous' (all must agree),
+    # 'majority' or 'weighted' (by provider weight * confidence)
+    LLM_CONSENSUS = 'unanimous'
+    AI_STRUCTURED_OUTPUT = True  # Ask for JSON / tool-call output instead of free text
+    AI_STREAMING = True  # Stream responses and stop early when no trade is possible
+    # Streams are cut off below MIN_CONFIDENCE_THRESHOLD - margin; at 25 a
+    # model under 50 can't reach the threshold even if the other says 100
+    STREAM_CONFIDENCE_MARGIN = 25
+    ANALYSIS_CACHE_TTL = 300  # Seconds an analysis is reused for identical data
+    ANALYSIS_CACHE_SIZE = 256  # Analyses kept at most (oldest dropped first)
+    AI_MAX_OUTPUT_TOKENS = 150  # Completion limit per model call
+    PROMPT_TOKEN_BUDGET = 400  # Input tokens per call; optional context is dropped to fit
+    AI_PROMPT_CACHING = True  # Mark the static system block cacheable (Anthropic)
+    # Anthropic ignores cache markers on prefixes shorter than this; the
+    # default system block (~170 tokens) is, so it is sent unmarked
+    AI_PROMPT_CACHE_MIN_TOKENS = 1024
+    # Extra kline intervals summarized in the prompt, e.g. ['4h', '1d'].
+    # Each adds one Binance request per pair per refresh.
+    MULTI_TIMEFRAME_INTERVALS = []
+
+    # Market data quality guard (runs before indicators and analysis)
+    DQ_ENABLED = True
+    DQ_OUTLIER_WINDOW = 3  # candles on each side for the rolling median / MAD
+    DQ_OUTLIER_MADS = 6.0  # deviations from the local median that make a close an outlier
+    DQ_MAX_REPAIRS = 2  # missing candles filled + outliers replaced before a pair is blocked
+    DQ_MAX_TICKER_AGE = 120  # seconds
+    DQ_TICKER_TOLERANCE = 0.02  # max relative gap between ticker price and the open candle's close
+
+    # Market regime per pair (ranging / trending / volatile) from hourly candles
+    REGIME_ENABLED = True
+    REGIME_FAST_HALFLIFE = 6  # candles
+    REGIME_SLOW_HALFLIFE = 72  # candles; baseline for volatility expansion
+    REGIME_VOLATILE_RATIO = 1.5  # fast / slow volatility at which a pair is volatile
+    REGIME_VOLATILE_LEVEL = 2.0  # or hourly volatility (%) at which it is volatile regardless
+    REGIME_TREND_THRESHOLD = 0.35  # |EW mean return / EW mean abs return| for trending
+    REGIME_MIN_DWELL = 2  # consecutive updates before switching regime
+    # Per regime: poll interval (seconds), LLMs asked per decision
+    # (None = LLM_QUORUM) and ladder settings applied with each update
+    REGIME_POLICIES = {
+        'ranging': {
+            'interval': 900, 'llm_quorum': 1,
+            'ladder': {'safety_order_step_percentage': 1.5, 'martingale_step_coefficient': 1.0,
+                       'martingale_volume_coefficient': 1.5}
+        },
+        'trending': {
+            'interval': 300, 'llm_quorum': None,
+            'ladder': {'safety_order_step_percentage': 2.5, 'martingale_step_coefficient': 1.2,
+                       'martingale_volume_coefficient': 1.5}
+        },
+        'volatile': {
+            'interval': 120, 'llm_quorum': None,
+            'ladder': {'safety_order_step_percentage': 4.0, 'martingale_step_coefficient': 1.5,
+                       'martingale_volume_coefficient': 1.2, 'max_safety_orders': 1}
+        }
+    }
+
+    # Market data venues; the first is primary (the one the bots trade on).
+    # With more than one, klines are merged and cross-venue prices reported.
+    # Available: 'binance', 'kraken', 'coinbase'
+    MARKET_DATA_VENUES = ['binance']
+    MARKET_DATA_CACHE_TTL = 60  # seconds a pair's snapshot is reused before refetching
+
+    # Exchange symbol filters (tick size, step size, min notional)
+    EXCHANGE_INFO_CACHE_PATH = BASE_DIR / 'data' / 'exchange_filters.json'
+    EXCHANGE_INFO_TTL = 86400  # seconds before exchangeInfo is fetched again
+
+    # Order book / trade flow features from Binance websocket streams
+    ORDER_FLOW_ENABLED = True
+    ORDER_BOOK_LEVELS = 10  # top-N depth levels (Binance supports 5, 10 or 20)
+    ORDER_FLOW_WINDOWS = [60, 300]  # rolling trade-flow windows in seconds
+    ORDER_FLOW_BUFFER_SIZE = 4096  # trades kept per symbol
+
+    # LLM providers, routed by rolling latency, error rate and cost.
+    # api: 'openai' or 'anthropic'; costs are USD per 1k tokens.
+    LLM_PROVIDERS = [
+        {'name': 'gpt', 'api': 'openai', 'model': 'gpt-3.5-turbo',
+         'input_cost': 0.0005, 'output_cost': 0.0015, 'weight': 1.0},
+        {'name': 'claude', 'api': 'anthropic', 'model': 'claude-3-sonnet-20240229',
+         'input_cost': 0.003, 'output_cost': 0.015, 'weight': 1.0}
+    ]
+    LLM_QUORUM = 2  # answers needed per decision; extra providers act as spares
+    LLM_LATENCY_SLO = 8.0  # seconds per decision; spares are hedged in to meet it
+    LLM_MAX_ERROR_RATE = 0.5  # providers failing more often are only used as spares
+    LLM_STATS_WINDOW = 100  # calls kept for rolling latency / error stats
+
+    # Local signal gate (decides which snapshots are worth an LLM call)
+    GATE_ENABLED = True
+    GATE_THRESHOLD = 0.5  # minimum gate score to escalate to the LLMs
+    GATE_AUDIT_RATE = 0.05  # share of rejected snapshots escalated anyway to measure agreement
+    GATE_MODEL_PATH = BASE_DIR / 'data' / 'gate_model.json'
+
+    # Sharded mode (coordinator assigns pairs to worker processes)
+    SHARD_COORDINATOR_ADDRESS = '127.0.0.1:8765'  # or 'unix:/path/to.sock'
+    SHARD_HEARTBEAT_INTERVAL = 5  # seconds
+    SHARD_HEARTBEAT_TIMEOUT = 15  # seconds without heartbeat before rebalancing
+    SHARD_VIRTUAL_NODES = 64  # hash ring points per worker
+
+    # Execution backend: 'live' (3Commas) or 'paper' (in-memory simulated bots)
+    EXECUTION_BACKEND = 'live'
+    PAPER_FEE_RATE = 0.001  # per fill, like Binance spot taker fees
+    PAPER_DEAL_HISTORY = 100  # completed deals kept per paper bot
+    PAPER_STATE_SNAPSHOT_PATH = BASE_DIR / 'data' / 'paper_state.bin'
+
+    # Hot-reloadable overrides (JSON object of setting -> value), polled for changes
+    RUNTIME_CONFIG_PATH = BASE_DIR / 'data' / 'runtime_config.json'
+    RUNTIME_CONFIG_POLL_INTERVAL = 5  # seconds
+
+    # Decision recording for replay / shadow comparison of analyzer versions
+    RECORD_DECISIONS = False
+    DECISION_LOG_PATH = BASE_DIR / 'data' / 'decisions.log'
+    DECISION_LOG_BLOCK_SIZE = 50  # records per compressed block
+    REPLAY_HORIZON = 6 * 3600  # seconds a simulated trade is held at most
+
+    # Local read-only status API / dashboard (served from in-memory snapshots)
+    STATUS_ENABLED = False
+    STATUS_ADDRESS = '127.0.0.1:8780'  # or 'unix:/path/to.sock'
+    STATUS_REFRESH_INTERVAL = 1.0  # seconds; snapshots are rebuilt at most this often
+    BOT_STATS_INTERVAL = 60  # seconds between 3Commas bot stats refreshes per pair
+
+    # Memory bounds for long-running operation
+    MARKET_CACHE_SIZE = 64  # pairs whose latest market snapshot is kept
+    DEAL_HISTORY_SIZE = 500  # completed deals kept across all bots
+    INACTIVE_BOTS_KEPT = 50  # bot ids remembered for pairs no longer traded
+    MEMORY_TRACE = False  # trace allocations with tracemalloc (adds overhead)
+    MEMORY_TRACE_FRAMES = 1  # stack frames kept per traced allocation
+
+    # Runtime state (snapshot for warm restart)
+    STATE_SNAPSHOT_PATH = BASE_DIR / 'data' / 'state.bin'
+    STATE_SNAPSHOT_INTERVAL = 60  # seconds
+    SHUTDOWN_TIMEOUT = 30  # seconds to drain in-flight work on shutdown
 
     @classmethod
     def validate_config(cls):
         required_keys = [
             'OPENAI_API_KEY',
-            'CLAUDE_API_KEY',
-            'THREE_COMMAS_API_KEY',
-            'THREE_COMMAS_SECRET'
+            'CLAUDE_API_KEY'
         ]
+        if cls.EXECUTION_BACKEND != 'paper':
+            required_keys += ['THREE_COMMAS_API_KEY', 'THREE_COMMAS_SECRET']
         
         print("\nValidating Configuration:")
         for key in required_keys:
@@ -1,106 +1,468 @@
 import asyncio
 import logging
-from datetime import datetime
+import os
+import signal
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
 from src.market_data import MarketDataManager
+from src.memory import MemoryProfiler
 from src.ai_analyzer import AIAnalyzer
 from src.bot_manager import BotManager
+from src.dca_simulator import capital_multiplier
+from src.order_flow import OrderFlowManager
+from src.paper_trading import PaperBotManager
+from src.pipeline import TradingPipeline
+from src.portfolio import PortfolioAllocator
+from src.records import PairStatus
+from src.regime import get_policy
+from src.resilience import RetryPolicy, get_resilience_manager
+from src.runtime_config import RuntimeConfig
+from src.signal_gate import SignalGate
+from src.state_store import StateStore
+from src.status_server import StatusServer
 from config.config import Config
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/trading.log'),
-        logging.StreamHandler()
-    ]
-)
+def configure_logging(level: int = logging.INFO):
+    """Log to the console and logs/trading.log, replacing any earlier setup"""
+    os.makedirs('logs', exist_ok=True)
+    logging.basicConfig(
+        level=level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('logs/trading.log'),
+            logging.StreamHandler()
+        ],
+        force=True
+    )
+
 
 logger = logging.getLogger('TradingBot')
 
 class TradingBot:
-    def __init__(self):
+    def __init__(self, pairs: Optional[List[str]] = None):
+        # Pairs handled by this process (a subset in sharded mode)
+        self.pairs = list(pairs if pairs is not None else Config.TRADING_PAIRS)
+        # Follow TRADING_PAIRS from the runtime config unless a coordinator assigns pairs
+        self.follow_config_pairs = pairs is None
+        self.runtime_config = RuntimeConfig()
+        self.runtime_config.add_listener(self._on_config_change)
         self.market_data = MarketDataManager()
+        self.order_flow = OrderFlowManager(self.pairs) if Config.ORDER_FLOW_ENABLED else None
+        self.market_data.order_flow = self.order_flow
         self.ai_analyzer = AIAnalyzer()
-        self.bot_manager = BotManager()
+        paper = Config.EXECUTION_BACKEND == 'paper'
+        self.bot_manager = PaperBotManager() if paper else BotManager()
+        if paper and self.order_flow:
+            # Every streamed trade is a paper-trading price tick
+            self.order_flow.trade_listeners.append(self.bot_manager.on_price)
+        self.signal_gate = SignalGate.load()
+        self.portfolio = PortfolioAllocator()
+        self.pipeline = self._build_pipeline()
+        self.resilience = get_resilience_manager()
+        self.state_store = StateStore(
+            Config.PAPER_STATE_SNAPSHOT_PATH if paper else Config.STATE_SNAPSHOT_PATH
+        )
         self.is_running = False
+        self.halted = False
+        self.bot_stats: Dict[str, dict] = {}  # pair -> latest 3Commas stats
+        self.bot_stats_at: Dict[str, float] = {}  # pair -> monotonic time of that fetch
+        self.pair_status: Dict[str, PairStatus] = {}  # pair -> latest cycle summary
+        self.memory = MemoryProfiler()
+        if Config.MEMORY_TRACE:
+            self.memory.start()
+        self.status_server = StatusServer(self.get_status_snapshot) if Config.STATUS_ENABLED else None
+        self.next_due: Dict[str, float] = {}  # pair -> monotonic time of its next cycle
+        self._shutdown_event = asyncio.Event()
         
+    def _build_pipeline(self) -> TradingPipeline:
+        """Wire the per-pair processing stages into a pipeline"""
+        pipeline = TradingPipeline()
+        for name, handler in (
+            ('market_data', self._market_data_stage),
+            ('analysis', self._analysis_stage),
+            ('execution', self._execution_stage),
+            ('status', self._status_stage)
+        ):
+            pipeline.add_stage(
+                name, handler,
+                workers=Config.PIPELINE_WORKERS.get(name, 1),
+                queue_size=Config.PIPELINE_QUEUE_SIZE
+            )
+        return pipeline
+
     async def setup(self):
         """Initialize the trading system"""
         try:
             # Validate configuration
             Config.validate_config()
             
+            # Warm restart: reuse bots and caches from the last snapshot
+            self.restore_state()
+            
+            # Apply runtime overrides before creating bots
+            await self.runtime_config.check()
+            
             # Create initial bot for each trading pair
-            for pair in Config.TRADING_PAIRS:
-                bot = await self.bot_manager.create_bot(pair)
-                if bot:
-                    logger.info(f"Created bot for {pair}: {bot['id']}")
-                else:
-                    logger.error(f"Failed to create bot for {pair}")
+            await self.ensure_bots(self.pairs)
                     
         except Exception as e:
             logger.error(f"Setup failed: {str(e)}")
             raise
+
+    async def ensure_bots(self, pairs: List[str]):
+        """Create a bot for every pair that doesn't have one yet"""
+        for pair in pairs:
+            if pair in self.bot_manager.active_bots:
+                logger.info(f"Reusing bot for {pair}: {self.bot_manager.active_bots[pair]}")
+                continue
+            if self.halted:
+                logger.warning(f"Trading halted, not creating a bot for {pair}")
+                continue
+            bot = await self.bot_manager.create_bot(pair)
+            if bot:
+                logger.info(f"Created bot for {pair}: {bot['id']}")
+            else:
+                logger.error(f"Failed to create bot for {pair}")
+
+    async def set_pairs(self, pairs: List[str], known_bots: Optional[Dict[str, int]] = None):
+        """Switch to a new set of pairs (sharded mode), reusing known bot ids"""
+        if known_bots:
+            self.bot_manager.active_bots.update(known_bots)
+            for pair in known_bots:
+                self.bot_manager.retired_bots.pop(pair, None)
+        await self.ensure_bots(pairs)
+        for pair in set(self.pairs) - set(pairs):
+            self.portfolio.remove(pair)
+            self.market_data.forget(pair)
+            self.next_due.pop(pair, None)
+            self.pair_status.pop(pair, None)
+            self.pipeline.last_latency.pop(pair, None)
+            self.bot_stats.pop(pair, None)
+            self.bot_stats_at.pop(pair, None)
+        self.pairs = list(pairs)
+        self.bot_manager.prune_bots(self.pairs)
+        if self.order_flow:
+            self.order_flow.set_symbols(self.pairs)
+
+    async def _on_config_change(self, changes: dict):
+        """Apply runtime config changes that components cached at startup"""
+        if 'GATE_THRESHOLD' in changes:
+            self.signal_gate.threshold = changes['GATE_THRESHOLD']
+        if 'GATE_AUDIT_RATE' in changes:
+            self.signal_gate.audit_rate = changes['GATE_AUDIT_RATE']
+        if 'TRADING_PAIRS' in changes and self.follow_config_pairs:
+            removed = [p for p in self.pairs if p not in changes['TRADING_PAIRS']]
+            # Dropped pairs are no longer managed, so their bots stop opening deals
+            # (before set_pairs, which may forget their bot ids)
+            for pair in removed:
+                bot_id = self.bot_manager.active_bots.get(pair)
+                if bot_id:
+                    await self.bot_manager.stop_bot(bot_id)
+            # Pairs coming back reuse the bot stopped when they were dropped
+            returning = [self.bot_manager.active_bots[p] for p in changes['TRADING_PAIRS']
+                         if p not in self.pairs and p in self.bot_manager.active_bots]
+            await self.set_pairs(changes['TRADING_PAIRS'])
+            if not self.halted:
+                for bot_id in returning:
+                    await self.bot_manager.start_bot(bot_id)
+            logger.info(f"Now trading {', '.join(self.pairs)}")
+
+    async def halt(self, reason: str):
+        """Stop opening new deals on every bot owned by this process"""
+        if self.halted:
+            return
+        self.halted = True
+        logger.critical(f"Trading halted: {reason}")
+        for pair in self.pairs:
+            bot_id = self.bot_manager.active_bots.get(pair)
+            if bot_id:
+                await self.bot_manager.stop_bot(bot_id)
+
+    def get_risk_report(self) -> dict:
+        """Risk aggregates and bot ids for the shard coordinator"""
+        pair_pnl = {}
+        for pair in self.pairs:
+            # Pairs without stats yet are left out, so a pair taken over from
+            # another worker keeps that worker's figure until we have ours
+            stats = self.bot_stats.get(pair)
+            if not stats:
+                continue
+            profits = stats.get('profits_in_usd', {})
+            try:
+                pair_pnl[pair] = float(profits.get('today_usd_profit', 0) or 0)
+            except (TypeError, ValueError):
+                pass
+        return {
+            'risk': {
+                'date': datetime.now(timezone.utc).strftime('%Y-%m-%d'),
+                'daily_pnl': sum(pair_pnl.values()),
+                'pair_pnl': pair_pnl,
+                'pairs': len(self.pairs)
+            },
+            'bots': {p: self.bot_manager.active_bots[p]
+                     for p in self.pairs if p in self.bot_manager.active_bots}
+        }
     
     async def run(self):
         """Main trading loop"""
+        if self._shutdown_event.is_set():
+            return  # Shutdown was requested during setup
         self.is_running = True
+        self.pipeline.start()
+        if self.order_flow:
+            self.order_flow.start()
+        snapshot_task = asyncio.create_task(self._snapshot_loop())
+        self.runtime_config.start()
+        if self.status_server:
+            await self.status_server.start()
         logger.info("Starting trading bot...")
         
-        while self.is_running:
-            try:
-                for pair in Config.TRADING_PAIRS:
-                    await self.process_trading_pair(pair)
+        # Backoff for errors in the loop itself (external calls have their own)
+        loop_backoff = RetryPolicy(base_delay=5, max_delay=60)
+        consecutive_errors = 0
+        
+        last_step = None
+        try:
+            while self.is_running:
+                try:
+                    now = time.monotonic()
+                    # Prices seen last cycle become one covariance observation
+                    if last_step is None or now - last_step >= Config.UPDATE_INTERVAL:
+                        self.portfolio.step()
+                        last_step = now
+                    for pair in ([] if self.halted else self.pairs):
+                        if now < self.next_due.get(pair, 0):
+                            continue
+                        self.next_due[pair] = now + self.get_poll_interval(pair)
+                        # Pairs still in flight from the last cycle are skipped
+                        if not await self.pipeline.submit(pair):
+                            logger.warning(f"{pair} still in progress, skipping this cycle")
+                        
+                    consecutive_errors = 0
+                    # Wait until the next pair is due (each pair runs at its regime's cadence)
+                    due = [self.next_due.get(pair, now) for pair in self.pairs]
+                    await self._wait_for_shutdown(
+                        min([Config.UPDATE_INTERVAL] + [max(1.0, d - now) for d in due])
+                    )
                     
-                # Wait for next update interval
-                await asyncio.sleep(Config.UPDATE_INTERVAL)
-                
-            except Exception as e:
-                logger.error(f"Error in main loop: {str(e)}")
-                await asyncio.sleep(60)  # Wait a minute before retrying
-    
-    async def process_trading_pair(self, pair: str):
-        """Process a single trading pair"""
+                except Exception as e:
+                    consecutive_errors += 1
+                    delay = loop_backoff.get_delay(consecutive_errors)
+                    logger.error(f"Error in main loop: {str(e)}, retrying in {delay:.1f}s")
+                    await self._wait_for_shutdown(delay)
+        finally:
+            snapshot_task.cancel()
+            await self.runtime_config.stop()
+            if self.status_server:
+                await self.status_server.stop()
+            await self._drain()
+            if self.order_flow:
+                await self.order_flow.stop()
+            await self.market_data.close()
+            if self.ai_analyzer.recorder:
+                self.ai_analyzer.recorder.close()
+            self.save_state()
+
+    def get_poll_interval(self, pair: str) -> float:
+        """Seconds between cycles for a pair, from its market regime"""
+        regime = self.market_data.regimes.get(pair)
+        return get_policy(regime and regime['regime']).get('interval') or Config.UPDATE_INTERVAL
+
+    async def _wait_for_shutdown(self, timeout: float):
+        """Sleep for up to `timeout` seconds, waking early on shutdown"""
         try:
-            # Get market data
-            market_data = await self.market_data.get_market_data(pair)
-            if not market_data:
-                logger.warning(f"No market data available for {pair}")
-                return
-                
-            # Get AI analysis
-            analysis = await self.ai_analyzer.analyze_market(market_data)
-            if not analysis:
-                logger.warning(f"No AI analysis available for {pair}")
-                return
-                
-            # Get bot ID for this pair
-            bot_id = self.bot_manager.active_bots.get(pair)
-            if not bot_id:
-                logger.warning(f"No active bot found for {pair}")
-                return
-                
-            # Apply AI recommendations
-            success = await self.bot_manager.apply_ai_recommendations(
-                bot_id, analysis
+            await asyncio.wait_for(self._shutdown_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _drain(self):
+        """Let in-flight pairs finish, up to Config.SHUTDOWN_TIMEOUT"""
+        in_flight = len(self.pipeline.in_flight)
+        if in_flight:
+            logger.info(f"Draining {in_flight} in-flight pairs...")
+        try:
+            await asyncio.wait_for(self.pipeline.join(), Config.SHUTDOWN_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Shutdown timeout reached, abandoning {len(self.pipeline.in_flight)} pairs"
             )
-            
-            if success:
-                logger.info(f"Successfully updated bot settings for {pair}")
+        await self.pipeline.stop()
+
+    async def _snapshot_loop(self):
+        """Periodically persist runtime state"""
+        while True:
+            await asyncio.sleep(Config.STATE_SNAPSHOT_INTERVAL)
+            self.save_state()
+            if self.ai_analyzer.recorder:
+                self.ai_analyzer.recorder.flush()
+            if self.memory.tracing:
+                report = self.get_memory_report(5)
+                growth = ', '.join(f"{site['site']} +{site['size_diff_kb']:.0f}KB"
+                                   for site in report.get('growth', []))
+                logger.info(f"Memory: RSS {report['rss_mb']:.1f}MB, traced "
+                            f"{report['traced_mb']:.1f}MB; growth: {growth or 'none'}")
+
+    def get_state(self) -> dict:
+        """Collect runtime state from every component"""
+        return {
+            'saved_at': time.time(),
+            'bot_manager': self.bot_manager.get_state(),
+            'market_data': self.market_data.get_state(),
+            'ai_analyzer': self.ai_analyzer.get_state(),
+            'portfolio': self.portfolio.get_state()
+        }
+
+    def save_state(self) -> bool:
+        """Write a runtime state snapshot"""
+        return self.state_store.save(self.get_state())
+
+    def restore_state(self) -> bool:
+        """Load the last runtime state snapshot, if any"""
+        started = time.perf_counter()
+        state = self.state_store.load()
+        if not state:
+            return False
+        self.bot_manager.restore_state(state.get('bot_manager', {}))
+        self.market_data.restore_state(state.get('market_data', {}))
+        self.ai_analyzer.restore_state(state.get('ai_analyzer', {}))
+        self.portfolio.restore_state(state.get('portfolio', {}))
+        logger.info(
+            f"Restored state snapshot from {datetime.fromtimestamp(state['saved_at'])} "
+            f"in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+        return True
+    
+    async def _market_data_stage(self, item: dict) -> Optional[dict]:
+        """Pipeline stage: fetch market data for a pair"""
+        pair = item['pair']
+        # Before anything can drop the pair, so the PnL behind the loss
+        # limits stays current for gated, blocked or unanswered pairs too
+        await self.refresh_bot_stats(pair)
+        market_data = await self.market_data.get_market_data(pair)
+        if not market_data:
+            logger.warning(f"No market data available for {pair}")
+            return None
+        item['market_data'] = market_data
+        self.portfolio.observe_price(pair, market_data['current_price'])
+        if isinstance(self.bot_manager, PaperBotManager):
+            self.bot_manager.on_price(pair, market_data['current_price'])
+        return item
+
+    async def _analysis_stage(self, item: dict) -> Optional[dict]:
+        """Pipeline stage: get AI analysis for a pair"""
+        pair = item['pair']
+        
+        # Only pay for LLM calls when the local gate sees a possible trade
+        escalate, audit = True, False
+        if Config.GATE_ENABLED:
+            escalate, audit, score = self.signal_gate.evaluate(item['market_data'])
+            if not (escalate or audit):
+                logger.info(f"Gate skipped {pair} (score {score:.2f})")
+                self.portfolio.observe_analysis(pair, item['market_data'], None)
+                return None
                 
-            # Log current status
-            await self.log_status(pair, market_data, analysis)
+        # Quiet markets can be decided with fewer models
+        policy = get_policy((item['market_data'].get('regime') or {}).get('regime'))
+        analysis = await self.ai_analyzer.analyze_market(
+            item['market_data'], quorum=policy.get('llm_quorum')
+        )
+        self.portfolio.observe_analysis(pair, item['market_data'], analysis)
+        if not analysis:
+            logger.warning(f"No AI analysis available for {pair}")
+            return None
+        if Config.GATE_ENABLED:
+            self.signal_gate.record_outcome(escalate, analysis.get('should_trade', False))
+        item['analysis'] = analysis
+        return item
+
+    async def _execution_stage(self, item: dict) -> Optional[dict]:
+        """Pipeline stage: apply AI recommendations to the pair's bot"""
+        pair = item['pair']
+        
+        # Get bot ID for this pair
+        bot_id = self.bot_manager.active_bots.get(pair)
+        if not bot_id:
+            logger.warning(f"No active bot found for {pair}")
+            return None
             
+        # Size orders across the portfolio, then simulate the ladder on
+        # recent history before applying the AI recommendations
+        price_history, sizing = None, None
+        ladder = get_policy((item['market_data'].get('regime') or {}).get('regime')).get('ladder')
+        if item['analysis'].get('should_trade'):
+            filters = await self.market_data.get_precision_table()
+            allocation = self.portfolio.allocate(
+                capital_multiplier(self.bot_manager.get_ladder(bot_id, ladder)),
+                daily_pnl=self.get_risk_report()['risk']['daily_pnl'],
+                min_order_volumes={p: filters.get_min_notional(p) for p in self.pairs} if filters else None
+            )
+            sizing = allocation.get(pair)
+            if sizing is None:
+                logger.info(f"No capital allocated to {pair}, leaving bot settings unchanged")
+                return item
+            price_history = await self.market_data.get_price_history(
+                pair, days=Config.LADDER_CHECK_DAYS
+            )
+        success = await self.bot_manager.apply_ai_recommendations(
+            bot_id, item['analysis'], price_history, sizing, ladder
+        )
+        
+        if success:
+            logger.info(f"Successfully updated bot settings for {pair}")
+        return item
+
+    async def _status_stage(self, item: dict) -> Optional[dict]:
+        """Pipeline stage: log current status for the pair"""
+        await self.log_status(item['pair'], item['market_data'], item['analysis'])
+        return item
+
+    async def process_trading_pair(self, pair: str):
+        """Process a single trading pair through every stage in sequence"""
+        try:
+            item = {'pair': pair}
+            for stage in self.pipeline.stages:
+                item = await stage.handler(item)
+                if item is None:
+                    return
+                    
         except Exception as e:
             logger.error(f"Error processing {pair}: {str(e)}")
     
+    async def refresh_bot_stats(self, pair: str):
+        """Fetch the pair's bot stats (PnL) at most once per BOT_STATS_INTERVAL"""
+        bot_id = self.bot_manager.active_bots.get(pair)
+        fetched = self.bot_stats_at.get(pair)
+        if not bot_id or (fetched is not None and
+                          time.monotonic() - fetched < Config.BOT_STATS_INTERVAL):
+            return
+        self.bot_stats_at[pair] = time.monotonic()
+        stats = await self.bot_manager.get_bot_stats(bot_id)
+        # A failed fetch keeps the last known figures
+        if stats:
+            self.bot_stats[pair] = stats
+
     async def log_status(self, pair: str, market_data: dict, analysis: dict):
         """Log current trading status"""
         try:
             bot_id = self.bot_manager.active_bots.get(pair)
+            regime = market_data.get('regime') or {}
+            # A new record each cycle, so status readers never see a half-updated one
+            self.pair_status[pair] = PairStatus(
+                price=market_data['current_price'],
+                change_24h=market_data['price_change_24h'],
+                trend=market_data.get('trend'),
+                regime=regime.get('regime'),
+                decision=analysis.get('recommended_direction'),
+                confidence=analysis.get('average_confidence'),
+                should_trade=analysis.get('should_trade'),
+                take_profit=analysis.get('take_profit'),
+                stop_loss=analysis.get('stop_loss'),
+                bot_id=bot_id,
+                updated_at=time.time()
+            )
             if bot_id:
-                stats = await self.bot_manager.get_bot_stats(bot_id)
+                stats = self.bot_stats.get(pair, {})
                 
                 logger.info(
                     f"\nStatus Update for {pair}:"
@@ -112,16 +474,87 @@ class TradingBot:
                 
         except Exception as e:
             logger.error(f"Error logging status: {str(e)}")
+
+    def get_pipeline_stats(self) -> dict:
+        """Get per-stage queue depth and service time"""
+        return self.pipeline.get_stats()
+
+    def get_gate_stats(self) -> dict:
+        """Get the signal gate's escalation rate and agreement with the LLMs"""
+        return self.signal_gate.get_stats()
+
+    def get_llm_stats(self) -> dict:
+        """Get per-provider latency, error rate and cost from the LLM router"""
+        return self.ai_analyzer.router.get_stats()
+
+    def get_data_quality_stats(self) -> dict:
+        """Get blocked / repaired market data counts and the last report per pair"""
+        return self.market_data.quality_guard.get_stats()
+
+    def get_config_stats(self) -> dict:
+        """Get the applied runtime config version and overrides"""
+        return self.runtime_config.get_stats()
+
+    def get_status_snapshot(self) -> dict:
+        """Everything the status server publishes, read from in-memory state only"""
+        risk = self.get_risk_report()
+        return {
+            'generated_at': time.time(),
+            'running': self.is_running,
+            'halted': self.halted,
+            'backend': Config.EXECUTION_BACKEND,
+            'pairs': {pair: self.pair_status[pair].to_dict() if pair in self.pair_status else {}
+                      for pair in self.pairs},
+            'bots': risk['bots'],
+            'pnl': {
+                'daily_pnl': risk['risk']['daily_pnl'],
+                'pairs': {pair: self.bot_stats.get(pair, {}).get('profits_in_usd', {})
+                          for pair in self.pairs}
+            },
+            'timings': {
+                'pairs': dict(self.pipeline.last_latency),
+                'in_flight': list(self.pipeline.in_flight),
+                'stages': self.get_pipeline_stats()
+            },
+            'llm': self.get_llm_stats(),
+            'gate': self.get_gate_stats(),
+            'data_quality': self.get_data_quality_stats(),
+            'config': self.get_config_stats(),
+            'breakers': self.get_breaker_states(),
+            'memory': self.memory.get_stats()
+        }
+
+    def get_memory_report(self, limit: int = 10) -> dict:
+        """RSS, traced memory and (with MEMORY_TRACE) the top allocation sites and their growth"""
+        return self.memory.report(limit)
+
+    def get_breaker_states(self) -> dict:
+        """Get circuit breaker state for every external endpoint"""
+        return self.resilience.get_breaker_states()
     
     async def stop(self):
-        """Stop the trading bot"""
+        """Stop the trading bot; run() drains in-flight work and saves state"""
+        self.request_shutdown()
+
+    def request_shutdown(self):
+        """Ask the main loop to exit (safe to call from a signal handler)"""
+        if self.is_running:
+            logger.info("Stopping trading bot...")
         self.is_running = False
-        logger.info("Stopping trading bot...")
+        self._shutdown_event.set()
 
 async def main():
     """Main entry point"""
     bot = TradingBot()
     
+    # Drain gracefully on SIGINT/SIGTERM instead of dying mid-update
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, bot.request_shutdown)
+        except NotImplementedError:
+            pass  # Not supported on Windows; KeyboardInterrupt still works
+    
     try:
         # Initialize the bot
         await bot.setup()
@@ -139,6 +572,7 @@ async def main():
         raise
 
 if __name__ == "__main__":
+    configure_logging()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
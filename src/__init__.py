@@ -1,6 +1,12 @@
-from .market_data import MarketDataManager
-from .ai_analyzer import AIAnalyzer
-from .bot_manager import BotManager
+import importlib
+
+# Components are imported on first access so that tools which only need
+# part of the package (e.g. the CLI) don't pay for every SDK import.
+_LAZY_IMPORTS = {
+    'MarketDataManager': '.market_data',
+    'AIAnalyzer': '.ai_analyzer',
+    'BotManager': '.bot_manager'
+}
 
 __all__ = [
     'MarketDataManager',
@@ -10,4 +16,11 @@ __all__ = [
 
 # Version info
 __version__ = '0.1.0'
-__author__ = 'Your Name'
\ No newline at end of file
+__author__ = 'Your Name'
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,130 +1,300 @@
 # ai_analyzer.py
-from openai import AsyncOpenAI
-from anthropic import Anthropic
 import logging
-from typing import Dict, Any, Optional
+import time
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional
 from config.config import Config
+from .ai_schema import (
+    ANALYSIS_TOOL,
+    ANALYSIS_TOOL_NAME,
+    StreamingDecisionParser,
+    parse_analysis
+)
+from .decision_log import DecisionRecorder
+from .llm_router import LLMProvider, LLMRouter
+from .prompt_builder import PromptBuilder, PromptRequest
+from .records import CachedAnalysis
+from .resilience import get_resilience_manager
+
+# Raw responses of the decision being made (provider -> response) while
+# recording, and the one provider call in progress; context variables
+# keep concurrent pairs and provider tasks apart
+_decision_responses: ContextVar[Optional[Dict[str, Dict[str, Any]]]] = \
+    ContextVar('decision_responses', default=None)
+_call_response: ContextVar[Optional[Dict[str, Any]]] = ContextVar('call_response', default=None)
 
 class AIAnalyzer:
     def __init__(self):
-        self.openai_client = AsyncOpenAI(api_key=Config.OPENAI_API_KEY)
-        self.claude_client = Anthropic(api_key=Config.CLAUDE_API_KEY)
+        self._openai_client = None
+        self._claude_client = None
+        self.resilience = get_resilience_manager()
+        self.prompt_builder = PromptBuilder()
+        self.router = LLMRouter(self._build_providers())
+        # prompt digest -> combined result and when it was made, oldest first
+        self.analysis_cache: Dict[str, CachedAnalysis] = {}
+        self.recorder = DecisionRecorder(Config.DECISION_LOG_PATH) if Config.RECORD_DECISIONS else None
+
+    # SDK clients are created on first use. SDK-level retries are disabled;
+    # the shared resilience layer owns backoff and circuit breaking.
+
+    @property
+    def openai_client(self):
+        if self._openai_client is None:
+            from openai import AsyncOpenAI
+            self._openai_client = AsyncOpenAI(
+                api_key=Config.OPENAI_API_KEY,
+                max_retries=0,
+                timeout=Config.AI_REQUEST_TIMEOUT
+            )
+        return self._openai_client
+
+    @property
+    def claude_client(self):
+        if self._claude_client is None:
+            from anthropic import AsyncAnthropic
+            self._claude_client = AsyncAnthropic(
+                api_key=Config.CLAUDE_API_KEY,
+                max_retries=0,
+                timeout=Config.AI_REQUEST_TIMEOUT
+            )
+        return self._claude_client
+
+    def _build_providers(self) -> List[LLMProvider]:
+        """Create router providers from Config.LLM_PROVIDERS"""
+        calls = {
+            'openai': self._get_gpt_analysis,
+            'anthropic': self._get_claude_analysis
+        }
+        return [
+            LLMProvider(
+                entry['name'], entry['model'], self._capturing(entry['name'], calls[entry['api']]),
+                input_cost=entry.get('input_cost', 0.0),
+                output_cost=entry.get('output_cost', 0.0),
+                weight=entry.get('weight', 1.0)
+            )
+            for entry in Config.LLM_PROVIDERS
+        ]
 
-    def _parse_ai_response(self, response: str, source: str) -> Optional[Dict[str, Any]]:
-        """Parse AI response into structured format"""
+    @staticmethod
+    def _capturing(name: str, call):
+        """Wrap a provider call to keep its raw response while recording"""
+        async def capture(prompt: PromptRequest, model: str) -> Optional[Dict[str, Any]]:
+            responses = _decision_responses.get()
+            if responses is None:
+                return await call(prompt, model)
+            captured: Dict[str, Any] = {}
+            token = _call_response.set(captured)
+            try:
+                return await call(prompt, model)
+            finally:
+                _call_response.reset(token)
+                if captured:
+                    responses[name] = captured
+        return capture
+
+    def get_state(self) -> Dict[str, Any]:
+        """Export the LLM analysis cache for a state snapshot"""
+        return {'analysis_cache': {digest: entry.to_dict()
+                                   for digest, entry in self.analysis_cache.items()}}
+
+    def restore_state(self, state: Dict[str, Any]):
+        """Restore unexpired LLM analysis cache entries from a state snapshot"""
+        now = time.time()
+        self.analysis_cache = {
+            digest: CachedAnalysis.from_dict(entry)
+            for digest, entry in state.get('analysis_cache', {}).items()
+            if now - entry['created'] < Config.ANALYSIS_CACHE_TTL
+        }
+
+    def _get_cached_analysis(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Return a cached analysis for an identical prompt if still fresh"""
+        entry = self.analysis_cache.get(digest)
+        if not entry:
+            return None
+        if time.time() - entry.created >= Config.ANALYSIS_CACHE_TTL:
+            del self.analysis_cache[digest]
+            return None
+        return entry.analysis
+
+    def _store_analysis(self, digest: str, analysis: Dict[str, Any]):
+        """Cache an analysis, dropping expired entries and the oldest beyond the size limit"""
+        now = time.time()
+        expired = [key for key, entry in self.analysis_cache.items()
+                   if now - entry.created >= Config.ANALYSIS_CACHE_TTL]
+        for key in expired:
+            del self.analysis_cache[key]
+        self.analysis_cache.pop(digest, None)
+        self.analysis_cache[digest] = CachedAnalysis(created=now, analysis=analysis)
+        while len(self.analysis_cache) > Config.ANALYSIS_CACHE_SIZE:
+            del self.analysis_cache[next(iter(self.analysis_cache))]
+
+    def _parse_ai_response(self, response: Any, source: str) -> Optional[Dict[str, Any]]:
+        """
+        Parse AI response into structured format. Accepts JSON (repairing
+        common defects), a tool-call input dict or the legacy line format.
+        """
+        captured = _call_response.get()
+        if captured is not None:
+            captured.update({'raw': response, 'source': source})
         try:
-            lines = [line.strip() for line in response.strip().split('\n') if line.strip()]
-            result = {}
-
-            for line in lines:
-                if ':' not in line:
-                    continue
-
-                key, value = [x.strip() for x in line.split(':', 1)]
-                key = key.upper()
-
-                if key == 'DECISION':
-                    result['direction'] = value.upper()
-                elif key == 'CONFIDENCE':
-                    result['confidence'] = float(value.replace('%', ''))
-                elif key == 'STOP_LOSS':
-                    result['stop_loss'] = float(value.replace('%', ''))
-                elif key == 'TAKE_PROFIT':
-                    result['take_profit'] = float(value.replace('%', ''))
-                elif key == 'RISK':
-                    result['risk'] = int(value)
-
-            result['source'] = source
+            result = parse_analysis(response, source)
+            if result is None:
+                logging.error(f"No decision in {source} response: {response!r}")
+            elif result.get('partial'):
+                logging.warning(f"Partial {source} response, missing: {', '.join(result['missing'])}")
             return result
 
         except Exception as e:
             logging.error(f"Error parsing {source} response: {str(e)}")
             return None
 
-    def _create_analysis_prompt(self, market_data: Dict[str, Any]) -> str:
-        """Create a detailed prompt for AI analysis"""
-        return f"""
-        Analyze this crypto market data and provide trading recommendations:
-
-        Current Market Data:
-        - Price: ${market_data.get('current_price', 'N/A')}
-        - 24h Change: {market_data.get('price_change_24h', 'N/A')}%
-        - Volume: ${market_data.get('volume_24h', 'N/A')}
-        - Trend: {market_data.get('trend', 'N/A')}
-        - RSI: {market_data.get('indicators', {}).get('rsi_14', 'N/A')}
-        - Price vs SMA: {market_data.get('indicators', {}).get('price_vs_sma', 'N/A')}%
-
-        Provide in this exact format:
-        DECISION: [BUY/SELL/HOLD]
-        CONFIDENCE: [0-100]
-        STOP_LOSS: [percentage]
-        TAKE_PROFIT: [percentage]
-        RISK: [1-10]
-        """
+    def _create_analysis_prompt(self, market_data: Dict[str, Any]) -> PromptRequest:
+        """Create the prompt for AI analysis (static system block + compact data)"""
+        return self.prompt_builder.build(market_data)
 
-    async def _get_gpt_analysis(self, prompt: str) -> Optional[Dict[str, Any]]:
+    async def _get_gpt_analysis(self, prompt: PromptRequest,
+                                model: str = "gpt-3.5-turbo") -> Optional[Dict[str, Any]]:
         """Get analysis from GPT"""
         try:
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a crypto trading expert."},
-                    {"role": "user", "content": prompt}
-                ],
+            options = {}
+            if Config.AI_STRUCTURED_OUTPUT:
+                options['response_format'] = {'type': 'json_object'}
+            if Config.AI_STREAMING:
+                options['stream'] = True
+
+            # Analysis calls have no side effects, so they are retried, but
+            # not hedged (a duplicate completion would double the token cost)
+            response = await self.resilience.call(
+                'openai.chat', self.openai_client.chat.completions.create,
+                idempotent=True,
+                model=model,
+                # Static system message first, so OpenAI's automatic prefix
+                # caching can reuse it across pairs
+                messages=prompt.openai_messages(),
                 temperature=0.7,
-                max_tokens=150
+                max_tokens=prompt.max_tokens,
+                **options
             )
+            if Config.AI_STREAMING:
+                return await self._read_stream(response, self._gpt_chunk_text, 'gpt')
             return self._parse_ai_response(response.choices[0].message.content, 'gpt')
         except Exception as e:
             logging.error(f"GPT analysis error: {str(e)}")
             return None
 
-    async def _get_claude_analysis(self, prompt: str) -> Optional[Dict[str, Any]]:
-        """Get analysis from Claude (async wrapper)"""
+    async def _get_claude_analysis(self, prompt: PromptRequest,
+                                   model: str = "claude-3-sonnet-20240229") -> Optional[Dict[str, Any]]:
+        """Get analysis from Claude"""
         try:
-            response = self.claude_client.messages.create(
-                model="claude-3-sonnet-20240229",
-                max_tokens=150,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
+            options = {}
+            if Config.AI_STRUCTURED_OUTPUT:
+                # Forcing the tool call makes Claude answer with schema-shaped JSON
+                options['tools'] = [ANALYSIS_TOOL]
+                options['tool_choice'] = {'type': 'tool', 'name': ANALYSIS_TOOL_NAME}
+            if Config.AI_STREAMING:
+                options['stream'] = True
+
+            response = await self.resilience.call(
+                'anthropic.messages', self.claude_client.messages.create,
+                idempotent=True,
+                model=model,
+                max_tokens=prompt.max_tokens,
+                system=prompt.anthropic_system(),
+                messages=prompt.anthropic_messages(),
+                **options
             )
+            if Config.AI_STREAMING:
+                return await self._read_stream(response, self._claude_event_text, 'claude')
             
-            if response.content:
-                return self._parse_ai_response(response.content[0].text, "claude")
+            for block in response.content or []:
+                if block.type == 'tool_use':
+                    return self._parse_ai_response(block.input, "claude")
+                if block.type == 'text':
+                    return self._parse_ai_response(block.text, "claude")
             return None
         except Exception as e:
             logging.error(f"Claude analysis error: {str(e)}")
             return None
 
-    async def analyze_market(self, market_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Get analysis from both AIs and combine insights"""
+    @staticmethod
+    def _gpt_chunk_text(chunk: Any) -> str:
+        if chunk.choices and chunk.choices[0].delta.content:
+            return chunk.choices[0].delta.content
+        return ''
+
+    @staticmethod
+    def _claude_event_text(event: Any) -> str:
+        if event.type != 'content_block_delta':
+            return ''
+        delta = event.delta
+        if delta.type == 'text_delta':
+            return delta.text
+        if delta.type == 'input_json_delta':
+            return delta.partial_json
+        return ''
+
+    async def _read_stream(self, stream: Any, extract_text, source: str) -> Optional[Dict[str, Any]]:
+        """
+        Parse a streamed completion as it arrives. Once the decision is HOLD
+        or the confidence is clearly below the trading threshold, the rest
+        of the generation is cancelled and the partial result returned.
+        """
+        parser = StreamingDecisionParser()
+        cutoff = Config.MIN_CONFIDENCE_THRESHOLD - Config.STREAM_CONFIDENCE_MARGIN
+        try:
+            async for event in stream:
+                parser.feed(extract_text(event))
+                if parser.should_stop(cutoff):
+                    result = parser.result(source)
+                    captured = _call_response.get()
+                    if captured is not None:
+                        captured.update({'raw': parser.text, 'source': source, 'early_exit': True})
+                    if result:
+                        result['early_exit'] = True
+                        logging.info(
+                            f"{source} stream cut off early: {parser.decision} "
+                            f"(confidence {parser.confidence})"
+                        )
+                    return result
+        finally:
+            # Closing the stream stops generation (and billing) server-side
+            await stream.close()
+        return self._parse_ai_response(parser.text, source)
+
+    async def analyze_market(self, market_data: Dict[str, Any],
+                             quorum: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get analysis from the routed AIs and combine insights. `quorum`
+        overrides how many models must answer (e.g. per market regime).
+        """
         try:
             prompt = self._create_analysis_prompt(market_data)
 
-            # Get analysis from both AIs
-            gpt_analysis = await self._get_gpt_analysis(prompt)
-            claude_analysis = await self._get_claude_analysis(prompt)
-
-            if gpt_analysis and claude_analysis:
-                return {
-                    'gpt_analysis': gpt_analysis,
-                    'claude_analysis': claude_analysis,
-                    'gpt_confidence': gpt_analysis.get('confidence', 0),
-                    'claude_confidence': claude_analysis.get('confidence', 0),
-                    'agreement': gpt_analysis.get('direction') == claude_analysis.get('direction'),
-                    'recommended_direction': gpt_analysis.get('direction'),
-                    'average_confidence': (gpt_analysis.get('confidence', 0) +
-                                        claude_analysis.get('confidence', 0)) / 2,
-                    'should_trade': (
-                        gpt_analysis.get('direction') == claude_analysis.get('direction') and
-                        (gpt_analysis.get('confidence', 0) + claude_analysis.get('confidence', 0)) / 2 >= Config.MIN_CONFIDENCE_THRESHOLD
-                    )
-                }
-            return None
+            # Identical market data gets the same answer; don't pay for it twice
+            digest = prompt.digest if quorum is None else f"{prompt.digest}:{quorum}"
+            cached = self._get_cached_analysis(digest)
+            if cached:
+                self._record(market_data, prompt, quorum, {}, cached)
+                return cached
+
+            # The router picks providers, hedges slow ones and applies the
+            # configured consensus rule
+            responses = {} if self.recorder else None
+            token = _decision_responses.set(responses)
+            try:
+                analysis = await self.router.decide(prompt, quorum)
+            finally:
+                _decision_responses.reset(token)
+            if analysis and not analysis.get('early_exit'):
+                self._store_analysis(digest, analysis)
+            self._record(market_data, prompt, quorum, responses, analysis)
+            return analysis
         except Exception as e:
             logging.error(f"Error in market analysis: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+
+    def _record(self, market_data: Dict[str, Any], prompt: PromptRequest, quorum: Optional[int],
+                responses: Optional[Dict[str, Dict[str, Any]]], analysis: Optional[Dict[str, Any]]):
+        """Keep the decision and its raw responses for replay, if recording"""
+        if self.recorder is not None:
+            self.recorder.record(market_data, prompt.digest, quorum, responses or {}, analysis)
\ No newline at end of file
@@ -0,0 +1,227 @@
+import json
+import re
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
+
+# Tool name used for Claude's structured output
+ANALYSIS_TOOL_NAME = 'record_analysis'
+
+# Alternative spellings models use for our keys
+KEY_ALIASES = {
+    'direction': 'decision',
+    'action': 'decision',
+    'signal': 'decision',
+    'stoploss': 'stop_loss',
+    'stop_loss_percentage': 'stop_loss',
+    'takeprofit': 'take_profit',
+    'take_profit_percentage': 'take_profit',
+    'risk_level': 'risk',
+    'risk_score': 'risk'
+}
+
+
+def _to_number(value: Any) -> Any:
+    """Accept '1.5%', ' 80 ' or '[75]' for numeric fields"""
+    if isinstance(value, str):
+        cleaned = value.strip().strip('[]').replace('%', '').strip()
+        try:
+            return float(cleaned)
+        except ValueError:
+            return value
+    return value
+
+
+class AnalysisResult(BaseModel):
+    """A single model's trading recommendation"""
+    model_config = ConfigDict(extra='ignore')
+
+    decision: Literal['BUY', 'SELL', 'HOLD']
+    confidence: float = Field(ge=0, le=100)
+    stop_loss: float = Field(gt=0, le=100, description='percentage')
+    take_profit: float = Field(gt=0, le=100, description='percentage')
+    risk: int = Field(ge=1, le=10)
+
+    @field_validator('decision', mode='before')
+    @classmethod
+    def _normalize_decision(cls, value: Any) -> Any:
+        if isinstance(value, str):
+            return value.strip().strip('[]').upper()
+        return value
+
+    @field_validator('confidence', 'stop_loss', 'take_profit', mode='before')
+    @classmethod
+    def _normalize_number(cls, value: Any) -> Any:
+        return _to_number(value)
+
+    @field_validator('risk', mode='before')
+    @classmethod
+    def _normalize_risk(cls, value: Any) -> Any:
+        value = _to_number(value)
+        return round(value) if isinstance(value, float) else value
+
+
+FIELDS = list(AnalysisResult.model_fields)
+
+# JSON schema handed to the providers (OpenAI prompt, Claude tool input)
+ANALYSIS_JSON_SCHEMA = AnalysisResult.model_json_schema()
+
+ANALYSIS_TOOL = {
+    'name': ANALYSIS_TOOL_NAME,
+    'description': 'Record the trading recommendation for this market',
+    'input_schema': ANALYSIS_JSON_SCHEMA
+}
+
+
+def _repair_json(text: str) -> Optional[Dict[str, Any]]:
+    """Fix the formatting defects models commonly produce and parse the object"""
+    text = text.strip()
+
+    # Markdown code fences
+    text = re.sub(r'^```(?:json)?\s*|\s*```$', '', text, flags=re.IGNORECASE)
+
+    # Prose around the object
+    start, end = text.find('{'), text.rfind('}')
+    if start == -1:
+        return None
+    text = text[start:end + 1] if end > start else text[start:] + '}'
+
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    text = re.sub(r"'([^'\"]*)'", r'"\1"', text)                               # 'quotes'
+    text = re.sub(r'([{,]\s*)([A-Za-z_][A-Za-z0-9_ ]*?)\s*:', r'\1"\2":', text)  # bare keys
+    text = re.sub(r'(\d+(?:\.\d+)?)\s*%', r'\1', text)                          # 75%
+    text = re.sub(r':\s*([A-Za-z]+)\s*([,}])', r': "\1"\2', text)               # bare words
+    text = re.sub(r',\s*([}\]])', r'\1', text)                                  # trailing commas
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return None
+
+
+def _parse_lines(text: str) -> Dict[str, Any]:
+    """Parse the legacy 'KEY: value' line format"""
+    values = {}
+    for line in text.strip().split('\n'):
+        if ':' not in line:
+            continue
+        key, value = [x.strip() for x in line.split(':', 1)]
+        values[key.strip('-* ').lower()] = value
+    return values
+
+
+def _normalize_keys(data: Dict[str, Any]) -> Dict[str, Any]:
+    normalized = {}
+    for key, value in data.items():
+        key = str(key).strip().lower().replace(' ', '_').replace('-', '_')
+        normalized[KEY_ALIASES.get(key, key)] = value
+    return normalized
+
+
+def validate_analysis(data: Dict[str, Any], source: str) -> Optional[Dict[str, Any]]:
+    """
+    Validate raw fields against AnalysisResult.
+
+    Invalid or missing fields are dropped instead of failing the whole
+    result; they are listed under 'missing' and 'partial' is set. Returns
+    None only when there is no usable decision.
+    """
+    data = _normalize_keys(data)
+    try:
+        fields = AnalysisResult.model_validate(data).model_dump()
+        missing: List[str] = []
+    except ValidationError as e:
+        bad = {error['loc'][0] for error in e.errors() if error['loc']}
+        missing = [name for name in FIELDS if name in bad]
+        fields = {}
+        for name in FIELDS:
+            if name in bad:
+                continue
+            # Validate each remaining field on its own
+            try:
+                fields[name] = AnalysisResult.__pydantic_validator__.validate_assignment(
+                    AnalysisResult.model_construct(), name, data[name]
+                ).__dict__[name]
+            except (ValidationError, KeyError):
+                missing.append(name)
+
+    if 'decision' not in fields:
+        return None
+
+    result = {
+        'direction': fields['decision'],
+        'source': source
+    }
+    for name in ('confidence', 'stop_loss', 'take_profit', 'risk'):
+        if name in fields:
+            result[name] = fields[name]
+    if missing:
+        result['partial'] = True
+        result['missing'] = missing
+    return result
+
+
+def parse_analysis(response: Any, source: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse a model response (dict from a tool call, JSON text or the legacy
+    line format) into a validated, possibly partial, analysis dict.
+    """
+    if isinstance(response, dict):
+        return validate_analysis(response, source)
+    if not response:
+        return None
+
+    data = _repair_json(response) if '{' in response else None
+    if not isinstance(data, dict):
+        data = _parse_lines(response)
+    return validate_analysis(data, source)
+
+
+class StreamingDecisionParser:
+    """
+    Incrementally extracts DECISION and CONFIDENCE from a streamed response
+    (line format, JSON text or tool-call JSON deltas) so generation can be
+    cut off as soon as the outcome is known.
+    """
+
+    _DECISION = re.compile(r'"?(?:decision|direction)"?\s*[:=]\s*"?\[?\s*(BUY|SELL|HOLD)\b', re.IGNORECASE)
+    # A trailing non-digit proves the number is complete ("8" may become "85")
+    _CONFIDENCE = re.compile(r'"?confidence"?\s*[:=]\s*"?\[?\s*(\d+(?:\.\d+)?)(?=[^\d.])', re.IGNORECASE)
+
+    def __init__(self):
+        self.text = ''
+        self.decision: Optional[str] = None
+        self.confidence: Optional[float] = None
+
+    def feed(self, chunk: str):
+        """Add a streamed chunk and update the fields seen so far"""
+        if not chunk:
+            return
+        self.text += chunk
+        if self.decision is None:
+            match = self._DECISION.search(self.text)
+            if match:
+                self.decision = match.group(1).upper()
+        if self.confidence is None:
+            match = self._CONFIDENCE.search(self.text)
+            if match:
+                self.confidence = float(match.group(1))
+
+    def should_stop(self, min_confidence: float) -> bool:
+        """True once the response can no longer lead to a trade"""
+        if self.decision == 'HOLD':
+            return True
+        return self.confidence is not None and self.confidence < min_confidence
+
+    def result(self, source: str) -> Optional[Dict[str, Any]]:
+        """Best-effort analysis from the text received so far"""
+        result = parse_analysis(self.text, source)
+        if result is None and self.decision:
+            result = {'direction': self.decision, 'source': source,
+                      'partial': True, 'missing': [f for f in FIELDS if f != 'decision']}
+            if self.confidence is not None:
+                result['confidence'] = self.confidence
+                result['missing'].remove('confidence')
+        return result
@@ -0,0 +1,48 @@
+from typing import Any, Dict, List
+from .market_data import MarketDataManager
+
+# Klines in the format returned by Binance: [open_time, open, high, low, close, volume, ...]
+WINDOW = 24  # candles of history per decision, same as the live loop
+
+
+def backtest_signals(klines: List[list], horizon: int = 6) -> Dict[str, Any]:
+    """
+    Walk forward over historical klines and measure what the live indicators
+    would have said at each step against the return `horizon` candles later.
+    """
+    calc = MarketDataManager()
+    closes = [float(k[4]) for k in klines]
+    by_trend: Dict[str, List[float]] = {}
+    by_rsi: Dict[str, List[float]] = {}
+
+    for t in range(WINDOW, len(klines) - horizon):
+        window = klines[t - WINDOW:t]
+        trend = calc._calculate_trend(window)
+        rsi = calc._calculate_indicators(window).get('rsi_14', 50.0)
+        forward_return = (closes[t - 1 + horizon] / closes[t - 1] - 1) * 100
+
+        by_trend.setdefault(trend, []).append(forward_return)
+        if rsi < 30:
+            bucket = 'oversold'
+        elif rsi > 70:
+            bucket = 'overbought'
+        else:
+            bucket = 'neutral'
+        by_rsi.setdefault(bucket, []).append(forward_return)
+
+    def summarize(groups: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+        return {
+            label: {
+                'count': len(returns),
+                'avg_return': sum(returns) / len(returns),
+                'hit_rate': sum(1 for r in returns if r > 0) / len(returns) * 100
+            }
+            for label, returns in groups.items()
+        }
+
+    return {
+        'candles': len(klines),
+        'horizon': horizon,
+        'trend': summarize(by_trend),
+        'rsi': summarize(by_rsi)
+    }
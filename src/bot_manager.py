@@ -1,29 +1,158 @@
-from py3cw.request import Py3CW
 import logging
-from typing import Dict, Any, List, Optional
+from collections import deque
+from typing import Deque, Dict, Any, Iterable, List, Optional, Tuple
 from datetime import datetime
 from config.config import Config
+from .resilience import CircuitOpenError, get_resilience_manager
+from .utils.symbols import get_symbol_table
+
+# 3Commas status codes worth retrying; None means the request never got a response
+TRANSIENT_STATUS_CODES = {None, 429, 500, 502, 503, 504}
+
+# Safety-order ladder every bot is created with
+LADDER_DEFAULTS = {
+    'base_order_volume': Config.BASE_TRADE_AMOUNT,
+    'safety_order_volume': Config.BASE_TRADE_AMOUNT,
+    'martingale_volume_coefficient': 1.5,
+    'martingale_step_coefficient': 1.0,
+    'max_safety_orders': Config.MAX_SAFETY_ORDERS,
+    'safety_order_step_percentage': 2.5,
+    'take_profit': Config.TAKE_PROFIT_PERCENTAGE,
+    'stop_loss_percentage': Config.STOP_LOSS_PERCENTAGE
+}
+
+
+class ThreeCommasTransientError(Exception):
+    """A 3Commas error caused by the service rather than the request"""
+
+    def __init__(self, error: Dict[str, Any]):
+        super().__init__(error.get('msg', 'Unknown 3Commas error'))
+        self.error = error
+
 
 class BotManager:
     def __init__(self):
         """Initialize 3Commas bot manager"""
-        self.p3cw = Py3CW(
-            key=Config.THREE_COMMAS_API_KEY,
-            secret=Config.THREE_COMMAS_SECRET,
-            request_options={
-                'request_timeout': 30,
-                'nr_of_retries': 3
-            }
-        )
+        self._p3cw = None
+        self.resilience = get_resilience_manager()
         self.active_bots: Dict[str, int] = {}  # pair -> bot_id mapping
-        self.deal_history: List[Dict] = []
+        # Completed deals seen via get_bot_deals, newest last
+        self.deal_history: Deque[Dict] = deque(maxlen=Config.DEAL_HISTORY_SIZE)
+        self._seen_deals: set = set()
+        self.applied_settings: Dict[int, Dict[str, Any]] = {}  # bot_id -> last settings
+        # pair -> id of a pruned bot, reused if the pair returns (one per
+        # pair ever traded, so bounded by the pair universe)
+        self.retired_bots: Dict[str, int] = {}
         
+    @property
+    def p3cw(self):
+        """3Commas client, created on first use"""
+        if self._p3cw is None:
+            from py3cw.request import Py3CW
+            self._p3cw = Py3CW(
+                key=Config.THREE_COMMAS_API_KEY,
+                secret=Config.THREE_COMMAS_SECRET,
+                request_options={
+                    'request_timeout': Config.THREE_COMMAS_TIMEOUT,
+                    # Retries and backoff are handled by the resilience layer
+                    'nr_of_retries': 0
+                }
+            )
+        return self._p3cw
+
+    def get_state(self) -> Dict[str, Any]:
+        """Export bot mapping and last applied settings for a state snapshot"""
+        return {
+            'active_bots': self.active_bots,
+            'applied_settings': self.applied_settings,
+            'retired_bots': self.retired_bots
+        }
+
+    def restore_state(self, state: Dict[str, Any]):
+        """Restore bot mapping and last applied settings from a state snapshot"""
+        self.active_bots.update(state.get('active_bots', {}))
+        self.applied_settings.update(state.get('applied_settings', {}))
+        self.retired_bots.update(state.get('retired_bots', {}))
+
+    def prune_bots(self, pairs: Iterable[str]):
+        """
+        Drop all but the Config.INACTIVE_BOTS_KEPT most recently added bots
+        of pairs not in `pairs` from the active set. Their ids are kept in
+        retired_bots so create_bot reuses them instead of leaving a live
+        3Commas bot unmanaged. They are not disabled here: in sharded mode
+        the pair and its bot may have moved to another worker.
+        """
+        pairs = set(pairs)
+        inactive = [pair for pair in self.active_bots if pair not in pairs]
+        for pair in inactive[:max(0, len(inactive) - Config.INACTIVE_BOTS_KEPT)]:
+            bot_id = self.active_bots.pop(pair)
+            self.applied_settings.pop(bot_id, None)
+            self.retired_bots[pair] = bot_id
+
+    async def _reuse_bot(self, pair: str) -> Optional[Dict]:
+        """Re-enable the retired bot of a returning pair"""
+        bot_id = self.retired_bots[pair]
+        if not await self.start_bot(bot_id):
+            return None
+        del self.retired_bots[pair]
+        self.active_bots[pair] = bot_id
+        logging.info(f"Reusing retired bot {bot_id} for {pair}")
+        return {'id': bot_id, 'pairs': [pair], 'is_enabled': True}
+
+    def _record_deals(self, deals: List[Dict]):
+        """Append completed deals not seen before to the bounded history"""
+        for deal in reversed(deals):
+            deal_id = deal.get('id')
+            if deal_id in self._seen_deals:
+                continue
+            if len(self.deal_history) == self.deal_history.maxlen:
+                self._seen_deals.discard(self.deal_history[0].get('id'))
+            self.deal_history.append(deal)
+            self._seen_deals.add(deal_id)
+
+    async def _request(self, entity: str, action: str = '',
+                       action_id: Optional[str] = None,
+                       payload: Optional[Dict[str, Any]] = None,
+                       idempotent: bool = False,
+                       read: bool = False) -> Tuple[Optional[Dict], Any]:
+        """
+        Make a 3Commas request through the shared resilience layer.
+
+        Returns py3cw's (error, response) pair. Service-side failures count
+        against the endpoint's circuit breaker; request errors (4xx) are
+        returned as-is. Idempotent requests are retried; reads (`read=True`)
+        are also hedged, writes never are (the API is rate limited).
+        """
+        def send():
+            error, response = self.p3cw.request(
+                entity=entity,
+                action=action,
+                action_id=action_id,
+                payload=payload
+            )
+            if error and error.get('status_code') in TRANSIENT_STATUS_CODES:
+                raise ThreeCommasTransientError(error)
+            return error, response
+
+        try:
+            return await self.resilience.call(
+                f'3commas.{entity}.{action or "list"}', send,
+                idempotent=idempotent or read,
+                blocking=True,
+                hedge_delay=Config.HEDGE_DELAY if read else None
+            )
+        except ThreeCommasTransientError as e:
+            return e.error, None
+        except CircuitOpenError as e:
+            return {'error': True, 'msg': str(e), 'status_code': None}, None
+
     async def verify_credentials(self) -> bool:
         """Verify 3Commas API credentials"""
         try:
-            error, response = self.p3cw.request(
+            error, response = await self._request(
                 entity='accounts',
                 action='',
+                read=True
             )
             
             if error:
@@ -38,9 +167,10 @@ class BotManager:
     async def get_account_info(self) -> Optional[Dict]:
         """Get primary account information"""
         try:
-            error, accounts = self.p3cw.request(
+            error, accounts = await self._request(
                 entity='accounts',
                 action='',
+                read=True
             )
             
             if error:
@@ -58,35 +188,38 @@ class BotManager:
             return None
             
     async def create_bot(self, pair: str) -> Optional[Dict]:
-        """Create a new DCA bot for a trading pair"""
+        """Create a new DCA bot for a trading pair (or reuse its retired one)"""
         try:
+            if pair in self.retired_bots:
+                return await self._reuse_bot(pair)
+
             # Get account info first
             account = await self.get_account_info()
             if not account:
                 return None
                 
             # Create bot with account ID
-            error, bot = self.p3cw.request(
+            error, bot = await self._request(
                 entity='bots',
                 action='create_bot',
                 payload={
                     'name': f'AI_Bot_{pair}_{datetime.now().strftime("%Y%m%d")}',
                     'account_id': account['id'],
-                    'pairs': pair,
-                    'base_order_volume': Config.BASE_TRADE_AMOUNT,
-                    'take_profit': Config.TAKE_PROFIT_PERCENTAGE,
-                    'safety_order_volume': Config.BASE_TRADE_AMOUNT,
-                    'martingale_volume_coefficient': 1.5,
-                    'martingale_step_coefficient': 1.0,
-                    'max_safety_orders': Config.MAX_SAFETY_ORDERS,
+                    'pairs': get_symbol_table().to_venue(pair, '3commas'),
+                    'base_order_volume': LADDER_DEFAULTS['base_order_volume'],
+                    'take_profit': LADDER_DEFAULTS['take_profit'],
+                    'safety_order_volume': LADDER_DEFAULTS['safety_order_volume'],
+                    'martingale_volume_coefficient': LADDER_DEFAULTS['martingale_volume_coefficient'],
+                    'martingale_step_coefficient': LADDER_DEFAULTS['martingale_step_coefficient'],
+                    'max_safety_orders': LADDER_DEFAULTS['max_safety_orders'],
                     'active_safety_orders_count': Config.MAX_SAFETY_ORDERS,
-                    'safety_order_step_percentage': 2.5,
+                    'safety_order_step_percentage': LADDER_DEFAULTS['safety_order_step_percentage'],
                     'take_profit_type': 'total',
                     'strategy_list': [{'strategy': 'nonstop'}],
                     'min_volume_btc_24h': 0,
                     'profit_currency': 'quote_currency',
                     'start_order_type': 'limit',
-                    'stop_loss_percentage': Config.STOP_LOSS_PERCENTAGE,
+                    'stop_loss_percentage': LADDER_DEFAULTS['stop_loss_percentage'],
                     'cooldown': 1  # Minutes to wait between deals
                 }
             )
@@ -107,7 +240,7 @@ class BotManager:
                                 settings: Dict[str, Any]) -> bool:
         """Update existing bot settings"""
         try:
-            error, response = self.p3cw.request(
+            error, response = await self._request(
                 entity='bots',
                 action='update',
                 action_id=str(bot_id),
@@ -118,6 +251,7 @@ class BotManager:
                 logging.error(f"Error updating bot {bot_id}: {error}")
                 return False
                 
+            self.applied_settings.setdefault(bot_id, {}).update(settings)
             logging.info(f"Successfully updated bot {bot_id} settings")
             return True
             
@@ -125,9 +259,38 @@ class BotManager:
             logging.error(f"Error in update_bot_settings: {str(e)}")
             return False
             
+    def get_ladder(self, bot_id: int, settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """The bot's ladder settings as last applied, with optional overrides"""
+        ladder = dict(LADDER_DEFAULTS)
+        ladder.update(self.applied_settings.get(bot_id, {}))
+        ladder.update(settings or {})
+        return ladder
+
+    def check_ladder(self, bot_id: int, settings: Dict[str, Any],
+                     price_history: List[float]) -> List[str]:
+        """Simulate the bot's ladder with new settings; returns any problems"""
+        from .dca_simulator import check_ladder
+
+        ladder = self.get_ladder(bot_id, settings)
+        return check_ladder(
+            ladder, price_history,
+            max_capital=Config.LADDER_MAX_CAPITAL,
+            max_stop_out_rate=Config.LADDER_MAX_STOP_OUT_RATE,
+            horizon=Config.LADDER_CHECK_HORIZON
+        )
+
     async def apply_ai_recommendations(self, bot_id: int, 
-                                     recommendations: Dict[str, Any]) -> bool:
-        """Apply AI trading recommendations to bot settings"""
+                                     recommendations: Dict[str, Any],
+                                     price_history: Optional[List[float]] = None,
+                                     sizing: Optional[Dict[str, float]] = None,
+                                     ladder: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Apply AI trading recommendations to bot settings. `sizing` carries
+        order volumes from the portfolio allocator and `ladder` a preset of
+        safety-order settings (max_safety_orders in it is a cap). With a
+        price history the resulting ladder is simulated first and rejected
+        if it breaks the capital or stop-out limits.
+        """
         try:
             if not recommendations.get('should_trade', False):
                 logging.info(f"Skipping bot update - AI doesn't recommend trading")
@@ -152,6 +315,20 @@ class BotManager:
                     else 1
                 )
             }
+            if ladder:
+                new_settings.update({k: v for k, v in ladder.items() if k != 'max_safety_orders'})
+                if 'max_safety_orders' in ladder:
+                    new_settings['max_safety_orders'] = min(new_settings['max_safety_orders'],
+                                                            ladder['max_safety_orders'])
+            if sizing:
+                new_settings['base_order_volume'] = sizing['base_order_volume']
+                new_settings['safety_order_volume'] = sizing['safety_order_volume']
+
+            if price_history:
+                problems = self.check_ladder(bot_id, new_settings, price_history)
+                if problems:
+                    logging.warning(f"Rejected settings for bot {bot_id}: {'; '.join(problems)}")
+                    return False
             
             success = await self.update_bot_settings(bot_id, new_settings)
             if success:
@@ -171,21 +348,24 @@ class BotManager:
                            limit: int = 10) -> List[Dict]:
         """Get recent deals for a specific bot"""
         try:
-            error, deals = self.p3cw.request(
+            error, deals = await self._request(
                 entity='bots',
                 action='show',
                 action_id=str(bot_id),
                 payload={
                     'limit': limit,
                     'scope': 'completed'
-                }
+                },
+                read=True
             )
             
             if error:
                 logging.error(f"Error getting bot deals: {error}")
                 return []
                 
-            return deals.get('completed_deals', [])
+            completed = deals.get('completed_deals', [])
+            self._record_deals(completed)
+            return completed
             
         except Exception as e:
             logging.error(f"Error in get_bot_deals: {str(e)}")
@@ -194,10 +374,11 @@ class BotManager:
     async def start_bot(self, bot_id: int) -> bool:
         """Start a bot"""
         try:
-            error, response = self.p3cw.request(
+            error, response = await self._request(
                 entity='bots',
                 action='enable',
-                action_id=str(bot_id)
+                action_id=str(bot_id),
+                idempotent=True
             )
             
             if error:
@@ -214,10 +395,11 @@ class BotManager:
     async def stop_bot(self, bot_id: int) -> bool:
         """Stop a bot"""
         try:
-            error, response = self.p3cw.request(
+            error, response = await self._request(
                 entity='bots',
                 action='disable',
-                action_id=str(bot_id)
+                action_id=str(bot_id),
+                idempotent=True
             )
             
             if error:
@@ -234,10 +416,11 @@ class BotManager:
     async def get_bot_stats(self, bot_id: int) -> Optional[Dict]:
         """Get bot performance statistics"""
         try:
-            error, stats = self.p3cw.request(
+            error, stats = await self._request(
                 entity='bots',
                 action='stats',
-                action_id=str(bot_id)
+                action_id=str(bot_id),
+                read=True
             )
             
             if error:
@@ -257,7 +440,7 @@ class BotManager:
             await self.stop_bot(bot_id)
             
             # Then panic sell all deals
-            error, response = self.p3cw.request(
+            error, response = await self._request(
                 entity='bots',
                 action='panic_sell_all_deals',
                 action_id=str(bot_id)
@@ -277,12 +460,13 @@ class BotManager:
     async def get_active_deals_count(self) -> int:
         """Get number of currently active deals across all bots"""
         try:
-            error, deals = self.p3cw.request(
+            error, deals = await self._request(
                 entity='deals',
                 action='',
                 payload={
                     'scope': 'active'
-                }
+                },
+                read=True
             )
             
             if error:
@@ -0,0 +1,368 @@
+"""
+Command line entry point.
+
+    python -m src run
+    python -m src run --paper --status 127.0.0.1:8780
+    python -m src run --paper --trace-memory
+    python -m src scan --pairs BTCUSDT ETHUSDT
+    python -m src backtest --symbol BTCUSDT --days 30
+    python -m src replay data/decisions.log --version strict=versions/strict.json
+    python -m src check-services
+    python -m src bench
+    python -m src soak --days 30
+    python -m src coordinator --address 127.0.0.1:8765
+    python -m src worker --id worker-1 --address 127.0.0.1:8765
+
+Only argparse and the standard library are imported at module level; each
+subcommand imports the components (and SDKs) it needs when it runs.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from typing import List, Optional
+
+# Upper bound for `import src.cli` in a fresh interpreter (checked by tests
+# and reported by `bench`)
+IMPORT_TIME_BUDGET = 0.25  # seconds
+
+# Modules that must not be imported just by loading the CLI
+HEAVY_MODULES = ('binance', 'py3cw', 'openai', 'anthropic', 'dotenv', 'numpy', 'pandas')
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    """Run the trading bot"""
+    from config.config import Config
+    if args.paper:
+        Config.EXECUTION_BACKEND = 'paper'
+    if args.status:
+        Config.STATUS_ENABLED = True
+        if args.status is not True:
+            Config.STATUS_ADDRESS = args.status
+    if args.trace_memory:
+        Config.MEMORY_TRACE = True
+    from main import configure_logging, main as run_bot
+    # The bot also logs to logs/trading.log
+    configure_logging(logging.DEBUG if args.verbose else logging.INFO)
+    asyncio.run(run_bot())
+    return 0
+
+
+def cmd_scan(args: argparse.Namespace) -> int:
+    """Print current market data for each pair"""
+    from config.config import Config
+    from src.market_data import MarketDataManager
+
+    pairs = args.pairs or Config.TRADING_PAIRS
+    manager = MarketDataManager()
+
+    async def scan():
+        return await asyncio.gather(*(manager.get_market_data(p) for p in pairs))
+
+    print(f"{'PAIR':<12}{'PRICE':>14}{'24H %':>9}{'TREND':>10}{'VOL':>8}{'RSI':>8}")
+    for pair, data in zip(pairs, asyncio.run(scan())):
+        if not data:
+            print(f"{pair:<12}{'unavailable':>14}")
+            continue
+        print(
+            f"{pair:<12}{data['current_price']:>14.4f}"
+            f"{data['price_change_24h']:>9.2f}{data['trend']:>10}"
+            f"{data['volatility']:>8.2f}"
+            f"{data['indicators'].get('rsi_14', float('nan')):>8.1f}"
+        )
+    return 0
+
+
+def cmd_backtest(args: argparse.Namespace) -> int:
+    """Replay indicator signals over historical data"""
+    from src.backtest import backtest_signals
+    from src.market_data import MarketDataManager
+
+    history = asyncio.run(
+        MarketDataManager().get_historical_data(args.symbol, days=args.days)
+    )
+    if not history:
+        print(f"No historical data for {args.symbol}")
+        return 1
+
+    klines = [[c['timestamp'], c['open'], c['high'], c['low'], c['close'], c['volume']]
+              for c in history]
+    report = backtest_signals(klines, horizon=args.horizon)
+
+    print(f"\nBacktest {args.symbol}: {report['candles']} candles, "
+          f"{report['horizon']}h forward returns")
+    for section in ('trend', 'rsi'):
+        print(f"\nBy {section}:")
+        for label, stats in sorted(report[section].items()):
+            print(f"  {label:<12} n={stats['count']:<5} "
+                  f"avg={stats['avg_return']:+.3f}%  hit={stats['hit_rate']:.1f}%")
+    return 0
+
+
+def cmd_replay(args: argparse.Namespace) -> int:
+    """Re-run analyzer versions over recorded decisions and compare them"""
+    from src.replay import RECORDED, load_version, run_replay
+
+    versions = dict(load_version(spec) for spec in args.version or ['current'])
+    report = run_replay(args.recording, versions, live=args.live, cache_path=args.cache,
+                        horizon=args.horizon * 3600 if args.horizon else None)
+
+    print(f"\nReplayed {report['records']} decisions\n")
+    print(f"{'VERSION':<14}{'DECIDED':>8}{'TRADES':>8}{'CONF':>8}{'PNL $':>10}"
+          f"{'AGREE':>8}{'dCONF':>8}{'dPNL $':>10}{'MISSED':>8}")
+    for name, summary in report['versions'].items():
+        confidence = summary['avg_confidence']
+        line = (f"{name:<14}{summary['decisions']:>8}{summary['trades']:>8}"
+                f"{confidence if confidence is not None else float('nan'):>8.1f}"
+                f"{summary['pnl_usd']:>10.2f}")
+        if name != RECORDED:
+            diff = summary['vs_recorded']
+            agreement = diff['agreement'] if diff['agreement'] is not None else float('nan')
+            shift = diff['confidence_shift'] if diff['confidence_shift'] is not None else float('nan')
+            line += (f"{agreement * 100:>7.1f}%{shift:>+8.1f}{diff['pnl_diff_usd']:>+10.2f}"
+                     f"{summary['calls']['missed']:>8}")
+        print(line)
+    return 0
+
+
+def cmd_check_services(args: argparse.Namespace) -> int:
+    """Check connectivity to every external service"""
+    from src.ai_analyzer import AIAnalyzer
+    from src.bot_manager import BotManager
+    from src.market_data import MarketDataManager
+
+    test_data = {
+        'current_price': 50000,
+        'price_change_24h': 2.5,
+        'volume_24h': 1000000000,
+        'trend': 'bullish',
+        'indicators': {
+            'rsi_14': 55,
+            'price_vs_sma': 1.2
+        }
+    }
+
+    async def check():
+        analyzer = AIAnalyzer()
+        prompt = analyzer._create_analysis_prompt(test_data)
+        checks = {
+            'Binance': MarketDataManager().get_market_data('BTCUSDT'),
+            'OpenAI': analyzer._get_gpt_analysis(prompt),
+            'Claude': analyzer._get_claude_analysis(prompt),
+            '3Commas': BotManager().verify_credentials()
+        }
+        results = await asyncio.gather(*checks.values(), return_exceptions=True)
+        return dict(zip(checks, results))
+
+    results = asyncio.run(check())
+    for name, result in results.items():
+        ok = bool(result) and not isinstance(result, Exception)
+        print(f"{name}: {'✓ Passed' if ok else '✗ Failed'}")
+    return 0 if all(bool(r) and not isinstance(r, Exception) for r in results.values()) else 1
+
+
+def cmd_coordinator(args: argparse.Namespace) -> int:
+    """Run the shard coordinator that assigns pairs to workers"""
+    from src.sharding import ShardCoordinator
+
+    async def serve():
+        coordinator = ShardCoordinator(pairs=args.pairs, address=args.address)
+        await coordinator.start()
+        try:
+            while True:
+                await asyncio.sleep(60)
+                logging.info(f"Shard status: {coordinator.get_status()}")
+        finally:
+            await coordinator.stop()
+
+    asyncio.run(serve())
+    return 0
+
+
+def cmd_worker(args: argparse.Namespace) -> int:
+    """Run a trading worker that takes its pairs from the coordinator"""
+    from config.config import Config
+    from main import TradingBot
+    from src.sharding import ShardWorker
+    from src.state_store import StateStore
+
+    async def work():
+        bot = TradingBot(pairs=[])
+        # Workers on the same host must not share a snapshot file
+        snapshot = Config.STATE_SNAPSHOT_PATH
+        bot.state_store = StateStore(snapshot.with_name(f'{snapshot.stem}-{args.id}{snapshot.suffix}'))
+        await bot.setup()
+        worker = ShardWorker(
+            args.id,
+            on_assign=bot.set_pairs,
+            on_halt=bot.halt,
+            risk_provider=bot.get_risk_report,
+            address=args.address
+        )
+        bot_task = asyncio.create_task(bot.run())
+        try:
+            # Losing the coordinator stops this worker; its pairs get
+            # reassigned to the others
+            await worker.run()
+        finally:
+            await bot.stop()
+            await bot_task
+
+    asyncio.run(work())
+    return 0
+
+
+def measure_import_time(module: str) -> float:
+    """Time `import module` in a fresh interpreter"""
+    import subprocess
+    code = (
+        "import time; t = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - t)"
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', code],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def _bench(label: str, func, iterations: int):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<28} {elapsed / iterations * 1e6:>10.1f} µs/op")
+
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    """Micro-benchmarks for startup and the per-pair hot path"""
+    print("Import time (fresh interpreter):")
+    cli_time = measure_import_time('src.cli')
+    status = 'ok' if cli_time <= IMPORT_TIME_BUDGET else 'OVER BUDGET'
+    print(f"  {'src.cli':<28} {cli_time * 1000:>10.1f} ms  "
+          f"(budget {IMPORT_TIME_BUDGET * 1000:.0f} ms, {status})")
+    for module in args.modules:
+        print(f"  {module:<28} {measure_import_time(module) * 1000:>10.1f} ms")
+
+    from src.ai_analyzer import AIAnalyzer
+    from src.market_data import MarketDataManager
+
+    klines = [[0, 0, 0, 0, str(50000 + (i % 7) * 37.5), 0] for i in range(24)]
+    market_data = MarketDataManager()
+    analyzer = AIAnalyzer()
+    sample = {
+        'current_price': 50000,
+        'price_change_24h': 2.5,
+        'volume_24h': 1000000000,
+        'trend': 'bullish',
+        'indicators': market_data._calculate_indicators(klines)
+    }
+    response = "DECISION: BUY\nCONFIDENCE: 80\nSTOP_LOSS: 1.0\nTAKE_PROFIT: 1.5\nRISK: 4"
+
+    print("\nHot path:")
+    n = args.iterations
+    _bench('indicators (24 klines)', lambda: market_data._calculate_indicators(klines), n)
+    _bench('trend + volatility', lambda: (market_data._calculate_trend(klines),
+                                          market_data._calculate_volatility(klines)), n)
+    _bench('build prompt', lambda: analyzer._create_analysis_prompt(sample), n)
+    _bench('parse response', lambda: analyzer._parse_ai_response(response, 'gpt'), n)
+    return 0
+
+
+def cmd_soak(args: argparse.Namespace) -> int:
+    """Simulate long-running operation and report memory growth"""
+    from src.memory import soak
+
+    cycles = int(args.days * 86400 / args.interval)
+    print(f"Soaking {cycles} cycles ({args.days:g} simulated days, {args.pairs} of "
+          f"{args.universe} pairs):")
+    print(f"  {'CYCLE':>8}{'RSS MB':>10}{'TRACED MB':>12}")
+    result = soak(cycles=cycles, pairs=args.pairs, universe=args.universe,
+                  churn_every=max(1, int(args.churn_hours * 3600 / args.interval)),
+                  interval=args.interval,
+                  on_sample=lambda s: print(f"  {s['cycle']:>8}{s['rss_mb']:>10.1f}{s['traced_mb']:>12.3f}"))
+    print(f"\nRSS growth {result['rss_growth_mb']:+.2f} MB, traced growth "
+          f"{result['traced_growth_kb']:+.1f} KB in {result['seconds']:.1f}s")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='python -m src',
+        description='AI-driven 3Commas DCA trading bot'
+    )
+    parser.add_argument('-v', '--verbose', action='store_true', help='debug logging')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run = subparsers.add_parser('run', help='run the trading bot')
+    run.add_argument('--paper', action='store_true',
+                     help='simulate bots in memory instead of trading on 3Commas')
+    run.add_argument('--status', nargs='?', const=True, metavar='ADDRESS',
+                     help='serve the read-only status API / dashboard (default address: Config)')
+    run.add_argument('--trace-memory', action='store_true',
+                     help='trace allocations and log the fastest growing sites')
+    run.set_defaults(func=cmd_run)
+
+    scan = subparsers.add_parser('scan', help='show current market data')
+    scan.add_argument('--pairs', nargs='+', help='pairs to scan (default: Config.TRADING_PAIRS)')
+    scan.set_defaults(func=cmd_scan)
+
+    backtest = subparsers.add_parser('backtest', help='replay indicator signals on history')
+    backtest.add_argument('--symbol', default='BTCUSDT')
+    backtest.add_argument('--days', type=int, default=30)
+    backtest.add_argument('--horizon', type=int, default=6, help='forward return horizon in candles')
+    backtest.set_defaults(func=cmd_backtest)
+
+    replay = subparsers.add_parser('replay', help='compare analyzer versions on recorded decisions')
+    replay.add_argument('recording', help='decision log written with RECORD_DECISIONS')
+    replay.add_argument('--version', action='append', metavar='NAME[=FILE.json]',
+                        help='version to replay: config overrides / analyzer class (repeatable)')
+    replay.add_argument('--live', action='store_true',
+                        help='call the LLMs for prompts with no recorded response')
+    replay.add_argument('--cache', help='file keeping responses fetched by --live replays')
+    replay.add_argument('--horizon', type=float, help='simulated holding limit in hours (default: Config)')
+    replay.set_defaults(func=cmd_replay)
+
+    subparsers.add_parser(
+        'check-services', help='check Binance, OpenAI, Claude and 3Commas connectivity'
+    ).set_defaults(func=cmd_check_services)
+
+    bench = subparsers.add_parser('bench', help='benchmark startup and hot paths')
+    bench.add_argument('--iterations', type=int, default=10000)
+    bench.add_argument('--modules', nargs='*', default=['binance', 'openai', 'anthropic', 'py3cw'],
+                       help='extra modules to time the import of')
+    bench.set_defaults(func=cmd_bench)
+
+    soak = subparsers.add_parser('soak', help='simulate days of paper trading and check memory stays flat')
+    soak.add_argument('--days', type=float, default=30)
+    soak.add_argument('--interval', type=float, default=300, help='seconds between simulated cycles')
+    soak.add_argument('--pairs', type=int, default=3, help='pairs traded at a time')
+    soak.add_argument('--universe', type=int, default=12, help='pairs rotated through')
+    soak.add_argument('--churn-hours', type=float, default=24, help='hours between pair rotations')
+    soak.set_defaults(func=cmd_soak)
+
+    coordinator = subparsers.add_parser('coordinator', help='assign pairs to sharded workers')
+    coordinator.add_argument('--address', help='host:port or unix:/path (default: Config)')
+    coordinator.add_argument('--pairs', nargs='+', help='pairs to shard (default: Config.TRADING_PAIRS)')
+    coordinator.set_defaults(func=cmd_coordinator)
+
+    worker = subparsers.add_parser('worker', help='run a sharded trading worker')
+    worker.add_argument('--id', required=True, help='unique worker id')
+    worker.add_argument('--address', help='coordinator host:port or unix:/path (default: Config)')
+    worker.set_defaults(func=cmd_worker)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
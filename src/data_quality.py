@@ -0,0 +1,180 @@
+"""
+Market data quality checks run before a snapshot reaches the indicators
+and the LLMs.
+
+Klines are checked as NumPy arrays: candle continuity (missing or
+out-of-order open times), malformed candles, isolated outliers in the
+closes (rolling median / MAD over the neighbouring candles) and
+staleness of both klines and ticker. Small problems are repaired in
+place (missing candles filled flat from the previous close, outliers
+replaced by the local median); anything else blocks the pair for this
+cycle.
+"""
+import logging
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from config.config import Config
+
+INTERVAL_MS = {
+    '1m': 60_000, '5m': 300_000, '15m': 900_000, '30m': 1_800_000,
+    '1h': 3_600_000, '4h': 14_400_000, '1d': 86_400_000
+}
+
+# Scales the median absolute deviation to a standard deviation for normal data
+MAD_SCALE = 1.4826
+
+
+def find_gaps(times: np.ndarray, interval_ms: int) -> Tuple[np.ndarray, bool]:
+    """
+    Missing candles after each row (0 where continuous), and whether the
+    open times are well ordered (strictly increasing on the interval grid)
+    """
+    steps = np.diff(times)
+    ordered = bool(np.all(steps > 0) and np.all(steps % interval_ms == 0))
+    missing = np.zeros(len(times), dtype=np.int64)
+    if ordered:
+        missing[:-1] = steps // interval_ms - 1
+    return missing, ordered
+
+
+@lru_cache(maxsize=32)
+def _neighbour_index(n: int, k: int) -> np.ndarray:
+    """Indices of the k candles on either side of each candle, reflected at the ends"""
+    index = np.arange(n)[:, None] + np.r_[-k:0, 1:k + 1]
+    index = np.abs(index)
+    return np.where(index >= n, 2 * (n - 1) - index, index)
+
+
+def _row_median(values: np.ndarray) -> np.ndarray:
+    """Median of each row (rows have an even number of values)"""
+    ordered = np.sort(values, axis=1)
+    middle = values.shape[1] // 2
+    return (ordered[:, middle - 1] + ordered[:, middle]) / 2
+
+
+def find_outliers(closes: np.ndarray, window: int, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Outlier mask and local medians. Each close is compared with the median
+    of the `window` candles on either side of it (reflected at the ends),
+    so a level shift is not flagged but an isolated print is.
+    """
+    n = len(closes)
+    if n < 3:
+        return np.zeros(n, dtype=bool), closes.copy()
+    neighbours = closes[_neighbour_index(n, min(window, n - 1))]
+    median = _row_median(neighbours)
+    mad = _row_median(np.abs(neighbours - median[:, None]))
+    # A perfectly flat neighbourhood would make any tick an outlier
+    scale = MAD_SCALE * np.maximum(mad, median * 1e-4)
+    return np.abs(closes - median) > threshold * scale, median
+
+
+class DataQualityGuard:
+    """Validates, repairs or blocks market data per pair"""
+
+    def __init__(self, window: Optional[int] = None, threshold: Optional[float] = None,
+                 max_repairs: Optional[int] = None):
+        self.window = window or Config.DQ_OUTLIER_WINDOW
+        self.threshold = threshold or Config.DQ_OUTLIER_MADS
+        self.max_repairs = Config.DQ_MAX_REPAIRS if max_repairs is None else max_repairs
+        self.checked = 0
+        self.blocked = 0
+        self.repaired = 0
+        self.issues: Counter = Counter()
+        self.last_reports: Dict[str, Dict[str, Any]] = {}
+
+    def check(self, symbol: str, ticker: Dict[str, Any], klines: List[list],
+              interval: str = '1h', now: Optional[float] = None) -> Tuple[Optional[List[list]], Dict[str, Any]]:
+        """
+        Returns (klines, report). Klines are repaired if needed, or None if
+        the pair should be skipped this cycle; report['issues'] lists what
+        was found.
+        """
+        now_ms = (now or time.time()) * 1000
+        interval_ms = INTERVAL_MS[interval]
+        issues, kinds = [], []
+        self.checked += 1
+
+        def problem(kind: str, message: str):
+            kinds.append(kind)
+            issues.append(message)
+
+        rows = np.array([row[:6] for row in klines], dtype=float).reshape(-1, 6)
+        if len(rows) < 2:
+            problem('too_few_candles', 'too few candles')
+        else:
+            times, closes = rows[:, 0].astype(np.int64), rows[:, 4]
+
+            bad = (rows[:, 1:5] <= 0).any(axis=1) | (rows[:, 2] < rows[:, 3])
+            if bad.any():
+                problem('malformed', f'{int(bad.sum())} malformed candles')
+
+            missing, ordered = find_gaps(times, interval_ms)
+            if not ordered:
+                problem('out_of_order', 'candles out of order')
+
+            # The newest candle is still open, so more than two intervals old is stale
+            age = now_ms - times[-1]
+            if age > 2 * interval_ms:
+                problem('stale_klines', f'klines stale by {age / 1000:.0f}s')
+
+            ticker_time = ticker.get('timestamp')
+            if ticker_time and now_ms - ticker_time > Config.DQ_MAX_TICKER_AGE * 1000:
+                problem('stale_ticker', f'ticker stale by {(now_ms - ticker_time) / 1000:.0f}s')
+
+            outliers, median = find_outliers(closes, self.window, self.threshold)
+            # The open candle tracks the ticker; if they agree it's a real move
+            if abs(ticker['last'] / closes[-1] - 1) <= Config.DQ_TICKER_TOLERANCE:
+                outliers[-1] = False
+            else:
+                problem('ticker_mismatch', 'ticker and last close disagree')
+
+            repairs = int(outliers.sum() + missing.sum())
+            if repairs > self.max_repairs:
+                problem('too_many_repairs',
+                        f'{int(missing.sum())} missing candles, {int(outliers.sum())} outliers')
+            elif repairs and not kinds:
+                issues.append(f'repaired {int(missing.sum())} missing candles, {int(outliers.sum())} outliers')
+                rows[:, 4] = np.where(outliers, median, closes)
+                rows = self._fill_gaps(rows, missing, interval_ms)[-len(klines):]
+                klines = [[int(row[0])] + row[1:].tolist() for row in rows]
+                self.repaired += 1
+
+        block = bool(kinds)
+        report = {'issues': issues, 'blocked': block, 'checked_at': now_ms / 1000}
+        self.last_reports[symbol] = report
+        if block:
+            self.blocked += 1
+            self.issues.update(kinds)
+            logging.warning(f"Blocked {symbol} market data: {'; '.join(issues)}")
+            return None, report
+        if issues:
+            logging.info(f"Repaired {symbol} market data: {'; '.join(issues)}")
+        return klines, report
+
+    @staticmethod
+    def _fill_gaps(rows: np.ndarray, missing: np.ndarray, interval_ms: int) -> np.ndarray:
+        """Insert flat, zero-volume candles at the previous close for missing times"""
+        if not missing.any():
+            return rows
+        counts = missing + 1
+        filled = np.repeat(rows, counts, axis=0)
+        # Offset within each run: 0 for the original row, 1..m for the fillers
+        offsets = np.arange(len(filled)) - np.repeat(np.cumsum(counts) - counts, counts)
+        fillers = offsets > 0
+        filled[:, 0] += offsets * interval_ms
+        filled[fillers, 1:4] = filled[fillers, 4:5]
+        filled[fillers, 5] = 0.0
+        return filled
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'checked': self.checked,
+            'blocked': self.blocked,
+            'repaired': self.repaired,
+            'issues': dict(self.issues),
+            'pairs': self.last_reports
+        }
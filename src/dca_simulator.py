@@ -0,0 +1,191 @@
+"""
+Vectorized simulation of 3Commas-style DCA safety-order ladders.
+
+A ladder opens a base order at the first price of a path and places
+safety orders below it. Safety order k (1-based) sits at a deviation of
+
+    step * (1 + msc + msc**2 + ... + msc**(k-1))  percent
+
+below the entry and has a volume of `safety_order_volume * mvc**(k-1)`
+(msc/mvc: martingale step/volume coefficients). The deal closes when the
+price reaches the average entry plus `take_profit` percent
+(take_profit_type 'total') or falls `stop_loss_percentage` percent below
+the average entry.
+
+All configs in the matrix are simulated at once with NumPy. Prices are
+treated as trade prices; limit orders fill at their level as soon as the
+path trades through it.
+"""
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+
+# Columns of a ladder config matrix
+LADDER_FIELDS = (
+    'base_order_volume',
+    'safety_order_volume',
+    'safety_order_step_percentage',
+    'martingale_volume_coefficient',
+    'martingale_step_coefficient',
+    'max_safety_orders',
+    'take_profit',
+    'stop_loss_percentage'
+)
+_FIELD = {name: i for i, name in enumerate(LADDER_FIELDS)}
+
+# exit_reason codes
+OPEN, TAKE_PROFIT, STOP_LOSS = 0, 1, 2
+
+# Upper bound on the (configs x prices) boolean work array per chunk
+_CHUNK_ELEMENTS = 4_000_000
+
+
+def ladder_matrix(configs: Iterable[Dict[str, Any]]) -> np.ndarray:
+    """Build a config matrix from bot settings dicts (missing stop loss = none)"""
+    return np.array([
+        [float(config.get(name) or 0) for name in LADDER_FIELDS]
+        for config in configs
+    ], dtype=float)
+
+
+def ladder_levels(configs: np.ndarray):
+    """
+    Safety order deviations (percent below entry) and volumes, shape
+    (configs, max safety orders). Orders beyond a config's
+    max_safety_orders have NaN deviation and zero volume.
+    """
+    configs = np.atleast_2d(configs)
+    max_orders = configs[:, _FIELD['max_safety_orders']].astype(int)
+    depth = int(max_orders.max()) if len(configs) else 0
+    k = np.arange(depth)
+
+    step = configs[:, _FIELD['safety_order_step_percentage'], None]
+    msc = configs[:, _FIELD['martingale_step_coefficient'], None]
+    mvc = configs[:, _FIELD['martingale_volume_coefficient'], None]
+
+    deviations = step * np.cumsum(msc ** k, axis=1)
+    volumes = configs[:, _FIELD['safety_order_volume'], None] * mvc ** k
+    active = k < max_orders[:, None]
+    return np.where(active, deviations, np.nan), np.where(active, volumes, 0.0)
+
+
+def capital_multiplier(settings: Dict[str, Any]) -> float:
+    """Full ladder capital per unit of base order volume, with safety orders sized like the base order"""
+    configs = ladder_matrix([dict(settings, base_order_volume=1, safety_order_volume=1)])
+    return float(1 + ladder_levels(configs)[1].sum())
+
+
+def _simulate_chunk(prices: np.ndarray, configs: np.ndarray) -> Dict[str, np.ndarray]:
+    n, length = len(configs), len(prices)
+    entry = prices[0]
+    deviations, volumes = ladder_levels(configs)
+    depth = deviations.shape[1]
+
+    # Fill time of each safety order: the first index where the running
+    # minimum reaches its level. The running minimum is non-increasing,
+    # so its negation is sorted and searchsorted finds every fill at once.
+    levels = entry * (1 - deviations / 100)
+    running_min = np.minimum.accumulate(prices)
+    fill_index = np.searchsorted(-running_min, -np.nan_to_num(levels, nan=-np.inf), side='left')
+    fill_index = np.where(np.isnan(levels), length, fill_index)
+
+    # Cumulative cost and quantity after 0..depth safety fills
+    base = configs[:, _FIELD['base_order_volume']]
+    level_qty = np.where(volumes > 0, volumes / np.where(np.isnan(levels), 1, levels), 0.0)
+    cum_cost = np.concatenate([base[:, None], base[:, None] + np.cumsum(volumes, axis=1)], axis=1)
+    cum_qty = np.concatenate([(base / entry)[:, None],
+                              (base / entry)[:, None] + np.cumsum(level_qty, axis=1)], axis=1)
+    avg_entry = cum_cost / cum_qty
+
+    # Safety orders filled by each time step (levels fill in order)
+    t = np.arange(length)
+    filled = (fill_index[:, :, None] <= t).sum(axis=1) if depth else np.zeros((n, length), dtype=int)
+    avg_t = np.take_along_axis(avg_entry, filled, axis=1)
+
+    tp = configs[:, _FIELD['take_profit'], None]
+    sl = configs[:, _FIELD['stop_loss_percentage'], None]
+    hit_tp = prices >= avg_t * (1 + tp / 100)
+    hit_sl = (sl > 0) & (prices <= avg_t * (1 - sl / 100))
+    hit_tp[:, 0] = hit_sl[:, 0] = False  # the deal opens at index 0
+    hit = hit_tp | hit_sl
+
+    exited = hit.any(axis=1)
+    exit_index = np.where(exited, hit.argmax(axis=1), length - 1)
+    rows = np.arange(n)
+    fills = filled[rows, exit_index]
+    reason = np.where(~exited, OPEN,
+                      np.where(hit_tp[rows, exit_index], TAKE_PROFIT, STOP_LOSS))
+
+    cost = cum_cost[rows, fills]
+    qty = cum_qty[rows, fills]
+    avg = cost / qty
+    exit_price = np.select(
+        [reason == TAKE_PROFIT, reason == STOP_LOSS],
+        [avg * (1 + tp[:, 0] / 100), avg * (1 - sl[:, 0] / 100)],
+        default=prices[-1]  # open deals are marked to the last price
+    )
+    return {
+        'fills': fills,
+        'avg_entry': avg,
+        'capital_at_risk': cost,
+        'max_capital': cum_cost[rows, configs[:, _FIELD['max_safety_orders']].astype(int)],
+        'exit_index': np.where(exited, exit_index, -1),
+        'exit_reason': reason,
+        'pnl': qty * exit_price - cost,
+        'pnl_percentage': (exit_price / avg - 1) * 100
+    }
+
+
+def simulate_ladders(prices: np.ndarray, configs: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Simulate one deal per config along a price path starting at prices[0].
+
+    Returns arrays of length len(configs):
+      fills            safety orders filled before the deal closed
+      avg_entry        average entry price at exit
+      capital_at_risk  quote currency deployed at exit
+      max_capital      quote currency the full ladder can tie up
+      exit_index       index into prices where the deal closed, -1 if open
+      exit_reason      OPEN, TAKE_PROFIT or STOP_LOSS
+      pnl              realized (or marked-to-market) profit in quote currency
+      pnl_percentage   profit relative to the average entry
+    """
+    prices = np.asarray(prices, dtype=float)
+    configs = np.atleast_2d(np.asarray(configs, dtype=float))
+    chunk = max(1, _CHUNK_ELEMENTS // (len(prices) * max(1, int(configs[:, _FIELD['max_safety_orders']].max()))))
+    parts = [_simulate_chunk(prices, configs[i:i + chunk]) for i in range(0, len(configs), chunk)]
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+def stop_out_rate(prices: np.ndarray, configs: np.ndarray,
+                  horizon: int, stride: int = 1) -> np.ndarray:
+    """
+    Share of deals, opened every `stride` steps along a historical path and
+    followed for up to `horizon` steps, that hit the stop loss (per config)
+    """
+    prices = np.asarray(prices, dtype=float)
+    starts = range(0, max(1, len(prices) - horizon), stride)
+    stops = np.zeros(len(np.atleast_2d(configs)))
+    for start in starts:
+        result = simulate_ladders(prices[start:start + horizon + 1], configs)
+        stops += result['exit_reason'] == STOP_LOSS
+    return stops / len(starts)
+
+
+def check_ladder(settings: Dict[str, Any], prices: np.ndarray,
+                 max_capital: Optional[float] = None,
+                 max_stop_out_rate: Optional[float] = None,
+                 horizon: int = 48) -> List[str]:
+    """
+    Check bot settings against a recent price history. Returns the list of
+    problems found (empty if the ladder is acceptable).
+    """
+    configs = ladder_matrix([settings])
+    problems = []
+    capital = float(ladder_levels(configs)[1].sum() + configs[0, _FIELD['base_order_volume']])
+    if max_capital is not None and capital > max_capital:
+        problems.append(f"ladder can tie up {capital:.2f}, limit is {max_capital:.2f}")
+    if max_stop_out_rate is not None and len(prices) > 1:
+        rate = float(stop_out_rate(prices, configs, min(horizon, len(prices) - 1))[0])
+        if rate > max_stop_out_rate:
+            problems.append(f"stops out in {rate:.0%} of simulated deals, limit is {max_stop_out_rate:.0%}")
+    return problems
@@ -0,0 +1,96 @@
+import json
+import logging
+import struct
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+from config.config import Config
+from .records import json_default
+
+# Append-only file of analysis decisions for replay. Records are buffered
+# and written in blocks: magic, record count, payload length and CRC32,
+# then the zlib-compressed JSON lines. A block cut short by a crash fails
+# its length or CRC check and is skipped along with anything after it.
+MAGIC = b'CTBD'
+BLOCK_HEADER = struct.Struct('<4sIII')
+
+
+class DecisionRecorder:
+    """
+    Records each analysis input and the raw LLM responses behind it.
+
+    A record holds the market_data snapshot, the prompt digest, the quorum,
+    each provider's raw response (text or tool input, and whether the
+    stream was cut off early) and the combined analysis without the
+    per-provider copies, which the raw responses reproduce.
+    """
+
+    def __init__(self, path: Union[str, Path], block_size: Optional[int] = None):
+        self.path = Path(path)
+        self.block_size = block_size or Config.DECISION_LOG_BLOCK_SIZE
+        self.pending: List[bytes] = []
+        self.recorded = 0
+
+    def record(self, market_data: Dict[str, Any], digest: str, quorum: Optional[int],
+               responses: Dict[str, Dict[str, Any]], analysis: Optional[Dict[str, Any]],
+               now: Optional[float] = None):
+        if analysis is not None:
+            analysis = {k: v for k, v in analysis.items() if not k.endswith('_analysis')}
+        self.add({
+            'time': now or time.time(),
+            'symbol': market_data.get('symbol'),
+            'market_data': market_data,
+            'digest': digest,
+            'quorum': quorum,
+            'responses': responses,
+            'analysis': analysis
+        })
+
+    def add(self, record: Dict[str, Any]):
+        try:
+            self.pending.append(json.dumps(record, separators=(',', ':'), default=json_default).encode())
+        except (TypeError, ValueError) as e:
+            logging.error(f"Error recording decision: {str(e)}")
+            return
+        self.recorded += 1
+        if len(self.pending) >= self.block_size:
+            self.flush()
+
+    def flush(self) -> bool:
+        """Write buffered records as one block"""
+        if not self.pending:
+            return True
+        try:
+            payload = zlib.compress(b'\n'.join(self.pending), 6)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'ab') as f:
+                f.write(BLOCK_HEADER.pack(MAGIC, len(self.pending), len(payload), zlib.crc32(payload)))
+                f.write(payload)
+            self.pending = []
+            return True
+        except Exception as e:
+            logging.error(f"Error writing decision log: {str(e)}")
+            return False
+
+    def close(self):
+        self.flush()
+
+
+def iter_records(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """Records in file order; stops at the first truncated or corrupt block"""
+    data = Path(path).read_bytes()
+    offset = 0
+    while offset + BLOCK_HEADER.size <= len(data):
+        magic, count, length, checksum = BLOCK_HEADER.unpack_from(data, offset)
+        payload = data[offset + BLOCK_HEADER.size:offset + BLOCK_HEADER.size + length]
+        if magic != MAGIC or len(payload) != length or zlib.crc32(payload) != checksum:
+            logging.warning(f"Ignoring corrupt decision log block at byte {offset} of {path}")
+            return
+        for line in zlib.decompress(payload).split(b'\n'):
+            yield json.loads(line)
+        offset += BLOCK_HEADER.size + length
+
+
+def load_records(path: Union[str, Path]) -> List[Dict[str, Any]]:
+    return list(iter_records(path))
@@ -0,0 +1,322 @@
+"""
+Exchange adapters for public market data, and an aggregator that merges
+them.
+
+Every adapter returns the same shapes:
+
+  ticker  {'venue', 'symbol', 'last', 'bid', 'ask', 'change_24h',
+           'volume_24h', 'high_24h', 'low_24h', 'timestamp'}
+          (bid/ask may be None; timestamp in ms, None if not reported)
+  klines  Binance-style rows [open_time_ms, open, high, low, close, volume],
+          oldest first
+
+Raw responses are turned into these by static `parse_*` methods, and HTTP
+adapters take an optional `fetch(url, params)` coroutine, so adapters can
+be tested against recorded responses without network access.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import numpy as np
+from config.config import Config
+from .resilience import get_resilience_manager
+from .utils.symbols import SymbolTable, get_symbol_table
+
+Fetch = Callable[[str, Dict[str, Any]], Awaitable[Any]]
+
+
+def _float(value: Any) -> Optional[float]:
+    return None if value in (None, '') else float(value)
+
+
+def _iso_ms(value: Optional[str]) -> Optional[int]:
+    if not value:
+        return None
+    return int(datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp() * 1000)
+
+
+class ExchangeAdapter:
+    """Public market data from one venue"""
+
+    name = ''
+
+    def __init__(self, symbols: Optional[SymbolTable] = None):
+        self.symbols = symbols or get_symbol_table()
+        self.resilience = get_resilience_manager()
+
+    async def get_ticker(self, symbol: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    async def get_klines(self, symbol: str, interval: str = '1h', limit: int = 24) -> List[list]:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class HTTPExchangeAdapter(ExchangeAdapter):
+    """Adapter for a public REST API, called through the resilience layer"""
+
+    base_url = ''
+
+    def __init__(self, symbols: Optional[SymbolTable] = None, fetch: Optional[Fetch] = None):
+        super().__init__(symbols)
+        self.fetch = fetch or self._http_get
+        self._session = None
+
+    async def _http_get(self, url: str, params: Dict[str, Any]) -> Any:
+        if self._session is None:
+            import aiohttp
+            self._session = aiohttp.ClientSession()
+        async with self._session.get(url, params=params) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def _get(self, endpoint: str, path: str, **params) -> Any:
+        return await self.resilience.call(
+            f'{self.name}.{endpoint}', self.fetch, self.base_url + path, params,
+            idempotent=True, timeout=Config.VENUE_TIMEOUT, hedge_delay=Config.HEDGE_DELAY
+        )
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class BinanceAdapter(ExchangeAdapter):
+    """Binance spot via python-binance (shares the caller's client)"""
+
+    name = 'binance'
+
+    def __init__(self, get_client: Callable[[], Any], symbols: Optional[SymbolTable] = None):
+        super().__init__(symbols)
+        self.get_client = get_client
+
+    async def _call(self, endpoint: str, method: str, **kwargs) -> Any:
+        return await self.resilience.call(
+            f'binance.{endpoint}', getattr(self.get_client(), method),
+            idempotent=True, blocking=True, timeout=Config.BINANCE_TIMEOUT,
+            hedge_delay=Config.HEDGE_DELAY, **kwargs
+        )
+
+    @staticmethod
+    def parse_ticker(raw: Dict[str, Any], symbol: str) -> Dict[str, Any]:
+        return {
+            'venue': 'binance',
+            'symbol': symbol,
+            'last': float(raw['lastPrice']),
+            'bid': _float(raw.get('bidPrice')),
+            'ask': _float(raw.get('askPrice')),
+            'change_24h': float(raw['priceChangePercent']),
+            'volume_24h': float(raw['volume']),
+            'high_24h': float(raw['highPrice']),
+            'low_24h': float(raw['lowPrice']),
+            'timestamp': raw.get('closeTime')
+        }
+
+    async def get_ticker(self, symbol: str) -> Dict[str, Any]:
+        raw = await self._call('ticker', 'get_ticker', symbol=self.symbols.to_venue(symbol, 'binance'))
+        return self.parse_ticker(raw, symbol)
+
+    async def get_klines(self, symbol: str, interval: str = '1h', limit: int = 24) -> List[list]:
+        return await self._call('klines', 'get_klines', symbol=self.symbols.to_venue(symbol, 'binance'),
+                                interval=interval, limit=limit)
+
+
+class KrakenAdapter(HTTPExchangeAdapter):
+    name = 'kraken'
+    base_url = 'https://api.kraken.com/0/public'
+    INTERVALS = {'1m': 1, '5m': 5, '15m': 15, '30m': 30, '1h': 60, '4h': 240, '1d': 1440, '1w': 10080}
+
+    @staticmethod
+    def _result(raw: Dict[str, Any]) -> Any:
+        if raw.get('error'):
+            raise ValueError(f"Kraken error: {', '.join(raw['error'])}")
+        # Results are keyed by Kraken's own pair name, which can differ from the request
+        return next(value for key, value in raw['result'].items() if key != 'last')
+
+    @classmethod
+    def parse_ticker(cls, raw: Dict[str, Any], symbol: str) -> Dict[str, Any]:
+        data = cls._result(raw)
+        last, opened = float(data['c'][0]), float(data['o'])
+        return {
+            'venue': 'kraken',
+            'symbol': symbol,
+            'last': last,
+            'bid': float(data['b'][0]),
+            'ask': float(data['a'][0]),
+            # Kraken only reports today's open (UTC), not the price 24h ago
+            'change_24h': (last / opened - 1) * 100 if opened else 0.0,
+            'volume_24h': float(data['v'][1]),
+            'high_24h': float(data['h'][1]),
+            'low_24h': float(data['l'][1]),
+            'timestamp': None
+        }
+
+    @classmethod
+    def parse_klines(cls, raw: Dict[str, Any]) -> List[list]:
+        # [time_s, open, high, low, close, vwap, volume, count]
+        return [[row[0] * 1000, float(row[1]), float(row[2]), float(row[3]),
+                 float(row[4]), float(row[6])] for row in cls._result(raw)]
+
+    async def get_ticker(self, symbol: str) -> Dict[str, Any]:
+        raw = await self._get('ticker', '/Ticker', pair=self.symbols.to_venue(symbol, 'kraken'))
+        return self.parse_ticker(raw, symbol)
+
+    async def get_klines(self, symbol: str, interval: str = '1h', limit: int = 24) -> List[list]:
+        raw = await self._get('klines', '/OHLC', pair=self.symbols.to_venue(symbol, 'kraken'),
+                              interval=self.INTERVALS[interval])
+        return self.parse_klines(raw)[-limit:]
+
+
+class CoinbaseAdapter(HTTPExchangeAdapter):
+    name = 'coinbase'
+    base_url = 'https://api.exchange.coinbase.com'
+    GRANULARITIES = {'1m': 60, '5m': 300, '15m': 900, '1h': 3600, '6h': 21600, '1d': 86400}
+
+    @staticmethod
+    def parse_ticker(ticker: Dict[str, Any], stats: Dict[str, Any], symbol: str) -> Dict[str, Any]:
+        last, opened = float(ticker['price']), float(stats['open'])
+        return {
+            'venue': 'coinbase',
+            'symbol': symbol,
+            'last': last,
+            'bid': _float(ticker.get('bid')),
+            'ask': _float(ticker.get('ask')),
+            'change_24h': (last / opened - 1) * 100 if opened else 0.0,
+            'volume_24h': float(stats['volume']),
+            'high_24h': float(stats['high']),
+            'low_24h': float(stats['low']),
+            'timestamp': _iso_ms(ticker.get('time'))
+        }
+
+    @staticmethod
+    def parse_klines(raw: List[list]) -> List[list]:
+        # [time_s, low, high, open, close, volume], newest first
+        return [[row[0] * 1000, float(row[3]), float(row[2]), float(row[1]),
+                 float(row[4]), float(row[5])] for row in reversed(raw)]
+
+    async def get_ticker(self, symbol: str) -> Dict[str, Any]:
+        product = self.symbols.to_venue(symbol, 'coinbase')
+        ticker, stats = await asyncio.gather(
+            self._get('ticker', f'/products/{product}/ticker'),
+            self._get('stats', f'/products/{product}/stats')
+        )
+        return self.parse_ticker(ticker, stats, symbol)
+
+    async def get_klines(self, symbol: str, interval: str = '1h', limit: int = 24) -> List[list]:
+        product = self.symbols.to_venue(symbol, 'coinbase')
+        raw = await self._get('klines', f'/products/{product}/candles',
+                              granularity=self.GRANULARITIES[interval])
+        return self.parse_klines(raw)[-limit:]
+
+
+ADAPTERS = {
+    'binance': BinanceAdapter,
+    'kraken': KrakenAdapter,
+    'coinbase': CoinbaseAdapter
+}
+
+
+def summarize_tickers(tickers: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Best bid/ask across venues and the spread between venue prices"""
+    prices = {venue: ticker['last'] for venue, ticker in tickers.items()}
+    bids = {venue: t['bid'] for venue, t in tickers.items() if t.get('bid')}
+    asks = {venue: t['ask'] for venue, t in tickers.items() if t.get('ask')}
+    low, high = min(prices.values()), max(prices.values())
+    summary = {
+        'venues': len(prices),
+        'prices': prices,
+        'spread_bps': (high / low - 1) * 1e4 if low else 0.0
+    }
+    if bids:
+        venue = max(bids, key=bids.get)
+        summary['best_bid'], summary['best_bid_venue'] = bids[venue], venue
+    if asks:
+        venue = min(asks, key=asks.get)
+        summary['best_ask'], summary['best_ask_venue'] = asks[venue], venue
+    return summary
+
+
+def merge_klines(klines: Dict[str, List[list]], primary: str) -> List[list]:
+    """
+    Consolidated candles on the primary venue's open times: volume-weighted
+    open and close, highest high, lowest low and total volume. Venues
+    without a candle at a given time simply don't contribute to it.
+    """
+    def as_array(rows: List[list]) -> np.ndarray:
+        # Binance rows carry extra columns after volume
+        return np.array([row[:6] for row in rows], dtype=float).reshape(-1, 6)
+
+    base = as_array(klines.get(primary) or [])
+    if not len(base):
+        return []
+    rows = np.concatenate([as_array(k) for k in klines.values() if k])
+    times = base[:, 0]
+    slot = np.searchsorted(times, rows[:, 0])
+    slot = np.minimum(slot, len(times) - 1)
+    keep = times[slot] == rows[:, 0]
+    rows, slot = rows[keep], slot[keep]
+
+    n = len(times)
+    volume = np.bincount(slot, weights=rows[:, 5], minlength=n)
+    counts = np.bincount(slot, minlength=n)
+    # Venues with zero volume in a candle fall back to an equal weight
+    weighted = volume > 0
+    weights = np.where(weighted[slot], rows[:, 5], 1.0)
+    total = np.bincount(slot, weights=weights, minlength=n)
+    opened = np.bincount(slot, weights=weights * rows[:, 1], minlength=n) / total
+    closed = np.bincount(slot, weights=weights * rows[:, 4], minlength=n) / total
+    high = np.full(n, -np.inf)
+    low = np.full(n, np.inf)
+    np.maximum.at(high, slot, rows[:, 2])
+    np.minimum.at(low, slot, rows[:, 3])
+    merged = np.column_stack([times, opened, high, low, closed, volume])
+    return [[int(row[0])] + row[1:].tolist() for row in merged[counts > 0]]
+
+
+class MarketAggregator:
+    """Fetches tickers and klines from several venues concurrently"""
+
+    def __init__(self, adapters: List[ExchangeAdapter]):
+        self.adapters = adapters
+        self.primary = adapters[0]
+
+    async def _gather(self, calls: Dict[str, Awaitable], what: str, symbol: str) -> Dict[str, Any]:
+        results = await asyncio.gather(*calls.values(), return_exceptions=True)
+        output = {}
+        for venue, result in zip(calls, results):
+            if isinstance(result, Exception):
+                logging.warning(f"No {what} for {symbol} from {venue}: {str(result)}")
+            else:
+                output[venue] = result
+        return output
+
+    async def get_tickers(self, symbol: str) -> Dict[str, Dict[str, Any]]:
+        return await self._gather({a.name: a.get_ticker(symbol) for a in self.adapters}, 'ticker', symbol)
+
+    async def get_klines(self, symbol: str, interval: str = '1h', limit: int = 24) -> Dict[str, List[list]]:
+        return await self._gather({a.name: a.get_klines(symbol, interval, limit) for a in self.adapters},
+                                  'klines', symbol)
+
+    async def get_snapshot(self, symbol: str, interval: str = '1h', limit: int = 24) -> Dict[str, Any]:
+        """
+        Primary venue ticker, merged klines and the cross-venue summary.
+        Raises if the primary venue has no data; other venues are optional.
+        """
+        tickers, klines = await asyncio.gather(
+            self.get_tickers(symbol), self.get_klines(symbol, interval, limit)
+        )
+        if self.primary.name not in tickers or self.primary.name not in klines:
+            raise RuntimeError(f"No {self.primary.name} data for {symbol}")
+        return {
+            'ticker': tickers[self.primary.name],
+            'klines': merge_klines(klines, self.primary.name),
+            'cross_venue': summarize_tickers(tickers)
+        }
+
+    async def close(self):
+        for adapter in self.adapters:
+            await adapter.close()
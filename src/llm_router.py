@@ -0,0 +1,298 @@
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from config.config import Config
+from .prompt_builder import PromptRequest
+
+CONSENSUS_RULES = ('unanimous', 'majority', 'weighted')
+
+
+class ProviderStats:
+    """Rolling latency, error rate and cost for one provider"""
+
+    def __init__(self, window: Optional[int] = None):
+        window = window or Config.LLM_STATS_WINDOW
+        self.latencies = deque(maxlen=window)
+        self.failures = deque(maxlen=window)  # True for a failed call
+        self.calls = 0
+        self.cost = 0.0
+
+    def record(self, latency: float, ok: bool, cost: float = 0.0):
+        self.calls += 1
+        self.cost += cost
+        self.failures.append(not ok)
+        if ok:
+            self.latencies.append(latency)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency percentile (0-100) over the window, None without data"""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+    @property
+    def error_rate(self) -> float:
+        return sum(self.failures) / len(self.failures) if self.failures else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'error_rate': self.error_rate,
+            'cost': round(self.cost, 6)
+        }
+
+
+class LLMProvider:
+    """
+    A model behind an async `call(prompt, model)` returning a parsed
+    analysis dict (or None). Costs are USD per 1k tokens.
+    """
+
+    def __init__(self, name: str, model: str,
+                 call: Callable[[PromptRequest, str], Awaitable[Optional[Dict[str, Any]]]],
+                 input_cost: float = 0.0, output_cost: float = 0.0,
+                 weight: float = 1.0):
+        self.name = name
+        self.model = model
+        self.call = call
+        self.input_cost = input_cost
+        self.output_cost = output_cost
+        self.weight = weight
+        self.stats = ProviderStats()
+
+    def estimate_cost(self, prompt: PromptRequest) -> float:
+        """Upper-bound cost of one call (full completion budget)"""
+        return (prompt.input_tokens * self.input_cost +
+                prompt.max_tokens * self.output_cost) / 1000
+
+
+def combine_analyses(analyses: Dict[str, Optional[Dict[str, Any]]],
+                     rule: str = 'unanimous',
+                     weights: Optional[Dict[str, float]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Combine per-provider analyses into one recommendation.
+
+    unanimous: every responding model must name the same direction
+    majority:  more than half of the responding models agree
+    weighted:  direction with the highest weight * confidence wins; the
+               combined confidence is its share of the total weight
+    """
+    if rule not in CONSENSUS_RULES:
+        raise ValueError(f"Unknown consensus rule: {rule}")
+    weights = weights or {}
+    answered = {name: a for name, a in analyses.items() if a}
+    if not answered:
+        return None
+
+    combined: Dict[str, Any] = {}
+    for name, analysis in analyses.items():
+        combined[f'{name}_analysis'] = analysis
+        combined[f'{name}_confidence'] = (analysis or {}).get('confidence', 0)
+
+    votes = Counter(a.get('direction') for a in answered.values())
+    if rule == 'weighted':
+        scores: Dict[str, float] = {}
+        for name, analysis in answered.items():
+            scores[analysis.get('direction')] = scores.get(analysis.get('direction'), 0.0) + \
+                weights.get(name, 1.0) * analysis.get('confidence', 0)
+        direction = max(scores, key=scores.get)
+        total_weight = sum(weights.get(name, 1.0) for name in answered)
+        confidence = scores[direction] / total_weight
+        agreed = True
+    else:
+        direction, count = votes.most_common(1)[0]
+        agreed = count == len(answered) if rule == 'unanimous' else count * 2 > len(answered)
+        supporters = [a for a in answered.values() if a.get('direction') == direction]
+        confidence = sum(a.get('confidence', 0) for a in supporters) / len(supporters)
+
+    combined.update({
+        'agreement': len(votes) == 1,
+        'recommended_direction': direction,
+        'average_confidence': confidence,
+        'should_trade': agreed and confidence >= Config.MIN_CONFIDENCE_THRESHOLD,
+        'consensus': rule,
+        'partial': any(a.get('partial') for a in answered.values())
+    })
+    # Exit levels from the models backing the chosen direction
+    for key in ('take_profit', 'stop_loss'):
+        values = [a[key] for a in answered.values()
+                  if key in a and a.get('direction') == direction]
+        if values:
+            combined[key] = sum(values) / len(values)
+    return combined
+
+
+class LLMRouter:
+    """
+    Picks which providers answer each decision and combines their answers.
+
+    Providers expected to meet the latency SLO (by rolling p95) are tried
+    cheapest first; slow or failing ones are used only as spares. If the
+    chosen providers haven't answered in time for a spare to still finish
+    within the SLO, a hedged request goes to the next spare, and a spare
+    also replaces any provider that fails.
+    """
+
+    def __init__(self, providers: List[LLMProvider],
+                 latency_slo: Optional[float] = None,
+                 quorum: Optional[int] = None,
+                 consensus: Optional[str] = None,
+                 max_error_rate: Optional[float] = None):
+        self.providers = providers
+        self.latency_slo = latency_slo or Config.LLM_LATENCY_SLO
+        self.quorum = min(quorum or Config.LLM_QUORUM, len(providers))
+        self.consensus = consensus or Config.LLM_CONSENSUS
+        self.max_error_rate = Config.LLM_MAX_ERROR_RATE if max_error_rate is None else max_error_rate
+        if self.consensus not in CONSENSUS_RULES:
+            raise ValueError(f"Unknown consensus rule: {self.consensus}")
+
+        self.decisions = 0
+        self.hedges = 0
+        self.slo_misses = 0
+
+    def rank(self, prompt: PromptRequest) -> List[LLMProvider]:
+        """Providers in the order they should be used for this prompt"""
+        def key(provider: LLMProvider):
+            p95 = provider.stats.percentile(95)
+            healthy = provider.stats.error_rate <= self.max_error_rate
+            # Unmeasured providers are assumed fast so they get sampled
+            fast = p95 is None or p95 <= self.latency_slo
+            return (not healthy, not fast,
+                    provider.estimate_cost(prompt) if fast else p95)
+        return sorted(self.providers, key=key)
+
+    def _hedge_delay(self, spare: LLMProvider) -> Optional[float]:
+        """
+        How long to wait before the spare can no longer finish within the
+        SLO; None for a spare too slow to help (it is only used to replace
+        providers that fail)
+        """
+        p50 = spare.stats.percentile(50)
+        if p50 is None:
+            return self.latency_slo / 2
+        if p50 >= self.latency_slo:
+            return None
+        return self.latency_slo - p50
+
+    def _next_hedge(self, spares: List[LLMProvider], started: float) -> Optional[float]:
+        """When to launch the first spare that can still beat the SLO (None: never)"""
+        delays = [d for d in (self._hedge_delay(spare) for spare in spares) if d is not None]
+        return started + delays[0] if delays else None
+
+    async def _call(self, provider: LLMProvider, prompt: PromptRequest) -> Optional[Dict[str, Any]]:
+        started = time.monotonic()
+        try:
+            result = await provider.call(prompt, provider.model)
+        except Exception as e:
+            logging.error(f"{provider.name} call error: {str(e)}")
+            result = None
+        provider.stats.record(time.monotonic() - started, result is not None,
+                              provider.estimate_cost(prompt))
+        return result
+
+    def _decided(self, results: Dict[str, Optional[Dict[str, Any]]], quorum: int) -> bool:
+        answered = [r for r in results.values() if r]
+        if len(answered) >= quorum:
+            return True
+        # A model that ruled out a trade early settles a unanimous vote
+        return self.consensus == 'unanimous' and any(r.get('early_exit') for r in answered)
+
+    def _trades(self, results: Dict[str, Optional[Dict[str, Any]]], quorum: int) -> bool:
+        answered = [r for r in results.values() if r]
+        return (len(answered) >= quorum and
+                combine_analyses(results, self.consensus, self.weights)['should_trade'])
+
+    def _quorum(self, quorum: Optional[int]) -> int:
+        return self.quorum if quorum is None else max(1, min(quorum, len(self.providers)))
+
+    async def gather(self, prompt: PromptRequest, quorum: Optional[int] = None,
+                     answered: Optional[Dict[str, Optional[Dict[str, Any]]]] = None
+                     ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Query providers until a quorum has answered (or all are exhausted).
+        `answered` holds results already in hand; those providers aren't asked again.
+        """
+        quorum = self._quorum(quorum)
+        answered = answered or {}
+        ranked = [p for p in self.rank(prompt) if p.name not in answered]
+        need = max(0, quorum - sum(1 for r in answered.values() if r))
+        spares = ranked[need:]
+        tasks = {asyncio.create_task(self._call(p, prompt)): p for p in ranked[:need]}
+        results: Dict[str, Optional[Dict[str, Any]]] = dict(answered)
+        results.update({p.name: None for p in ranked[:need]})
+        started = time.monotonic()
+        hedge_at = self._next_hedge(spares, started)
+
+        def launch(provider: LLMProvider):
+            results.setdefault(provider.name, None)
+            tasks[asyncio.create_task(self._call(provider, prompt))] = provider
+
+        try:
+            while tasks:
+                timeout = max(0.0, hedge_at - time.monotonic()) if hedge_at else None
+                done, _ = await asyncio.wait(tasks, timeout=timeout,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    spare = next((p for p in spares if self._hedge_delay(p) is not None), None)
+                    if spare is not None:
+                        spares.remove(spare)
+                        logging.info(f"Hedging decision with {spare.name}")
+                        self.hedges += 1
+                        launch(spare)
+                    hedge_at = self._next_hedge(spares, time.monotonic())
+                    continue
+                for task in done:
+                    provider = tasks.pop(task)
+                    results[provider.name] = task.result()
+                    if task.result() is None and spares:
+                        launch(spares.pop(0))
+                        hedge_at = self._next_hedge(spares, time.monotonic())
+                if self._decided(results, quorum):
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+        return results
+
+    async def decide(self, prompt: PromptRequest,
+                     quorum: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Gather analyses and apply the consensus rule (`quorum` overrides the default)"""
+        quorum = self._quorum(quorum)
+        started = time.monotonic()
+        results = await self.gather(prompt, quorum)
+        if quorum < self.quorum and self._trades(results, quorum):
+            # A reduced quorum can only rule a trade out; a trade still
+            # needs the default quorum to pass the consensus rule
+            quorum = self.quorum
+            results = await self.gather(prompt, quorum, results)
+        self.decisions += 1
+        if time.monotonic() - started > self.latency_slo:
+            self.slo_misses += 1
+        answered = [r for r in results.values() if r]
+        if len(answered) < quorum:
+            early = [r for r in answered if r.get('early_exit')]
+            if not early:
+                return None
+            # Trade already ruled out; report it without waiting for a quorum
+            combined = combine_analyses(results, self.consensus, self.weights)
+            combined.update({'agreement': False, 'should_trade': False,
+                             'partial': True, 'early_exit': True})
+            return combined
+        return combine_analyses(results, self.consensus, self.weights)
+
+    @property
+    def weights(self) -> Dict[str, float]:
+        return {p.name: p.weight for p in self.providers}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'decisions': self.decisions,
+            'hedges': self.hedges,
+            'slo_misses': self.slo_misses,
+            'providers': {p.name: p.stats.get_stats() for p in self.providers}
+        }
@@ -1,16 +1,88 @@
-from binance import Client
+import asyncio
 import logging
-from typing import Dict, Any
+from typing import Any, Dict, Optional
 from datetime import datetime, timedelta
 from config.config import Config
+from .data_quality import DataQualityGuard
+from .exchanges import ADAPTERS, BinanceAdapter, MarketAggregator
+from .records import Indicators, MarketSnapshot
+from .regime import RegimeClassifier
+from .resilience import get_resilience_manager
+from .utils.precision import PrecisionTable, get_precision_table
+
+KLINE_INTERVAL_1HOUR = '1h'  # binance.Client.KLINE_INTERVAL_1HOUR
 
 class MarketDataManager:
     def __init__(self):
-        # Initialize Binance client (we'll use it for market data only)
-        self.client = Client("", "")  # No keys needed for public data
-        self.cached_data = {}
-        self.last_update = None
+        self._client = None
+        self.cached_data: Dict[str, MarketSnapshot] = {}  # least recently updated first
+        self.updated_at: Dict[str, datetime] = {}  # symbol -> when its snapshot was fetched
+        self.resilience = get_resilience_manager()
+        self.history_cache = {}  # symbol -> (fetched at, hourly closes)
+        # Optional OrderFlowManager providing live depth / trade-flow features
+        self.order_flow = None
+        self._aggregator = None
+        self.quality_guard = DataQualityGuard()
+        self.regimes = RegimeClassifier()
+
+    @property
+    def client(self):
+        """Binance client, created on first use (we'll use it for market data only)"""
+        if self._client is None:
+            from binance import Client
+            self._client = Client("", "")  # No keys needed for public data
+        return self._client
+
+    @property
+    def aggregator(self) -> Optional[MarketAggregator]:
+        """Cross-venue aggregator, or None when only Binance is configured"""
+        if self._aggregator is None and len(Config.MARKET_DATA_VENUES) > 1:
+            self._aggregator = MarketAggregator([
+                BinanceAdapter(lambda: self.client) if venue == 'binance' else ADAPTERS[venue]()
+                for venue in Config.MARKET_DATA_VENUES
+            ])
+        return self._aggregator
+
+    async def close(self):
+        if self._aggregator is not None:
+            await self._aggregator.close()
+
+    def forget(self, symbol: str):
+        """Drop everything kept for a pair that is no longer traded"""
+        self.cached_data.pop(symbol, None)
+        self.updated_at.pop(symbol, None)
+        self.history_cache.pop(symbol, None)
+        self.quality_guard.last_reports.pop(symbol, None)
+        self.regimes.states.pop(symbol, None)
+
+    async def _binance_call(self, endpoint: str, func, **kwargs):
+        """Run a blocking Binance read through the shared resilience layer"""
+        return await self.resilience.call(
+            f'binance.{endpoint}', func,
+            idempotent=True,
+            blocking=True,
+            timeout=Config.BINANCE_TIMEOUT,
+            hedge_delay=Config.HEDGE_DELAY,
+            **kwargs
+        )
         
+    def get_state(self) -> Dict[str, Any]:
+        """Export cached market data and indicators for a state snapshot"""
+        return {
+            'cached_data': {symbol: data.to_dict() for symbol, data in self.cached_data.items()},
+            'regimes': self.regimes.get_state(),
+            'updated_at': {symbol: at.timestamp() for symbol, at in self.updated_at.items()}
+        }
+
+    def restore_state(self, state: Dict[str, Any]):
+        """Restore cached market data from a state snapshot"""
+        self.cached_data = {symbol: MarketSnapshot.from_dict(data)
+                            for symbol, data in state.get('cached_data', {}).items()}
+        self.regimes.restore_state(state.get('regimes', {}))
+        self.updated_at = {symbol: datetime.fromtimestamp(at)
+                           for symbol, at in state.get('updated_at', {}).items()
+                           if symbol in self.cached_data}
+
     async def get_market_data(self, symbol: str = "BTCUSDT") -> Dict[str, Any]:
         """
         Get current market data including price, volume, and indicators
@@ -18,46 +90,131 @@ class MarketDataManager:
         try:
             current_time = datetime.now()
             
-            # Check if cache is valid (less than 1 minute old)
-            if (self.last_update and 
-                current_time - self.last_update < timedelta(minutes=1) and
-                symbol in self.cached_data):
-                return self.cached_data[symbol]
-
-            # Get current ticker data
-            ticker = self.client.get_ticker(symbol=symbol)
-            
-            # Get recent klines (candlestick data)
-            klines = self.client.get_klines(
-                symbol=symbol,
-                interval=Client.KLINE_INTERVAL_1HOUR,
-                limit=24
-            )
-            
-            # Calculate basic indicators
-            market_data = {
-                'symbol': symbol,
-                'current_price': float(ticker['lastPrice']),
-                'price_change_24h': float(ticker['priceChangePercent']),
-                'volume_24h': float(ticker['volume']),
-                'high_24h': float(ticker['highPrice']),
-                'low_24h': float(ticker['lowPrice']),
-                'timestamp': current_time.isoformat(),
-                'trend': self._calculate_trend(klines),
-                'volatility': self._calculate_volatility(klines),
-                'indicators': self._calculate_indicators(klines)
-            }
+            # Reuse this pair's snapshot while it is fresh (it was checked
+            # by the data quality guard when fetched)
+            fetched = self.updated_at.get(symbol)
+            if (fetched and symbol in self.cached_data and
+                    current_time - fetched < timedelta(seconds=Config.MARKET_DATA_CACHE_TTL)):
+                return self._with_order_flow(self.cached_data[symbol])
+
+            cross_venue = None
+            if self.aggregator:
+                # Primary venue ticker, klines merged across venues
+                snapshot = await self.aggregator.get_snapshot(symbol, KLINE_INTERVAL_1HOUR, 24)
+                ticker, klines = snapshot['ticker'], snapshot['klines']
+                cross_venue = snapshot['cross_venue']
+            else:
+                # Get current ticker data
+                ticker = BinanceAdapter.parse_ticker(await self._binance_call(
+                    'ticker', self.client.get_ticker, symbol=symbol
+                ), symbol)
+                
+                # Get recent klines (candlestick data)
+                klines = await self._binance_call(
+                    'klines', self.client.get_klines,
+                    symbol=symbol,
+                    interval=KLINE_INTERVAL_1HOUR,
+                    limit=24
+                )
             
-            # Update cache
-            self.cached_data[symbol] = market_data
-            self.last_update = current_time
+            market_data = self.build_snapshot(symbol, ticker, klines, current_time, cross_venue)
+            if market_data is None:
+                return None
+            if Config.MULTI_TIMEFRAME_INTERVALS:
+                market_data['timeframes'] = await self._get_timeframes(symbol)
             
-            return market_data
+            self.store(symbol, market_data, current_time)
+            return self._with_order_flow(market_data)
             
         except Exception as e:
             logging.error(f"Error fetching market data: {str(e)}")
             return None
     
+    def build_snapshot(self, symbol: str, ticker: Dict[str, Any], klines: list,
+                       now: Optional[datetime] = None,
+                       cross_venue: Optional[Dict[str, Any]] = None) -> Optional[MarketSnapshot]:
+        """
+        Check the candles and compute indicators and regime for one pair
+        (None if the data quality guard blocks it). No I/O.
+        """
+        now = now or datetime.now()
+        # Repair or reject bad candles before they reach the indicators
+        if Config.DQ_ENABLED:
+            klines, _ = self.quality_guard.check(
+                symbol, ticker, klines, KLINE_INTERVAL_1HOUR, now.timestamp()
+            )
+            if klines is None:
+                return None
+        
+        # Calculate basic indicators
+        market_data = MarketSnapshot(
+            symbol=symbol,
+            current_price=ticker['last'],
+            price_change_24h=ticker['change_24h'],
+            volume_24h=ticker['volume_24h'],
+            high_24h=ticker['high_24h'],
+            low_24h=ticker['low_24h'],
+            timestamp=now.isoformat(),
+            trend=self._calculate_trend(klines),
+            volatility=self._calculate_volatility(klines),
+            indicators=self._calculate_indicators(klines)
+        )
+        regime = self.regimes.update(symbol, klines) if Config.REGIME_ENABLED else None
+        if regime:
+            market_data['regime'] = regime
+        if cross_venue and cross_venue['venues'] > 1:
+            market_data['cross_venue'] = cross_venue
+        return market_data
+
+    def store(self, symbol: str, market_data: MarketSnapshot, now: datetime):
+        """Cache a pair's snapshot, keeping the MARKET_CACHE_SIZE most recently updated pairs"""
+        self.cached_data.pop(symbol, None)
+        self.cached_data[symbol] = market_data
+        self.updated_at[symbol] = now
+        while len(self.cached_data) > Config.MARKET_CACHE_SIZE:
+            oldest = next(iter(self.cached_data))
+            del self.cached_data[oldest]
+            self.updated_at.pop(oldest, None)
+
+    def _with_order_flow(self, market_data: MarketSnapshot) -> MarketSnapshot:
+        """
+        Attach the latest streamed order flow features (no REST calls) to a
+        copy, so the cached snapshot stays as fetched
+        """
+        if self.order_flow is not None:
+            features = self.order_flow.get_features(market_data['symbol'])
+            if features:
+                market_data = market_data.copy()
+                market_data['order_flow'] = features
+        return market_data
+
+    async def _get_timeframes(self, symbol: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Summarize trend and indicators on the extra configured intervals
+        (fetched concurrently; failed intervals are left out)
+        """
+        intervals = Config.MULTI_TIMEFRAME_INTERVALS
+        results = await asyncio.gather(*(
+            self._binance_call(
+                'klines', self.client.get_klines,
+                symbol=symbol, interval=interval, limit=24
+            )
+            for interval in intervals
+        ), return_exceptions=True)
+
+        timeframes = {}
+        for interval, klines in zip(intervals, results):
+            if isinstance(klines, Exception):
+                logging.warning(f"No {interval} klines for {symbol}: {str(klines)}")
+                continue
+            indicators = self._calculate_indicators(klines)
+            timeframes[interval] = {
+                'trend': self._calculate_trend(klines),
+                'rsi_14': indicators.get('rsi_14'),
+                'price_vs_sma': indicators.get('price_vs_sma')
+            }
+        return timeframes
+
     def _calculate_trend(self, klines: list) -> str:
         """
         Calculate current trend based on recent prices
@@ -92,20 +249,21 @@ class MarketDataManager:
         
         return sum(price_changes) / len(price_changes)
     
-    def _calculate_indicators(self, klines: list) -> Dict[str, float]:
+    def _calculate_indicators(self, klines: list) -> Indicators:
         """
         Calculate basic technical indicators
         """
         if not klines or len(klines) < 14:  # Need at least 14 periods for RSI
-            return {}
+            return Indicators()
             
         closes = [float(k[4]) for k in klines]
+        sma = self._calculate_sma(closes, 20)
         
-        return {
-            'sma_20': self._calculate_sma(closes, 20),
-            'rsi_14': self._calculate_rsi(closes, 14),
-            'price_vs_sma': (closes[-1] / self._calculate_sma(closes, 20) - 1) * 100
-        }
+        return Indicators(
+            sma_20=sma,
+            rsi_14=self._calculate_rsi(closes, 14),
+            price_vs_sma=(closes[-1] / sma - 1) * 100
+        )
     
     def _calculate_sma(self, prices: list, period: int) -> float:
         """
@@ -141,6 +299,34 @@ class MarketDataManager:
         
         return round(rsi, 2)
 
+    async def get_price_history(self, symbol: str, days: int = 7) -> list:
+        """Hourly closes for the last `days`, refreshed at most hourly"""
+        fetched, closes = self.history_cache.get(symbol, (None, []))
+        if fetched and datetime.now() - fetched < timedelta(hours=1):
+            return closes
+        history = await self.get_historical_data(symbol, days=days)
+        if not history:
+            return closes
+        closes = [candle['close'] for candle in history]
+        self.history_cache[symbol] = (datetime.now(), closes)
+        return closes
+
+    async def get_precision_table(self) -> Optional[PrecisionTable]:
+        """Symbol tick/step/notional filters, fetching exchangeInfo at most daily"""
+        table = get_precision_table(
+            cache_path=Config.EXCHANGE_INFO_CACHE_PATH, max_age=Config.EXCHANGE_INFO_TTL
+        )
+        if table is not None:
+            return table
+        try:
+            info = await self._binance_call('exchange_info', self.client.get_exchange_info)
+            return get_precision_table(
+                info, cache_path=Config.EXCHANGE_INFO_CACHE_PATH, max_age=Config.EXCHANGE_INFO_TTL
+            )
+        except Exception as e:
+            logging.error(f"Error fetching exchange info: {str(e)}")
+            return None
+
     async def get_historical_data(self, symbol: str = "BTCUSDT", 
                                 days: int = 7) -> list:
         """
@@ -150,9 +336,10 @@ class MarketDataManager:
             end_time = datetime.now()
             start_time = end_time - timedelta(days=days)
             
-            klines = self.client.get_historical_klines(
+            klines = await self._binance_call(
+                'historical_klines', self.client.get_historical_klines,
                 symbol=symbol,
-                interval=Client.KLINE_INTERVAL_1HOUR,
+                interval=KLINE_INTERVAL_1HOUR,
                 start_str=start_time.strftime('%Y-%m-%d %H:%M:%S'),
                 end_str=end_time.strftime('%Y-%m-%d %H:%M:%S')
             )
@@ -0,0 +1,353 @@
+"""
+Memory reporting for long-running operation.
+
+MemoryProfiler reports RSS and, while tracemalloc is tracing, the top
+allocation sites and what grew since the baseline. soak() runs
+TradingBot.process_trading_pair for simulated cycles against in-process
+Binance, 3Commas and LLM clients (synthetic prices, pairs rotating through
+a wider universe), to check that the live loop's memory stays flat.
+"""
+import asyncio
+import gc
+import json
+import logging
+import math
+import os
+import tempfile
+import time
+import tracemalloc
+import zlib
+from collections import deque
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+from config.config import Config
+
+MB = 1024 * 1024
+
+
+def rss_bytes() -> int:
+    """Current resident set size (peak RSS where /proc is not available)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class MemoryProfiler:
+    """tracemalloc wrapper: top allocation sites and growth since a baseline"""
+
+    # Allocations made by the profiler itself or the import machinery
+    IGNORED = (tracemalloc.Filter(False, tracemalloc.__file__),
+               tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+               tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+               tracemalloc.Filter(False, '<unknown>'))
+
+    def __init__(self, frames: Optional[int] = None):
+        self.frames = frames or Config.MEMORY_TRACE_FRAMES
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self):
+        if not self.tracing:
+            tracemalloc.start(self.frames)
+        self.reset_baseline()
+
+    def stop(self):
+        self.baseline = None
+        tracemalloc.stop()
+
+    def reset_baseline(self):
+        """Measure growth from now on"""
+        self.baseline = self._snapshot() if self.tracing else None
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(self.IGNORED)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cheap enough to call every status refresh"""
+        stats = {'rss_mb': rss_bytes() / MB, 'tracing': self.tracing}
+        if self.tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            stats.update({'traced_mb': current / MB, 'traced_peak_mb': peak / MB})
+        return stats
+
+    @staticmethod
+    def _site(stat) -> str:
+        frame = stat.traceback[0]
+        return f"{frame.filename}:{frame.lineno}"
+
+    def report(self, limit: int = 10) -> Dict[str, Any]:
+        """Stats plus the largest allocation sites and the fastest growing ones"""
+        report = self.get_stats()
+        if not self.tracing:
+            return report
+        snapshot = self._snapshot()
+        report['top'] = [
+            {'site': self._site(stat), 'size_kb': stat.size / 1024, 'count': stat.count}
+            for stat in snapshot.statistics('lineno')[:limit]
+        ]
+        if self.baseline is not None:
+            report['growth'] = [
+                {'site': self._site(stat), 'size_diff_kb': stat.size_diff / 1024,
+                 'count_diff': stat.count_diff}
+                for stat in snapshot.compare_to(self.baseline, 'lineno')[:limit]
+                if stat.size_diff > 0
+            ]
+        return report
+
+
+class SyntheticMarket:
+    """Random-walk prices with hourly candles for one pair"""
+
+    def __init__(self, symbol: str, seed: int, start: float, price: float = 100.0):
+        import numpy as np
+        self.symbol = symbol
+        self.rng = np.random.default_rng(seed)
+        self.price = price
+        self.now = start
+        hour = int(start // 3600) * 3600
+        # Closed hourly candles before `start`, plus the open one
+        self.candles = deque(maxlen=24)
+        for i in range(23, 0, -1):
+            self.candles.append([(hour - i * 3600) * 1000, price, price, price, price, 1.0])
+        self.candles.append([hour * 1000, price, price, price, price, 0.0])
+
+    def tick(self, now: float):
+        """Advance the price to `now`"""
+        self.now = now
+        self.price *= math.exp(self.rng.normal(0.0, 0.003))
+        hour = int(now // 3600) * 3600 * 1000
+        # Flat candles for hours the pair wasn't polled
+        while self.candles[-1][0] < hour:
+            close = self.candles[-1][4]
+            self.candles.append([self.candles[-1][0] + 3_600_000, close, close, close, close, 0.0])
+        candle = self.candles[-1]
+        candle[2], candle[3] = max(candle[2], self.price), min(candle[3], self.price)
+        candle[4] = self.price
+        candle[5] += 1.0
+
+    def ticker(self) -> Dict[str, Any]:
+        """Binance 24h ticker"""
+        return {'lastPrice': str(self.price),
+                'priceChangePercent': str((self.price / self.candles[0][4] - 1) * 100),
+                'volume': '1000000', 'highPrice': str(self.price * 1.01),
+                'lowPrice': str(self.price * 0.99), 'closeTime': self.now * 1000}
+
+    def klines(self, limit: int = 24) -> List[list]:
+        """Binance klines (numbers as strings), oldest first"""
+        return [[c[0], *(str(v) for v in c[1:]), c[0] + 3_599_999]
+                for c in list(self.candles)[-limit:]]
+
+
+class SoakBinance:
+    """Public Binance client answering from the synthetic markets"""
+
+    def __init__(self, markets: Dict[str, SyntheticMarket]):
+        self.markets = markets
+
+    def get_ticker(self, symbol: str) -> Dict[str, Any]:
+        return self.markets[symbol].ticker()
+
+    def get_klines(self, symbol: str, interval: str, limit: int = 500) -> List[list]:
+        return self.markets[symbol].klines(limit)
+
+    def get_historical_klines(self, symbol: str, interval: str, start_str: str,
+                              end_str: Optional[str] = None) -> List[list]:
+        return self.markets[symbol].klines()
+
+    def get_exchange_info(self) -> Dict[str, Any]:
+        return {'symbols': []}
+
+
+class SoakThreeCommas:
+    """py3cw client whose bots run in a local PaperEngine"""
+
+    def __init__(self):
+        from .paper_trading import PaperEngine
+        from .utils.symbols import get_symbol_table
+        self.engine = PaperEngine()
+        self.symbols = get_symbol_table()
+        self.rows: Dict[int, int] = {}  # bot_id -> engine row
+        self.updates = 0
+
+    def on_price(self, pair: str, price: float, ts: float):
+        self.engine.on_price(self.symbols.to_venue(pair, '3commas'), price, ts)
+
+    def request(self, entity: str, action: str = '', action_id: Optional[str] = None,
+                payload: Optional[Dict[str, Any]] = None):
+        """(error, response) like py3cw"""
+        if entity == 'accounts':
+            return {}, [{'id': 1, 'name': 'soak'}]
+        if entity == 'bots' and action == 'create_bot':
+            bot_id = len(self.rows) + 1
+            self.rows[bot_id] = self.engine.add_bot(payload['pairs'], payload)
+            return {}, {'id': bot_id, 'pairs': [payload['pairs']], 'is_enabled': True}
+        row = self.rows.get(int(action_id or 0))
+        if entity != 'bots' or row is None:
+            return {'error': True, 'msg': f'Unsupported request {entity}.{action}',
+                    'status_code': 404}, None
+        if action == 'update':
+            self.engine.update_settings(row, payload)
+            self.updates += 1
+            return {}, {'id': int(action_id)}
+        if action in ('enable', 'disable'):
+            self.engine.enabled[row] = action == 'enable'
+            return {}, {'id': int(action_id)}
+        if action == 'stats':
+            return {}, self.engine.get_stats(row)
+        if action == 'show':
+            return {}, {'completed_deals': list(self.engine.history[row])[::-1]}
+        return {'error': True, 'msg': f'Unsupported action {action}', 'status_code': 404}, None
+
+
+class SoakLLM:
+    """
+    OpenAI and Anthropic SDK stand-in streaming a JSON answer derived from
+    the prompt's data, so both models mostly agree on the same snapshot
+    """
+
+    def __init__(self, api: str, seed: int):
+        self.api = api
+        self.seed = seed
+        self.calls = 0
+        # client.chat.completions.create / client.messages.create
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self.messages = SimpleNamespace(create=self.create)
+
+    def _answer(self, prompt: str) -> str:
+        import numpy as np
+        view = np.random.default_rng(zlib.crc32(prompt.encode()))
+        buy, confidence = view.random() < 0.4, view.uniform(55, 95)
+        confidence += np.random.default_rng([self.seed, self.calls]).uniform(-5, 5)
+        return json.dumps({'decision': 'BUY' if buy else 'HOLD',
+                           'confidence': round(min(100.0, confidence)),
+                           'take_profit': 1.5, 'stop_loss': 1.0, 'risk': 4})
+
+    def _event(self, text: str):
+        if self.api == 'openai':
+            return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+        return SimpleNamespace(type='content_block_delta',
+                               delta=SimpleNamespace(type='input_json_delta', partial_json=text))
+
+    async def create(self, messages: List[Dict[str, Any]], stream: bool = False, **kwargs):
+        self.calls += 1
+        answer = self._answer(messages[-1]['content'])
+        if not stream:
+            if self.api == 'openai':
+                return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=answer))])
+            return SimpleNamespace(content=[SimpleNamespace(type='text', text=answer)])
+        return _SoakStream([self._event(answer[i:i + 16]) for i in range(0, len(answer), 16)])
+
+
+class _SoakStream:
+    def __init__(self, events: List[Any]):
+        self.events = iter(events)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.events)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def close(self):
+        pass
+
+
+def soak(cycles: int = 8640, pairs: int = 3, universe: int = 12, churn_every: int = 288,
+         interval: float = 300.0, samples: int = 20,
+         on_sample: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Run `cycles` simulated cycles `interval` seconds apart (8640 x 300s is
+    a month) and sample RSS and traced memory. The first sample is taken
+    after a warm-up tenth of the run, once caches have filled.
+    """
+    from main import TradingBot
+    from .utils import precision
+
+    workdir = tempfile.TemporaryDirectory()
+    overrides = {'EXECUTION_BACKEND': 'live', 'MARKET_DATA_VENUES': ['binance'],
+                 'ORDER_FLOW_ENABLED': False, 'STATUS_ENABLED': False,
+                 'RECORD_DECISIONS': False, 'MULTI_TIMEFRAME_INTERVALS': [], 'MEMORY_TRACE': False,
+                 'EXCHANGE_INFO_CACHE_PATH': os.path.join(workdir.name, 'exchange_filters.json'),
+                 # Simulated hours pass in milliseconds, so wall-clock caches
+                 # would hold every answer for the whole run
+                 'MARKET_DATA_CACHE_TTL': 0, 'BOT_STATS_INTERVAL': 0,
+                 # Small history bounds, so they are reached during warm-up and
+                 # anything still growing afterwards is unbounded
+                 'PAPER_DEAL_HISTORY': 5, 'ANALYSIS_CACHE_SIZE': 16, 'LLM_STATS_WINDOW': 20}
+    saved = {key: getattr(Config, key) for key in overrides}
+    saved_table = precision._table
+    tracing = tracemalloc.is_tracing()
+    # Status lines, and warnings for pairs returning with repaired candles
+    logging.disable(logging.WARNING)
+    try:
+        for key, value in overrides.items():
+            setattr(Config, key, value)
+        precision._table = None
+        bot = TradingBot(pairs=[])
+        symbols = [f'SOAK{i}USDT' for i in range(universe)]
+        start = time.time()
+        markets = {symbol: SyntheticMarket(symbol, i, start) for i, symbol in enumerate(symbols)}
+        three_commas = SoakThreeCommas()
+        llms = [SoakLLM('openai', 1), SoakLLM('anthropic', 2)]
+        bot.market_data._client = SoakBinance(markets)
+        bot.bot_manager._p3cw = three_commas
+        bot.ai_analyzer._openai_client, bot.ai_analyzer._claude_client = llms
+        if not tracing:
+            tracemalloc.start(1)
+        warmup = max(1, cycles // 10)
+        every = max(1, (cycles - warmup) // samples)
+        history: List[Dict[str, Any]] = []
+        started = time.perf_counter()
+
+        async def run():
+            for cycle in range(cycles):
+                now = start + cycle * interval
+                if cycle % churn_every == 0:
+                    offset = (cycle // churn_every) * pairs
+                    await bot.set_pairs([symbols[(offset + i) % universe] for i in range(pairs)])
+                for pair in bot.pairs:
+                    markets[pair].tick(now)
+                    three_commas.on_price(pair, markets[pair].price, now)
+                    await bot.process_trading_pair(pair)
+                bot.portfolio.step()
+                bot.get_status_snapshot()
+
+                done = cycle + 1
+                if done >= warmup and (done - warmup) % every == 0:
+                    gc.collect()
+                    sample = {'cycle': done, 'rss_mb': rss_bytes() / MB,
+                              'traced_mb': tracemalloc.get_traced_memory()[0] / MB}
+                    history.append(sample)
+                    if on_sample:
+                        on_sample(sample)
+
+        asyncio.run(run())
+        first, last = history[0], history[-1]
+        return {
+            'cycles': cycles,
+            'simulated_days': cycles * interval / 86400,
+            'seconds': time.perf_counter() - started,
+            'rss_growth_mb': last['rss_mb'] - first['rss_mb'],
+            'traced_growth_kb': (last['traced_mb'] - first['traced_mb']) * 1024,
+            'decisions': bot.ai_analyzer.router.decisions,
+            'llm_calls': sum(llm.calls for llm in llms),
+            'bot_updates': three_commas.updates,
+            'samples': history
+        }
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+        logging.disable(logging.NOTSET)
+        precision._table = saved_table
+        for key, value in saved.items():
+            setattr(Config, key, value)
+        workdir.cleanup()
@@ -0,0 +1,265 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+from config.config import Config
+from .resilience import RetryPolicy
+
+
+class RollingWindow:
+    """Running trade-flow sums over the last `seconds`, updated per trade"""
+
+    __slots__ = ('seconds', 'tail', 'buy_qty', 'sell_qty', 'notional', 'trades')
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.tail = 0  # sequence number of the oldest trade in the window
+        self.buy_qty = 0.0
+        self.sell_qty = 0.0
+        self.notional = 0.0
+        self.trades = 0
+
+    def add(self, price: float, qty: float, side: int):
+        if side > 0:
+            self.buy_qty += qty
+        else:
+            self.sell_qty += qty
+        self.notional += price * qty
+        self.trades += 1
+
+    def remove(self, price: float, qty: float, side: int):
+        if side > 0:
+            self.buy_qty -= qty
+        else:
+            self.sell_qty -= qty
+        self.notional -= price * qty
+        self.trades -= 1
+        self.tail += 1
+
+    def get_features(self) -> Dict[str, Optional[float]]:
+        volume = self.buy_qty + self.sell_qty
+        # Float drift from add/remove can leave tiny non-zero sums
+        if self.trades == 0 or volume <= 1e-12:
+            return {'volume': 0.0, 'trade_imbalance': None, 'vwap': None, 'trades': 0}
+        return {
+            'volume': volume,
+            'trade_imbalance': (self.buy_qty - self.sell_qty) / volume,
+            'vwap': self.notional / volume,
+            'trades': self.trades
+        }
+
+
+class TradeFlow:
+    """
+    Fixed-size ring buffer of aggregated trades with incrementally
+    maintained rolling windows. Appending a trade and expiring old ones is
+    O(1) amortized; nothing is recomputed over the whole buffer.
+    """
+
+    def __init__(self, capacity: Optional[int] = None, windows: Optional[List[float]] = None):
+        self.capacity = capacity or Config.ORDER_FLOW_BUFFER_SIZE
+        self.times = np.zeros(self.capacity)
+        self.prices = np.zeros(self.capacity)
+        self.qtys = np.zeros(self.capacity)
+        self.sides = np.zeros(self.capacity, dtype=np.int8)  # +1 buy, -1 sell aggressor
+        self.seq = 0  # total trades seen; slot = seq % capacity
+        self.windows = [RollingWindow(s) for s in (windows or Config.ORDER_FLOW_WINDOWS)]
+
+    def __len__(self) -> int:
+        return min(self.seq, self.capacity)
+
+    def _evict(self, window: RollingWindow):
+        slot = window.tail % self.capacity
+        window.remove(float(self.prices[slot]), float(self.qtys[slot]), int(self.sides[slot]))
+
+    def append(self, ts: float, price: float, qty: float, side: int):
+        """Add a trade (ts in seconds) and update every window"""
+        for window in self.windows:
+            # The slot about to be overwritten must leave the window first
+            if self.seq - window.tail >= self.capacity:
+                self._evict(window)
+        slot = self.seq % self.capacity
+        self.times[slot] = ts
+        self.prices[slot] = price
+        self.qtys[slot] = qty
+        self.sides[slot] = side
+        self.seq += 1
+        for window in self.windows:
+            window.add(price, qty, side)
+        self.expire(ts)
+
+    def expire(self, now: float):
+        """Drop trades older than each window's span"""
+        for window in self.windows:
+            while window.tail < self.seq and self.times[window.tail % self.capacity] <= now - window.seconds:
+                self._evict(window)
+
+    def get_features(self, now: Optional[float] = None) -> Dict[str, Dict[str, Optional[float]]]:
+        if now is not None:
+            self.expire(now)
+        return {f'{int(w.seconds)}s': w.get_features() for w in self.windows}
+
+
+class OrderBook:
+    """Latest top-N depth snapshot for a symbol"""
+
+    def __init__(self, levels: Optional[int] = None):
+        self.levels = levels or Config.ORDER_BOOK_LEVELS
+        self.bids = np.zeros((0, 2))  # (price, qty), best first
+        self.asks = np.zeros((0, 2))
+        self.updated = 0.0
+
+    def update(self, bids: List[List[str]], asks: List[List[str]], ts: Optional[float] = None):
+        self.bids = np.asarray(bids[:self.levels], dtype=float).reshape(-1, 2)
+        self.asks = np.asarray(asks[:self.levels], dtype=float).reshape(-1, 2)
+        self.updated = ts or time.time()
+
+    def get_features(self, now: Optional[float] = None) -> Dict[str, Optional[float]]:
+        if not len(self.bids) or not len(self.asks):
+            return {}
+        best_bid, best_ask = self.bids[0, 0], self.asks[0, 0]
+        mid = (best_bid + best_ask) / 2
+        bid_qty, ask_qty = self.bids[:, 1].sum(), self.asks[:, 1].sum()
+        depth = bid_qty + ask_qty
+        return {
+            'mid_price': float(mid),
+            'spread_bps': float((best_ask - best_bid) / mid * 10000),
+            'book_imbalance': float((bid_qty - ask_qty) / depth) if depth else None,
+            'bid_depth': float((self.bids[:, 0] * self.bids[:, 1]).sum()),
+            'ask_depth': float((self.asks[:, 0] * self.asks[:, 1]).sum()),
+            'book_age': (now or time.time()) - self.updated
+        }
+
+
+class OrderFlowTracker:
+    """Order book and trade flow state for one symbol"""
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.trades = TradeFlow()
+        self.book = OrderBook()
+
+    def on_trade(self, msg: Dict[str, Any]):
+        """Handle an aggTrade event (m=True means the seller was the aggressor)"""
+        self.trades.append(
+            msg['T'] / 1000, float(msg['p']), float(msg['q']),
+            -1 if msg['m'] else 1
+        )
+
+    def on_depth(self, msg: Dict[str, Any]):
+        """Handle a partial book depth event"""
+        self.book.update(msg['bids'], msg['asks'])
+
+    def get_features(self) -> Dict[str, Any]:
+        now = time.time()
+        features = self.book.get_features(now)
+        if len(self.trades):
+            features['windows'] = self.trades.get_features(now)
+        return features
+
+
+class OrderFlowManager:
+    """
+    Keeps per-symbol order flow features current from Binance websocket
+    streams (aggTrade and top-N partial depth), so reading them costs no
+    REST calls.
+    """
+
+    def __init__(self, symbols: List[str]):
+        self.trackers: Dict[str, OrderFlowTracker] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._client = None
+        self.started = False
+        self.reconnects = 0
+        # Called as listener(symbol, price, ts) for every aggregated trade
+        self.trade_listeners: List[Callable[[str, float, float], None]] = []
+        self.set_symbols(symbols)
+
+    def set_symbols(self, symbols: List[str]):
+        """Track a new set of symbols, (re)subscribing once started"""
+        if set(symbols) == set(self.trackers):
+            return
+        self.trackers = {
+            symbol: self.trackers.get(symbol) or OrderFlowTracker(symbol)
+            for symbol in symbols
+        }
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        # Started with no symbols (sharded workers get theirs later)
+        if self.started and self.trackers:
+            self._task = asyncio.create_task(self._run())
+
+    def get_features(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Current features for a symbol, None until data has arrived"""
+        tracker = self.trackers.get(symbol)
+        if not tracker:
+            return None
+        return tracker.get_features() or None
+
+    def handle_message(self, msg: Dict[str, Any]):
+        """Dispatch a combined-stream message to its symbol's tracker"""
+        stream, data = msg.get('stream', ''), msg.get('data')
+        if not data:
+            return
+        tracker = self.trackers.get(stream.split('@', 1)[0].upper())
+        if tracker is None:
+            return
+        if stream.endswith('@aggTrade'):
+            tracker.on_trade(data)
+            for listener in self.trade_listeners:
+                listener(tracker.symbol, float(data['p']), data['T'] / 1000)
+        elif '@depth' in stream:
+            tracker.on_depth(data)
+
+    def _streams(self) -> List[str]:
+        depth = f"depth{Config.ORDER_BOOK_LEVELS}@100ms"
+        streams = []
+        for symbol in self.trackers:
+            streams += [f"{symbol.lower()}@aggTrade", f"{symbol.lower()}@{depth}"]
+        return streams
+
+    async def _run(self):
+        from binance import AsyncClient, BinanceSocketManager
+
+        backoff = RetryPolicy(base_delay=1, max_delay=60)
+        failures = 0
+        while True:
+            try:
+                if self._client is None:
+                    self._client = await AsyncClient.create()
+                socket = BinanceSocketManager(self._client).multiplex_socket(self._streams())
+                async with socket as stream:
+                    failures = 0
+                    while True:
+                        msg = await stream.recv()
+                        if msg:
+                            self.handle_message(msg)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures += 1
+                self.reconnects += 1
+                delay = backoff.get_delay(failures)
+                logging.error(f"Order flow stream error: {str(e)}, reconnecting in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    def start(self):
+        """Start streaming in the background (once there are symbols)"""
+        self.started = True
+        if self._task is None and self.trackers:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self.started = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._client:
+            await self._client.close_connection()
+            self._client = None
@@ -0,0 +1,339 @@
+"""
+Paper trading: the BotManager interface backed by in-memory DCA bots.
+
+Bots follow the same ladder semantics as `dca_simulator` (safety orders
+at cumulative martingale steps below the entry, take profit on the
+average entry) but run tick by tick against live or replayed prices, so
+a strategy can run in shadow mode without 3Commas calls or cost.
+"""
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import numpy as np
+from config.config import Config
+from .bot_manager import LADDER_DEFAULTS, BotManager
+from .dca_simulator import LADDER_FIELDS
+
+_S = {name: i for i, name in enumerate(LADDER_FIELDS)}
+
+# Per-bot deal state columns
+_DEAL_FIELDS = ('entry', 'cost', 'qty', 'fills', 'next_so_price', 'next_so_volume',
+                'next_so_step', 'opened_at', 'fees')
+_D = {name: i for i, name in enumerate(_DEAL_FIELDS)}
+
+
+def _today() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+
+class PaperEngine:
+    """
+    In-memory DCA bots driven by price ticks.
+
+    Bot settings and open deal state live in NumPy arrays (one row per
+    bot), and each tick updates every bot on that pair at once: opening
+    deals, filling safety orders and closing at take profit or stop loss.
+    Limit orders (safety orders, take profit) fill at their level;
+    stop losses fill at the tick price. A fee of PAPER_FEE_RATE is charged
+    on every fill.
+    """
+
+    def __init__(self, capacity: int = 64, fee_rate: Optional[float] = None):
+        self.fee_rate = Config.PAPER_FEE_RATE if fee_rate is None else fee_rate
+        self.count = 0
+        self.settings = np.zeros((capacity, len(LADDER_FIELDS)))
+        self.deals = np.zeros((capacity, len(_DEAL_FIELDS)))
+        self.enabled = np.zeros(capacity, dtype=bool)
+        self.in_deal = np.zeros(capacity, dtype=bool)
+        self.realized = np.zeros(capacity)
+        self.completed = np.zeros(capacity, dtype=np.int64)
+        self.last_price = np.zeros(capacity)
+        self.pairs: List[str] = []
+        self.pair_bots: Dict[str, np.ndarray] = {}
+        self.history: List[deque] = []
+        self.free_rows: List[int] = []  # rows of removed bots, reused first
+        self.profit_today: Dict[int, float] = {}
+        self.today = _today()
+        self.ticks = 0
+
+    def _grow(self):
+        size = 2 * len(self.enabled)
+        for name in ('settings', 'deals'):
+            old = getattr(self, name)
+            new = np.zeros((size, old.shape[1]))
+            new[:len(old)] = old
+            setattr(self, name, new)
+        for name in ('enabled', 'in_deal', 'realized', 'completed', 'last_price'):
+            old = getattr(self, name)
+            new = np.zeros(size, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def add_bot(self, pair: str, settings: Dict[str, Any]) -> int:
+        """Register a bot; returns its row index"""
+        if self.free_rows:
+            i = self.free_rows.pop()
+            self.pairs[i] = pair
+            self.history[i] = deque(maxlen=Config.PAPER_DEAL_HISTORY)
+        else:
+            if self.count == len(self.enabled):
+                self._grow()
+            i = self.count
+            self.count += 1
+            self.pairs.append(pair)
+            self.history.append(deque(maxlen=Config.PAPER_DEAL_HISTORY))
+        self.settings[i] = [float(settings.get(name) or 0) for name in LADDER_FIELDS]
+        self.enabled[i] = True
+        self.pair_bots[pair] = np.append(self.pair_bots.get(pair, np.zeros(0, dtype=np.int64)), i)
+        return i
+
+    def remove_bot(self, i: int):
+        """Free a bot's row (it must not be in a deal) for reuse by add_bot"""
+        bots = self.pair_bots.get(self.pairs[i])
+        if bots is not None:
+            bots = bots[bots != i]
+            if len(bots):
+                self.pair_bots[self.pairs[i]] = bots
+            else:
+                del self.pair_bots[self.pairs[i]]
+        self.enabled[i] = self.in_deal[i] = False
+        self.settings[i] = self.deals[i] = 0.0
+        self.realized[i] = self.completed[i] = self.last_price[i] = 0
+        self.history[i].clear()
+        self.profit_today.pop(i, None)
+        self.free_rows.append(i)
+
+    def update_settings(self, i: int, settings: Dict[str, Any]):
+        """Change a bot's settings; open deals keep their current ladder until closed"""
+        for name, value in settings.items():
+            if name in _S:
+                self.settings[i, _S[name]] = float(value or 0)
+
+    def _roll_day(self):
+        today = _today()
+        if today != self.today:
+            self.today = today
+            self.profit_today = {}
+
+    def on_price(self, pair: str, price: float, ts: Optional[float] = None):
+        """Process one price tick for every bot on `pair`"""
+        bots = self.pair_bots.get(pair)
+        if bots is None or not len(bots):
+            return
+        ts = ts or time.time()
+        self.ticks += 1
+        self.last_price[bots] = price
+        settings, deals = self.settings[bots], self.deals[bots]
+        fee = self.fee_rate
+
+        # Open a base order for enabled bots without a deal (nonstop strategy)
+        opening = self.enabled[bots] & ~self.in_deal[bots]
+        if opening.any():
+            base = settings[opening, _S['base_order_volume']]
+            step = settings[opening, _S['safety_order_step_percentage']]
+            deals[opening, _D['entry']] = price
+            deals[opening, _D['cost']] = base
+            deals[opening, _D['qty']] = base * (1 - fee) / price
+            deals[opening, _D['fees']] = base * fee
+            deals[opening, _D['fills']] = 0
+            deals[opening, _D['next_so_step']] = step
+            deals[opening, _D['next_so_price']] = price * (1 - step / 100)
+            deals[opening, _D['next_so_volume']] = settings[opening, _S['safety_order_volume']]
+            deals[opening, _D['opened_at']] = ts
+            self.in_deal[bots[opening]] = True
+
+        active = self.in_deal[bots]
+        # Safety orders: a large drop can fill several levels in one tick
+        for _ in range(int(settings[:, _S['max_safety_orders']].max(initial=0))):
+            fill = (active & (deals[:, _D['fills']] < settings[:, _S['max_safety_orders']]) &
+                    (price <= deals[:, _D['next_so_price']]))
+            if not fill.any():
+                break
+            level = deals[fill, _D['next_so_price']]
+            volume = deals[fill, _D['next_so_volume']]
+            deals[fill, _D['cost']] += volume
+            deals[fill, _D['qty']] += volume * (1 - fee) / level
+            deals[fill, _D['fees']] += volume * fee
+            deals[fill, _D['fills']] += 1
+            deals[fill, _D['next_so_step']] *= settings[fill, _S['martingale_step_coefficient']]
+            deals[fill, _D['next_so_price']] = (
+                level - deals[fill, _D['entry']] * deals[fill, _D['next_so_step']] / 100
+            )
+            deals[fill, _D['next_so_volume']] *= settings[fill, _S['martingale_volume_coefficient']]
+
+        # Exits against the average entry ('total' take profit)
+        avg = deals[:, _D['cost']] / np.where(deals[:, _D['qty']] > 0, deals[:, _D['qty']], np.inf)
+        tp_price = avg * (1 + settings[:, _S['take_profit']] / 100)
+        sl = settings[:, _S['stop_loss_percentage']]
+        take_profit = active & (price >= tp_price)
+        stop_loss = active & ~take_profit & (sl > 0) & (price <= avg * (1 - sl / 100))
+        closing = take_profit | stop_loss
+        self.deals[bots] = deals
+        if closing.any():
+            exit_price = np.where(take_profit, tp_price, price)
+            proceeds = deals[:, _D['qty']] * exit_price * (1 - fee)
+            profit = proceeds - deals[:, _D['cost']]
+            self._close(bots[closing], profit[closing], exit_price[closing],
+                        np.where(take_profit, 'take_profit', 'stop_loss')[closing], ts)
+
+    def _close(self, rows: np.ndarray, profits: np.ndarray, prices: np.ndarray,
+               reasons: np.ndarray, ts: float):
+        self._roll_day()
+        self.in_deal[rows] = False
+        self.realized[rows] += profits
+        self.completed[rows] += 1
+        for i, profit, price, reason in zip(rows.tolist(), profits.tolist(), prices.tolist(), reasons.tolist()):
+            deal = self.deals[i]
+            self.profit_today[i] = self.profit_today.get(i, 0.0) + profit
+            self.history[i].append({
+                'id': int(self.completed[i]),
+                'pair': self.pairs[i],
+                'status': 'completed',
+                'close_reason': reason,
+                'bought_volume': float(deal[_D['cost']]),
+                'bought_average_price': float(deal[_D['cost']] / deal[_D['qty']]),
+                'sold_average_price': price,
+                'completed_safety_orders_count': int(deal[_D['fills']]),
+                'final_profit': profit,
+                'fees': float(deal[_D['fees']]),
+                'created_at': deal[_D['opened_at']],
+                'closed_at': ts
+            })
+
+    def close_all(self, i: int, ts: Optional[float] = None):
+        """Market-sell a bot's open deal at the last price (panic sell)"""
+        if not self.in_deal[i]:
+            return
+        price = self.last_price[i]
+        deal = self.deals[i]
+        profit = deal[_D['qty']] * price * (1 - self.fee_rate) - deal[_D['cost']]
+        self._close(np.array([i]), np.array([profit]), np.array([price]),
+                    np.array(['panic_sell']), ts or time.time())
+
+    def replay(self, pair: str, prices: Sequence[float], timestamps: Optional[Sequence[float]] = None):
+        """Feed a recorded price series through the bots on `pair`"""
+        timestamps = timestamps if timestamps is not None else [None] * len(prices)
+        for price, ts in zip(prices, timestamps):
+            self.on_price(pair, float(price), ts)
+
+    def get_stats(self, i: int) -> Dict[str, Any]:
+        """Bot statistics shaped like 3Commas bots/stats"""
+        self._roll_day()
+        unrealized = 0.0
+        if self.in_deal[i]:
+            deal = self.deals[i]
+            unrealized = float(deal[_D['qty']] * self.last_price[i] - deal[_D['cost']])
+        return {
+            'overall_stats': {'completed_deals': int(self.completed[i])},
+            'profits_in_usd': {
+                'overall_usd_profit': float(self.realized[i]),
+                'today_usd_profit': self.profit_today.get(i, 0.0),
+                'active_deals_usd_profit': unrealized
+            },
+            'active_deals': int(self.in_deal[i])
+        }
+
+
+class PaperBotManager(BotManager):
+    """
+    BotManager with the same interface that runs bots in a local
+    PaperEngine instead of on 3Commas: no API keys, cost or rate limits.
+    Prices come from `on_price` (live ticks) or `engine.replay`.
+    """
+
+    def __init__(self, engine: Optional[PaperEngine] = None):
+        super().__init__()
+        self.engine = engine or PaperEngine()
+        self.rows: Dict[int, int] = {}  # bot_id -> engine row
+        self.next_id = 1
+
+    def on_price(self, pair: str, price: float, ts: Optional[float] = None):
+        self.engine.on_price(pair, price, ts)
+
+    def _row(self, bot_id: int) -> Optional[int]:
+        row = self.rows.get(int(bot_id))
+        if row is None:
+            logging.error(f"Unknown paper bot {bot_id}")
+        return row
+
+    async def verify_credentials(self) -> bool:
+        return True
+
+    async def get_account_info(self) -> Optional[Dict]:
+        return {'id': 0, 'name': 'paper'}
+
+    async def create_bot(self, pair: str) -> Optional[Dict]:
+        """Create a simulated DCA bot for a trading pair"""
+        bot_id = self.next_id
+        self.next_id += 1
+        self.rows[bot_id] = self.engine.add_bot(pair, LADDER_DEFAULTS)
+        self.active_bots[pair] = bot_id
+        logging.info(f"Created paper bot for {pair} with ID: {bot_id}")
+        return {'id': bot_id, 'pairs': [pair], 'is_enabled': True, 'paper': True}
+
+    def prune_bots(self, pairs: Iterable[str]):
+        """BotManager.prune_bots, freeing the engine rows of forgotten bots (not in a deal)"""
+        pairs = set(pairs)
+        inactive = [pair for pair, bot_id in self.active_bots.items()
+                    if pair not in pairs and not self.engine.in_deal[self.rows[bot_id]]]
+        for pair in inactive[:max(0, len(inactive) - Config.INACTIVE_BOTS_KEPT)]:
+            bot_id = self.active_bots.pop(pair)
+            self.applied_settings.pop(bot_id, None)
+            self.engine.remove_bot(self.rows.pop(bot_id))
+
+    async def update_bot_settings(self, bot_id: int, settings: Dict[str, Any]) -> bool:
+        row = self._row(bot_id)
+        if row is None:
+            return False
+        self.engine.update_settings(row, settings)
+        self.applied_settings.setdefault(bot_id, {}).update(settings)
+        logging.info(f"Updated paper bot {bot_id} settings")
+        return True
+
+    async def start_bot(self, bot_id: int) -> bool:
+        row = self._row(bot_id)
+        if row is None:
+            return False
+        self.engine.enabled[row] = True
+        return True
+
+    async def stop_bot(self, bot_id: int) -> bool:
+        """Stop opening new deals (open deals keep running, as on 3Commas)"""
+        row = self._row(bot_id)
+        if row is None:
+            return False
+        self.engine.enabled[row] = False
+        return True
+
+    async def get_bot_deals(self, bot_id: int, limit: int = 10) -> List[Dict]:
+        row = self._row(bot_id)
+        if row is None:
+            return []
+        return list(self.engine.history[row])[-limit:][::-1]
+
+    async def get_bot_stats(self, bot_id: int) -> Optional[Dict]:
+        row = self._row(bot_id)
+        if row is None:
+            return None
+        return self.engine.get_stats(row)
+
+    async def panic_sell_bot(self, bot_id: int) -> bool:
+        row = self._row(bot_id)
+        if row is None:
+            return False
+        await self.stop_bot(bot_id)
+        self.engine.close_all(row)
+        logging.info(f"Paper bot {bot_id} panic sold")
+        return True
+
+    async def get_active_deals_count(self) -> int:
+        return int(self.engine.in_deal[:self.engine.count].sum())
+
+    def get_state(self) -> Dict[str, Any]:
+        """Paper bots live only in memory and are recreated on restart"""
+        return {'active_bots': {}, 'applied_settings': {}}
+
+    def restore_state(self, state: Dict[str, Any]):
+        pass
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# A stage handler takes a work item and returns the item for the next
+# stage, or None to drop it from the pipeline.
+StageHandler = Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class PipelineStage:
+    """A bounded queue served by a fixed pool of async workers"""
+
+    def __init__(self, name: str, handler: StageHandler,
+                 workers: int = 1, queue_size: int = 10):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.next_stage: Optional['PipelineStage'] = None
+        # Called with each item that leaves the pipeline at this stage
+        self.on_done: Optional[Callable[[Dict[str, Any]], None]] = None
+        self._tasks: List[asyncio.Task] = []
+
+        # Stage metrics; each item counts as exactly one of processed
+        # (passed on or finished), dropped (handler returned None) or errors
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.busy_workers = 0
+        self.total_service_time = 0.0
+        self.max_service_time = 0.0
+
+    def start(self):
+        """Spawn the worker tasks for this stage"""
+        for i in range(self.workers):
+            self._tasks.append(
+                asyncio.create_task(self._worker(), name=f"{self.name}-{i}")
+            )
+
+    async def stop(self):
+        """Cancel the worker tasks for this stage"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self):
+        while True:
+            item = await self.queue.get()
+            self.busy_workers += 1
+            started = time.perf_counter()
+            done = True
+            try:
+                result = await self.handler(item)
+                if result is None:
+                    self.dropped += 1
+                else:
+                    if self.next_stage is not None:
+                        # Blocks while the downstream queue is full (backpressure)
+                        await self.next_stage.queue.put(result)
+                        done = False
+                    self.processed += 1
+            except asyncio.CancelledError:
+                done = False
+                raise
+            except Exception as e:
+                self.errors += 1
+                logging.error(f"Error in {self.name} stage for "
+                              f"{item.get('pair', 'unknown')}: {str(e)}")
+            finally:
+                if done and self.on_done is not None:
+                    self.on_done(item)
+                elapsed = time.perf_counter() - started
+                self.total_service_time += elapsed
+                self.max_service_time = max(self.max_service_time, elapsed)
+                self.busy_workers -= 1
+                self.queue.task_done()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and service time metrics for this stage"""
+        handled = self.processed + self.dropped + self.errors
+        return {
+            'workers': self.workers,
+            'busy_workers': self.busy_workers,
+            'queue_depth': self.queue.qsize(),
+            'queue_capacity': self.queue.maxsize,
+            'processed': self.processed,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'avg_service_time': self.total_service_time / handled if handled else 0.0,
+            'max_service_time': self.max_service_time
+        }
+
+
+class TradingPipeline:
+    """
+    Chain of producer/consumer stages connected by bounded queues.
+
+    Each stage has its own worker pool, so a slow stage (e.g. LLM analysis)
+    only holds up the items queued behind it, and a full queue pushes back
+    on the stage feeding it.
+    """
+
+    def __init__(self):
+        self.stages: List[PipelineStage] = []
+        self.in_flight: Dict[str, float] = {}  # pair -> submit time
+        self.last_latency: Dict[str, float] = {}  # pair -> seconds
+        self.is_running = False
+
+    def add_stage(self, name: str, handler: StageHandler,
+                  workers: int = 1, queue_size: int = 10) -> PipelineStage:
+        """Append a stage to the end of the pipeline"""
+        stage = PipelineStage(name, handler, workers, queue_size)
+        stage.on_done = lambda item: self.complete(item['pair'])
+        if self.stages:
+            self.stages[-1].next_stage = stage
+        self.stages.append(stage)
+        return stage
+
+    def start(self):
+        """Start the workers of every stage"""
+        if self.is_running:
+            return
+        for stage in self.stages:
+            stage.start()
+        self.is_running = True
+
+    async def stop(self):
+        """Stop all stage workers, dropping any queued items"""
+        for stage in self.stages:
+            await stage.stop()
+        self.in_flight.clear()
+        self.is_running = False
+
+    async def submit(self, pair: str) -> bool:
+        """
+        Queue a pair at the first stage. Returns False if the pair is still
+        in flight from a previous cycle.
+        """
+        if pair in self.in_flight:
+            return False
+        self.in_flight[pair] = time.perf_counter()
+        await self.stages[0].queue.put({'pair': pair})
+        return True
+
+    def complete(self, pair: str) -> Optional[float]:
+        """Mark a pair as done; returns its end-to-end latency in seconds"""
+        started = self.in_flight.pop(pair, None)
+        if started is None:
+            return None
+        latency = time.perf_counter() - started
+        self.last_latency[pair] = latency
+        return latency
+
+    async def join(self):
+        """Wait until every queued item has passed through all stages"""
+        for stage in self.stages:
+            await stage.queue.join()
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-stage metrics keyed by stage name"""
+        return {stage.name: stage.get_stats() for stage in self.stages}
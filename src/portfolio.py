@@ -0,0 +1,213 @@
+import logging
+import math
+from typing import Any, Dict, List, Optional
+import numpy as np
+from config.config import Config
+from .utils.trading_utils import calculate_position_size
+
+
+class IncrementalCovariance:
+    """
+    Exponentially weighted covariance of per-pair returns.
+
+    Each update costs O(k^2) for the k pairs observed in that step; nothing
+    is recomputed from the price history. Pairs can be added and removed at
+    any time; a removed pair's slot is reused by the next one added.
+    """
+
+    def __init__(self, halflife: Optional[float] = None):
+        halflife = halflife or Config.PORTFOLIO_COV_HALFLIFE
+        self.alpha = 1 - 0.5 ** (1 / halflife)
+        self.index: Dict[str, int] = {}
+        self.mean = np.zeros(0)
+        self.cov = np.zeros((0, 0))
+        self.observations = np.zeros(0, dtype=int)
+        self.last_price: Dict[str, float] = {}
+        self.free: List[int] = []
+
+    def _add_pair(self, pair: str) -> int:
+        if self.free:
+            n = self.free.pop()
+            self.index[pair] = n
+            return n
+        n = len(self.index)
+        self.index[pair] = n
+        if n == len(self.mean):
+            # Grow storage geometrically so adding pairs stays cheap
+            size = max(8, 2 * n)
+            mean, cov, obs = np.zeros(size), np.zeros((size, size)), np.zeros(size, dtype=int)
+            mean[:n], cov[:n, :n], obs[:n] = self.mean[:n], self.cov[:n, :n], self.observations[:n]
+            self.mean, self.cov, self.observations = mean, cov, obs
+        return n
+
+    def remove(self, pair: str):
+        """Forget a pair's statistics and free its slot"""
+        n = self.index.pop(pair, None)
+        self.last_price.pop(pair, None)
+        if n is None:
+            return
+        self.mean[n] = 0.0
+        self.cov[n, :] = 0.0
+        self.cov[:, n] = 0.0
+        self.observations[n] = 0
+        self.free.append(n)
+
+    def update(self, prices: Dict[str, float]):
+        """Record the latest price of each pair observed this step"""
+        idx, returns = [], []
+        for pair, price in prices.items():
+            previous = self.last_price.get(pair)
+            self.last_price[pair] = price
+            if pair not in self.index:
+                self._add_pair(pair)
+            if previous:
+                idx.append(self.index[pair])
+                returns.append(math.log(price / previous))
+        if not idx:
+            return
+        idx = np.array(idx)
+        diff = np.array(returns) - self.mean[idx]
+        self.mean[idx] += self.alpha * diff
+        block = np.ix_(idx, idx)
+        self.cov[block] = (1 - self.alpha) * (self.cov[block] + self.alpha * np.outer(diff, diff))
+        self.observations[idx] += 1
+
+    def get(self, pairs: List[str]) -> Optional[np.ndarray]:
+        """Covariance submatrix for `pairs` (None if any is unknown)"""
+        if any(pair not in self.index for pair in pairs):
+            return None
+        idx = np.array([self.index[pair] for pair in pairs])
+        return self.cov[np.ix_(idx, idx)]
+
+    def warm(self, pairs: List[str]) -> bool:
+        """Whether every pair has enough returns for a usable estimate"""
+        return all(
+            pair in self.index and
+            self.observations[self.index[pair]] >= Config.PORTFOLIO_MIN_OBSERVATIONS
+            for pair in pairs
+        )
+
+    def get_state(self) -> Dict[str, Any]:
+        idx = np.array(list(self.index.values()), dtype=int)
+        return {
+            'pairs': list(self.index),
+            'mean': self.mean[idx].tolist(),
+            'cov': self.cov[np.ix_(idx, idx)].tolist(),
+            'observations': self.observations[idx].tolist(),
+            'last_price': self.last_price
+        }
+
+    def restore_state(self, state: Dict[str, Any]):
+        if self.index:
+            return  # only restore into an empty estimator
+        for pair in state.get('pairs', []):
+            self._add_pair(pair)
+        n = len(self.index)
+        if n:
+            self.mean[:n] = state['mean']
+            self.cov[:n, :n] = state['cov']
+            self.observations[:n] = state['observations']
+        self.last_price.update(state.get('last_price', {}))
+
+
+class PortfolioAllocator:
+    """
+    Sizes each bot's base and safety order volumes across all active pairs.
+
+    The most confident candidates (up to MAX_CONCURRENT_TRADES) share the
+    remaining daily loss budget. Each pair gets a risk share proportional
+    to confidence / volatility, reduced by its correlation with the other
+    selected pairs. The risk share is turned into ladder capital with
+    calculate_position_size, so if every selected deal hit its stop loss
+    the day's loss would stay within MAX_DAILY_LOSS.
+    """
+
+    def __init__(self, covariance: Optional[IncrementalCovariance] = None):
+        self.covariance = covariance or IncrementalCovariance()
+        self.candidates: Dict[str, Dict[str, float]] = {}
+        self.allocation: Dict[str, Dict[str, float]] = {}
+        self.pending_prices: Dict[str, float] = {}
+
+    def observe_price(self, pair: str, price: float):
+        """Record a pair's latest price (applied on the next step())"""
+        self.pending_prices[pair] = price
+
+    def step(self):
+        """Feed the prices seen since the last step into the covariance as one observation"""
+        if self.pending_prices:
+            self.covariance.update(self.pending_prices)
+            self.pending_prices = {}
+
+    def observe_analysis(self, pair: str, market_data: Dict[str, Any],
+                         analysis: Optional[Dict[str, Any]]):
+        """Make a pair a candidate for capital if its analysis says to trade"""
+        if analysis and analysis.get('should_trade'):
+            self.candidates[pair] = {
+                'confidence': analysis.get('average_confidence', 0),
+                'volatility': market_data.get('volatility') or 0.0,
+                'stop_loss': analysis.get('stop_loss') or Config.STOP_LOSS_PERCENTAGE
+            }
+        else:
+            self.candidates.pop(pair, None)
+
+    def remove(self, pair: str):
+        self.covariance.remove(pair)
+        self.candidates.pop(pair, None)
+        self.allocation.pop(pair, None)
+        self.pending_prices.pop(pair, None)
+
+    def _volatility_and_correlation(self, pairs: List[str]):
+        cov = self.covariance.get(pairs)
+        if cov is not None and self.covariance.warm(pairs):
+            sigma = np.sqrt(np.clip(np.diag(cov), 1e-18, None))
+            return sigma, cov / np.outer(sigma, sigma)
+        # Until enough returns are seen: snapshot volatility, no correlation
+        sigma = np.array([max(self.candidates[p]['volatility'], 1e-6) for p in pairs])
+        return sigma, np.eye(len(pairs))
+
+    def allocate(self, ladder_multiplier: float, daily_pnl: float = 0.0,
+                 min_order_volumes: Optional[Dict[str, float]] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Allocate capital to the current candidates.
+
+        `ladder_multiplier` is the full ladder capital per unit of base
+        order volume (1 + sum of safety order volume coefficients).
+        `min_order_volumes` holds exchange minimum notionals per pair.
+        """
+        min_order_volumes = min_order_volumes or {}
+        budget = Config.MAX_DAILY_LOSS + min(daily_pnl, 0.0)
+        ranked = sorted(self.candidates, key=lambda p: self.candidates[p]['confidence'], reverse=True)
+        pairs = ranked[:Config.MAX_CONCURRENT_TRADES]
+        self.allocation = {}
+        if not pairs or budget <= 0:
+            return self.allocation
+
+        sigma, corr = self._volatility_and_correlation(pairs)
+        confidence = np.array([self.candidates[p]['confidence'] for p in pairs]) / 100
+        raw = confidence / sigma
+        # Pairs moving together share one slice of risk
+        raw /= np.abs(corr).sum(axis=1)
+        shares = raw / raw.sum()
+
+        for pair, share in zip(pairs, shares):
+            capital = calculate_position_size(budget, share * 100, self.candidates[pair]['stop_loss'])
+            capital = min(capital, Config.LADDER_MAX_CAPITAL)
+            # Round down to the cent so the ladder stays within its caps
+            base = math.floor(capital / ladder_multiplier * 100) / 100
+            if base < max(Config.MIN_ORDER_VOLUME, min_order_volumes.get(pair, 0.0)):
+                logging.info(f"Allocation for {pair} below minimum order ({base}), skipped")
+                continue
+            self.allocation[pair] = {
+                'base_order_volume': base,
+                'safety_order_volume': base,
+                'capital': round(base * ladder_multiplier, 2),
+                'risk_share': float(share)
+            }
+        return self.allocation
+
+    def get_state(self) -> Dict[str, Any]:
+        return {'covariance': self.covariance.get_state()}
+
+    def restore_state(self, state: Dict[str, Any]):
+        if state.get('covariance'):
+            self.covariance.restore_state(state['covariance'])
@@ -0,0 +1,234 @@
+import hashlib
+import logging
+import math
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from config.config import Config
+
+# Static blocks go first and never change between calls; only the data
+# section varies. Providers only cache prefixes above a minimum size
+# (Config.AI_PROMPT_CACHE_MIN_TOKENS), which this compact system block is
+# well below, so it is re-read in full on every call.
+SYSTEM_BLOCK = (
+    "You are a crypto trading expert advising an automated DCA bot on 3Commas. "
+    "For the market snapshot you are given, decide whether to BUY, SELL or HOLD, "
+    "how confident you are (0-100), the stop loss and take profit as percentages "
+    "from the entry price, and the overall risk (1-10). Prefer HOLD unless the "
+    "data clearly supports a trade."
+)
+
+LINE_FORMAT_INSTRUCTIONS = (
+    "Provide in this exact format:\n"
+    "DECISION: [BUY/SELL/HOLD]\n"
+    "CONFIDENCE: [0-100]\n"
+    "STOP_LOSS: [percentage]\n"
+    "TAKE_PROFIT: [percentage]\n"
+    "RISK: [1-10]"
+)
+
+JSON_FORMAT_INSTRUCTIONS = (
+    "Respond with only a JSON object in this exact format:\n"
+    '{"decision": "BUY|SELL|HOLD", "confidence": 0-100, '
+    '"stop_loss": percentage, "take_profit": percentage, "risk": 1-10}'
+)
+
+DATA_LEGEND = (
+    "Data keys: px=price, chg24h=24h change %, vol24h=24h volume, "
+    "volat=avg hourly move %, rsi=RSI(14), vs_sma=price vs SMA(20) %, "
+    "imb=buy-sell imbalance (-1..1) of book depth or trade volume."
+)
+
+_encoder = None
+_encoder_loaded = False
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens with tiktoken when it is installed, otherwise estimate
+    (~4 characters per token for this kind of English/number mix).
+    """
+    global _encoder, _encoder_loaded
+    if not _encoder_loaded:
+        _encoder_loaded = True
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding('cl100k_base')
+        except Exception:
+            _encoder = None
+    if _encoder is not None:
+        return len(_encoder.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def _num(value: Any, digits: int = 2) -> str:
+    """Compact number formatting for the data section"""
+    if value is None or value == 'N/A':
+        return 'na'
+    if isinstance(value, (int, float)):
+        if abs(value) >= 1e6:
+            return f"{value:.3g}"
+        return f"{value:.{digits}f}".rstrip('0').rstrip('.')
+    return str(value)
+
+
+class PromptRequest:
+    """A built prompt: static system text plus the per-call data section"""
+
+    __slots__ = ('system', 'user', 'max_tokens', 'input_tokens', 'sections', 'system_tokens')
+
+    def __init__(self, system: str, user: str, max_tokens: int,
+                 input_tokens: int, sections: List[str], system_tokens: int = 0):
+        self.system = system
+        self.user = user
+        self.max_tokens = max_tokens
+        self.input_tokens = input_tokens
+        self.sections = sections
+        self.system_tokens = system_tokens
+
+    @property
+    def digest(self) -> str:
+        """Stable key for caching responses to identical prompts"""
+        return hashlib.sha1(f"{self.system}\x00{self.user}".encode()).hexdigest()
+
+    def openai_messages(self) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": self.user}
+        ]
+
+    def anthropic_system(self) -> Any:
+        """System text, marked cacheable only when it is long enough to be cached"""
+        if not Config.AI_PROMPT_CACHING or self.system_tokens < Config.AI_PROMPT_CACHE_MIN_TOKENS:
+            return self.system
+        return [{
+            "type": "text",
+            "text": self.system,
+            "cache_control": {"type": "ephemeral"}
+        }]
+
+    def anthropic_messages(self) -> List[Dict[str, str]]:
+        return [{"role": "user", "content": self.user}]
+
+    def __str__(self) -> str:
+        return f"{self.system}\n\n{self.user}"
+
+
+class PromptBuilder:
+    """
+    Builds analysis prompts within a token budget.
+
+    The data section is made of prioritized sections; optional context
+    (other timeframes, order flow, ...) is dropped lowest priority first
+    when the prompt would exceed `token_budget`.
+    """
+
+    def __init__(self, token_budget: Optional[int] = None,
+                 max_output_tokens: Optional[int] = None,
+                 structured: Optional[bool] = None):
+        self.token_budget = token_budget or Config.PROMPT_TOKEN_BUDGET
+        self.max_output_tokens = max_output_tokens or Config.AI_MAX_OUTPUT_TOKENS
+        structured = Config.AI_STRUCTURED_OUTPUT if structured is None else structured
+        self.system = "\n\n".join((
+            SYSTEM_BLOCK,
+            JSON_FORMAT_INSTRUCTIONS if structured else LINE_FORMAT_INSTRUCTIONS,
+            DATA_LEGEND
+        ))
+        self.system_tokens = count_tokens(self.system)
+        # (priority, name, renderer); lower priority is dropped first
+        self.sections: List[Tuple[int, str, Callable[[Dict[str, Any]], Optional[str]]]] = [
+            (100, 'market', self._market_section),
+            (50, 'timeframes', self._timeframes_section),
+            (40, 'regime', self._regime_section),
+            (30, 'order_flow', self._order_flow_section),
+            (20, 'cross_venue', self._cross_venue_section)
+        ]
+
+    def add_section(self, name: str, renderer: Callable[[Dict[str, Any]], Optional[str]],
+                    priority: int = 10):
+        """Register an optional context section (rendered only if data is present)"""
+        self.sections.append((priority, name, renderer))
+
+    @staticmethod
+    def _market_section(market_data: Dict[str, Any]) -> str:
+        indicators = market_data.get('indicators') or {}
+        return (
+            f"{market_data.get('symbol', 'pair')} "
+            f"px={_num(market_data.get('current_price'), 8)} "
+            f"chg24h={_num(market_data.get('price_change_24h'))} "
+            f"vol24h={_num(market_data.get('volume_24h'))} "
+            f"trend={market_data.get('trend', 'na')} "
+            f"volat={_num(market_data.get('volatility'))} "
+            f"rsi={_num(indicators.get('rsi_14'))} "
+            f"vs_sma={_num(indicators.get('price_vs_sma'))}"
+        )
+
+    @staticmethod
+    def _timeframes_section(market_data: Dict[str, Any]) -> Optional[str]:
+        timeframes = market_data.get('timeframes')
+        if not timeframes:
+            return None
+        return "\n".join(
+            f"tf {interval}: trend={tf.get('trend', 'na')} "
+            f"rsi={_num(tf.get('rsi_14'))} vs_sma={_num(tf.get('price_vs_sma'))}"
+            for interval, tf in timeframes.items()
+        )
+
+    @staticmethod
+    def _regime_section(market_data: Dict[str, Any]) -> Optional[str]:
+        regime = market_data.get('regime')
+        if not regime:
+            return None
+        return (f"regime={regime['regime']} volat_ratio={_num(regime['vol_ratio'])} "
+                f"trend_strength={_num(regime['trend'])}")
+
+    @staticmethod
+    def _order_flow_section(market_data: Dict[str, Any]) -> Optional[str]:
+        flow = market_data.get('order_flow')
+        if not flow:
+            return None
+        parts = []
+        if 'spread_bps' in flow:
+            parts.append(f"book spread_bps={_num(flow['spread_bps'])} "
+                         f"imb={_num(flow.get('book_imbalance'))}")
+        for window, stats in (flow.get('windows') or {}).items():
+            if stats.get('trades'):
+                parts.append(f"flow {window}: imb={_num(stats['trade_imbalance'])} "
+                             f"vwap={_num(stats['vwap'], 8)}")
+        return "\n".join(parts) or None
+
+    @staticmethod
+    def _cross_venue_section(market_data: Dict[str, Any]) -> Optional[str]:
+        venues = market_data.get('cross_venue')
+        if not venues:
+            return None
+        text = f"venues n={venues['venues']} spread_bps={_num(venues['spread_bps'])}"
+        if 'best_bid' in venues and 'best_ask' in venues:
+            text += (f" bid={venues['best_bid_venue']}:{_num(venues['best_bid'], 8)}"
+                     f" ask={venues['best_ask_venue']}:{_num(venues['best_ask'], 8)}")
+        return text
+
+    def build(self, market_data: Dict[str, Any]) -> PromptRequest:
+        """Render the prompt, dropping optional sections to fit the budget"""
+        rendered = []
+        for priority, name, renderer in self.sections:
+            text = renderer(market_data)
+            if text:
+                rendered.append((priority, name, text, count_tokens(text)))
+
+        total = self.system_tokens + sum(tokens for *_, tokens in rendered)
+        # Drop lowest-priority sections until within budget (never the market data)
+        for entry in sorted(rendered, key=lambda e: e[0]):
+            if total <= self.token_budget or entry[1] == 'market':
+                break
+            rendered.remove(entry)
+            total -= entry[3]
+            logging.debug(f"Prompt over budget, dropped '{entry[1]}' section")
+
+        user = "\n".join(text for _, _, text, _ in rendered)
+        return PromptRequest(
+            system=self.system,
+            user=user,
+            max_tokens=self.max_output_tokens,
+            input_tokens=total,
+            sections=[name for _, name, _, _ in rendered],
+            system_tokens=self.system_tokens
+        )
@@ -0,0 +1,88 @@
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator
+
+
+class Record(Mapping):
+    """
+    Fixed-field record with dict-style read access, so it can stand in for
+    the dicts the rest of the code reads (record['x'], record.get('x'),
+    'x' in record). Fields live in __slots__: no per-instance __dict__ and
+    no keys beyond the declared ones. Unset fields read as missing keys.
+    """
+    __slots__ = ()
+
+    def __init__(self, **fields: Any):
+        for key, value in fields.items():
+            self[key] = value
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.__slots__:
+            raise KeyError(f"{type(self).__name__} has no field {key!r}")
+        setattr(self, key, value)
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key in self.__slots__ if hasattr(self, key))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(f'{k}={v!r}' for k, v in self.items())})"
+
+    def copy(self) -> 'Record':
+        """Shallow copy (nested values are shared)"""
+        return type(self)(**dict(self.items()))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict (nested records included) for snapshots and JSON"""
+        return {key: value.to_dict() if isinstance(value, Record) else value
+                for key, value in self.items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Record':
+        """Build from a plain dict, ignoring keys the record doesn't have"""
+        return cls(**{key: value for key, value in data.items() if key in cls.__slots__})
+
+
+class Indicators(Record):
+    __slots__ = ('sma_20', 'rsi_14', 'price_vs_sma')
+
+
+class MarketSnapshot(Record):
+    """Per-cycle market data for one pair (see MarketDataManager.build_snapshot)"""
+    __slots__ = ('symbol', 'current_price', 'price_change_24h', 'volume_24h', 'high_24h',
+                 'low_24h', 'timestamp', 'trend', 'volatility', 'indicators', 'regime',
+                 'cross_venue', 'timeframes', 'order_flow')
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'MarketSnapshot':
+        snapshot = super().from_dict(data)
+        if isinstance(snapshot.get('indicators'), dict):
+            snapshot.indicators = Indicators.from_dict(snapshot.indicators)
+        return snapshot
+
+
+class CachedAnalysis(Record):
+    """A combined LLM analysis kept for reuse on identical prompts"""
+    __slots__ = ('created', 'analysis')
+
+
+class PairStatus(Record):
+    """Latest cycle summary for a pair, as served by the status API"""
+    __slots__ = ('price', 'change_24h', 'trend', 'regime', 'decision', 'confidence',
+                 'should_trade', 'take_profit', 'stop_loss', 'bot_id', 'updated_at')
+
+
+def json_default(value: Any) -> Any:
+    """json.dumps default for records and NumPy scalars"""
+    if isinstance(value, Mapping):
+        return dict(value)
+    return value.item() if hasattr(value, 'item') else str(value)
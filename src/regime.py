@@ -0,0 +1,141 @@
+"""
+Market regime per pair: 'ranging', 'trending' or 'volatile'.
+
+Statistics are exponentially weighted over closed-candle log returns and
+updated incrementally: each call folds in only the candles closed since
+the previous one (one vectorized step however many there are).
+
+  volatility   fast EW standard deviation of returns (% per candle)
+  vol_ratio    fast / slow EW standard deviation (volatility expansion)
+  trend        EW mean return / EW mean absolute return, in [-1, 1]
+               (near +-1 when candles keep moving the same way)
+
+Each regime maps to a policy in Config.REGIME_POLICIES: how often the
+pair is polled, how many LLMs are asked, and a DCA ladder preset.
+"""
+import math
+from typing import Any, Dict, List, Optional
+import numpy as np
+from config.config import Config
+
+RANGING, TRENDING, VOLATILE = 'ranging', 'trending', 'volatile'
+REGIMES = (RANGING, TRENDING, VOLATILE)
+
+# EW sums kept per pair: (numerator, weight) for each statistic
+_STATS = ('fast_var', 'slow_var', 'mean', 'abs_mean')
+
+
+class RegimeState:
+    __slots__ = ('last_time', 'sums', 'regime', 'pending', 'pending_count', 'observations')
+
+    def __init__(self):
+        self.last_time = None
+        self.sums = {name: [0.0, 0.0] for name in _STATS}
+        self.regime = None
+        self.pending = None
+        self.pending_count = 0
+        self.observations = 0
+
+    def value(self, name: str) -> float:
+        total, weight = self.sums[name]
+        return total / weight if weight else 0.0
+
+
+def _decay(halflife: float) -> float:
+    return 0.5 ** (1.0 / halflife)
+
+
+class RegimeClassifier:
+    def __init__(self, fast_halflife: Optional[float] = None,
+                 slow_halflife: Optional[float] = None,
+                 min_dwell: Optional[int] = None):
+        fast = _decay(fast_halflife or Config.REGIME_FAST_HALFLIFE)
+        slow = _decay(slow_halflife or Config.REGIME_SLOW_HALFLIFE)
+        self.decays = {'fast_var': fast, 'slow_var': slow, 'mean': fast, 'abs_mean': fast}
+        self.min_dwell = Config.REGIME_MIN_DWELL if min_dwell is None else min_dwell
+        self.states: Dict[str, RegimeState] = {}
+
+    def _fold(self, state: RegimeState, returns: np.ndarray):
+        """Fold new returns into the EW sums (weights decay^(n-1-i))"""
+        n = len(returns)
+        values = {'fast_var': returns ** 2, 'slow_var': returns ** 2,
+                  'mean': returns, 'abs_mean': np.abs(returns)}
+        for name, decay in self.decays.items():
+            weights = decay ** np.arange(n - 1, -1, -1)
+            total, weight = state.sums[name]
+            state.sums[name] = [total * decay ** n + float(weights @ values[name]),
+                                weight * decay ** n + float(weights.sum())]
+        state.observations += n
+
+    @staticmethod
+    def _metrics(state: RegimeState):
+        """(volatility % per candle, fast/slow volatility ratio, trend)"""
+        fast, slow = state.value('fast_var'), state.value('slow_var')
+        abs_mean = state.value('abs_mean')
+        return (math.sqrt(fast) * 100,
+                math.sqrt(fast / slow) if slow else 1.0,
+                state.value('mean') / abs_mean if abs_mean else 0.0)
+
+    def classify(self, state: RegimeState) -> str:
+        volatility, ratio, trend = self._metrics(state)
+        if ratio >= Config.REGIME_VOLATILE_RATIO or volatility >= Config.REGIME_VOLATILE_LEVEL:
+            return VOLATILE
+        if abs(trend) >= Config.REGIME_TREND_THRESHOLD:
+            return TRENDING
+        return RANGING
+
+    def update(self, symbol: str, klines: List[list]) -> Optional[Dict[str, Any]]:
+        """
+        Fold in candles closed since the last update and return the pair's
+        regime summary (None until there are returns to classify)
+        """
+        state = self.states.setdefault(symbol, RegimeState())
+        # The newest candle is still open
+        rows = np.array([(row[0], row[4]) for row in klines[:-1]], dtype=float).reshape(-1, 2)
+        if state.last_time is not None:
+            # Keep the last already-seen close as the base for the first new return
+            rows = rows[rows[:, 0] >= state.last_time]
+        if len(rows) >= 2:
+            self._fold(state, np.diff(np.log(rows[:, 1])))
+            state.last_time = float(rows[-1, 0])
+
+            # A new regime has to hold for min_dwell updates before it is adopted
+            regime = self.classify(state)
+            if regime == state.regime:
+                state.pending, state.pending_count = None, 0
+            else:
+                if regime == state.pending:
+                    state.pending_count += 1
+                else:
+                    state.pending, state.pending_count = regime, 1
+                if state.regime is None or state.pending_count >= self.min_dwell:
+                    state.regime, state.pending, state.pending_count = regime, None, 0
+        return self.get(symbol)
+
+    def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        state = self.states.get(symbol)
+        if state is None or state.regime is None:
+            return None
+        volatility, ratio, trend = self._metrics(state)
+        return {'regime': state.regime, 'volatility': volatility, 'vol_ratio': ratio, 'trend': trend}
+
+    def get_state(self) -> Dict[str, Any]:
+        return {symbol: {'last_time': s.last_time, 'sums': s.sums, 'regime': s.regime,
+                         'observations': s.observations}
+                for symbol, s in self.states.items()}
+
+    def restore_state(self, state: Dict[str, Any]):
+        for symbol, saved in state.items():
+            restored = RegimeState()
+            restored.last_time = saved['last_time']
+            restored.sums = {name: list(saved['sums'][name]) for name in _STATS}
+            restored.regime = saved['regime']
+            restored.observations = saved['observations']
+            self.states[symbol] = restored
+
+
+def get_policy(regime: Optional[str]) -> Dict[str, Any]:
+    """Cadence, LLM quorum and ladder preset for a regime ({} if unknown)"""
+    if not Config.REGIME_ENABLED or regime is None:
+        return {}
+    return Config.REGIME_POLICIES.get(regime, {})
@@ -0,0 +1,254 @@
+"""
+Replay recorded decisions through analyzer versions and compare them.
+
+A version is a name plus optional Config overrides and an optional
+analyzer class ('module:Class', default AIAnalyzer), e.g. a JSON file
+
+    {"config": {"MIN_CONFIDENCE_THRESHOLD": 80, "LLM_CONSENSUS": "majority"}}
+
+Each version runs in its own process (Config is process-wide) over every
+recorded market_data snapshot. Provider calls are answered from the raw
+responses recorded for the same prompt digest and re-parsed by the
+version under test, so threshold, consensus and parser changes replay for
+free; a version whose prompt differs only gets answers where it is live
+(live=True) or an earlier live replay left them in the cache file.
+Streams that were cut off early are replayed as recorded.
+
+Trades are simulated as long entries exiting at the decision's take
+profit or stop loss on the later recorded prices of the same pair, or
+at the last price within Config.REPLAY_HORIZON.
+"""
+import asyncio
+import importlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+import numpy as np
+from config.config import Config
+from .ai_schema import StreamingDecisionParser
+from .decision_log import DecisionRecorder, load_records
+
+RECORDED = 'recorded'
+
+
+def load_version(spec: str) -> Tuple[str, Dict[str, Any]]:
+    """'name' (current code and config) or 'name=path/to/version.json'"""
+    name, _, path = spec.partition('=')
+    if not path:
+        return name, {}
+    version = json.loads(Path(path).read_text())
+    unknown = set(version) - {'config', 'analyzer'}
+    if unknown:
+        raise ValueError(f"Unknown version keys in {path}: {', '.join(sorted(unknown))}")
+    return name, version
+
+
+def response_cache(records: List[Dict[str, Any]]) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """(prompt digest, provider) -> captured raw response"""
+    cache = {}
+    for record in records:
+        for provider, captured in record.get('responses', {}).items():
+            cache[(record['digest'], provider)] = captured
+    return cache
+
+
+def decision_summary(analysis: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not analysis:
+        return None
+    return {
+        'should_trade': bool(analysis.get('should_trade')),
+        'direction': analysis.get('recommended_direction'),
+        'confidence': float(analysis.get('average_confidence') or 0.0),
+        'take_profit': analysis.get('take_profit'),
+        'stop_loss': analysis.get('stop_loss')
+    }
+
+
+def _parse_captured(analyzer, captured: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if captured.get('early_exit'):
+        parser = StreamingDecisionParser()
+        parser.feed(captured['raw'])
+        result = parser.result(captured['source'])
+        if result:
+            result['early_exit'] = True
+        return result
+    return analyzer._parse_ai_response(captured['raw'], captured['source'])
+
+
+def _replayed_call(analyzer, provider, cache: Dict[Tuple[str, str], Dict[str, Any]],
+                   live: bool, calls: Dict[str, int], fetched: Dict[Tuple[str, str], Dict[str, Any]]):
+    from .ai_analyzer import _call_response
+    call = provider.call
+
+    async def replayed(prompt, model):
+        key = (prompt.digest, provider.name)
+        if key in cache:
+            calls['cached'] += 1
+            return _parse_captured(analyzer, cache[key])
+        if not live:
+            calls['missed'] += 1
+            return None
+        calls['live'] += 1
+        captured: Dict[str, Any] = {}
+        token = _call_response.set(captured)
+        try:
+            return await call(prompt, model)
+        finally:
+            _call_response.reset(token)
+            if captured:
+                cache[key] = fetched[key] = captured
+    return replayed
+
+
+def replay_version(path: str, version: Dict[str, Any], live: bool = False,
+                   cache_path: Optional[str] = None, concurrency: int = 8) -> Dict[str, Any]:
+    """Run one analyzer version over a recording (Config is restored afterwards)"""
+    overrides = {'RECORD_DECISIONS': False, **version.get('config', {}),
+                 # Every snapshot gets its own decision
+                 'ANALYSIS_CACHE_TTL': 0}
+    unknown = [key for key in overrides if not hasattr(Config, key)]
+    if unknown:
+        raise ValueError(f"Unknown settings: {', '.join(unknown)}")
+    saved = {key: getattr(Config, key) for key in overrides}
+    try:
+        for key, value in overrides.items():
+            setattr(Config, key, value)
+        records = load_records(path)
+        cached = records + (load_records(cache_path) if cache_path and Path(cache_path).exists() else [])
+        cache = response_cache(cached)
+
+        module, _, name = version.get('analyzer', 'src.ai_analyzer:AIAnalyzer').partition(':')
+        analyzer = getattr(importlib.import_module(module), name or 'AIAnalyzer')()
+        calls = {'cached': 0, 'missed': 0, 'live': 0}
+        fetched: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for provider in analyzer.router.providers:
+            provider.call = _replayed_call(analyzer, provider, cache, live, calls, fetched)
+
+        async def run():
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def one(record):
+                async with semaphore:
+                    return decision_summary(
+                        await analyzer.analyze_market(record['market_data'], record.get('quorum'))
+                    )
+            return await asyncio.gather(*(one(record) for record in records))
+
+        return {
+            'decisions': asyncio.run(run()),
+            'calls': calls,
+            'fetched': [{'digest': digest, 'responses': {provider: captured}}
+                        for (digest, provider), captured in fetched.items()]
+        }
+    finally:
+        for key, value in saved.items():
+            setattr(Config, key, value)
+
+
+def simulate_returns(records: List[Dict[str, Any]], decisions: List[Optional[Dict[str, Any]]],
+                     horizon: Optional[float] = None) -> np.ndarray:
+    """Percent return of each simulated trade (NaN where nothing was traded)"""
+    horizon = horizon or Config.REPLAY_HORIZON
+    returns = np.full(len(records), np.nan)
+    by_symbol: Dict[str, List[int]] = {}
+    for i, record in enumerate(records):
+        by_symbol.setdefault(record['symbol'], []).append(i)
+
+    for index in by_symbol.values():
+        times = np.array([records[i]['time'] for i in index], dtype=float)
+        order = np.argsort(times, kind='stable')
+        index, times = np.asarray(index)[order], times[order]
+        prices = np.array([records[i]['market_data']['current_price'] for i in index], dtype=float)
+        ends = np.searchsorted(times, times + horizon, side='right')
+        for k, i in enumerate(index):
+            decision = decisions[i]
+            if not decision or not decision['should_trade'] or ends[k] <= k + 1:
+                continue
+            path = prices[k + 1:ends[k]] / prices[k] - 1
+            take_profit = (decision.get('take_profit') or Config.TAKE_PROFIT_PERCENTAGE) / 100
+            stop_loss = (decision.get('stop_loss') or Config.STOP_LOSS_PERCENTAGE) / 100
+            # First tick through either level decides the exit
+            hit_tp = np.flatnonzero(path >= take_profit)
+            hit_sl = np.flatnonzero(path <= -stop_loss)
+            first_tp = hit_tp[0] if len(hit_tp) else len(path)
+            first_sl = hit_sl[0] if len(hit_sl) else len(path)
+            if first_tp < first_sl:
+                returns[i] = take_profit * 100
+            elif first_sl < first_tp:
+                returns[i] = -stop_loss * 100
+            else:
+                returns[i] = path[-1] * 100
+    return returns
+
+
+def summarize(records: List[Dict[str, Any]], decisions: List[Optional[Dict[str, Any]]],
+              horizon: Optional[float] = None) -> Dict[str, Any]:
+    answered = [d for d in decisions if d]
+    returns = simulate_returns(records, decisions, horizon)
+    traded = returns[~np.isnan(returns)]
+    return {
+        'decisions': len(answered),
+        'missing': len(decisions) - len(answered),
+        'trades': sum(d['should_trade'] for d in answered),
+        'avg_confidence': float(np.mean([d['confidence'] for d in answered])) if answered else None,
+        'simulated_trades': len(traded),
+        'win_rate': float((traded > 0).mean()) if len(traded) else None,
+        'pnl_usd': float(traded.sum() / 100 * Config.BASE_TRADE_AMOUNT)
+    }
+
+
+def compare(baseline: List[Optional[Dict[str, Any]]],
+            candidate: List[Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Agreement and confidence shift on snapshots both sides decided"""
+    both = [(b, c) for b, c in zip(baseline, candidate) if b and c]
+    if not both:
+        return {'compared': 0, 'agreement': None, 'confidence_shift': None,
+                'abs_confidence_shift': None, 'entered': 0, 'skipped': 0}
+    shifts = np.array([c['confidence'] - b['confidence'] for b, c in both])
+    agreed = sum(b['should_trade'] == c['should_trade'] and b['direction'] == c['direction']
+                 for b, c in both)
+    return {
+        'compared': len(both),
+        'agreement': agreed / len(both),
+        'confidence_shift': float(shifts.mean()),
+        'abs_confidence_shift': float(np.abs(shifts).mean()),
+        # Trades the candidate takes that the baseline didn't, and vice versa
+        'entered': sum(c['should_trade'] and not b['should_trade'] for b, c in both),
+        'skipped': sum(b['should_trade'] and not c['should_trade'] for b, c in both)
+    }
+
+
+def run_replay(path: Union[str, Path], versions: Dict[str, Dict[str, Any]], live: bool = False,
+               cache_path: Optional[Union[str, Path]] = None, horizon: Optional[float] = None,
+               workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Replay every version in parallel and report each against the recorded
+    decisions. Responses fetched live are appended to `cache_path`.
+    """
+    records = load_records(path)
+    recorded = [decision_summary(record['analysis']) for record in records]
+    cache = str(cache_path) if cache_path else None
+    with ProcessPoolExecutor(max_workers=workers or max(1, len(versions))) as pool:
+        futures = {name: pool.submit(replay_version, str(path), version, live, cache)
+                   for name, version in versions.items()}
+        results = {name: future.result() for name, future in futures.items()}
+
+    if cache:
+        recorder = DecisionRecorder(cache)
+        for result in results.values():
+            for entry in result['fetched']:
+                recorder.add(entry)
+        recorder.close()
+
+    baseline = summarize(records, recorded, horizon)
+    report = {'records': len(records), 'versions': {RECORDED: baseline}}
+    for name, result in results.items():
+        summary = summarize(records, result['decisions'], horizon)
+        report['versions'][name] = {
+            **summary,
+            'calls': result['calls'],
+            'vs_recorded': {**compare(recorded, result['decisions']),
+                            'pnl_diff_usd': summary['pnl_usd'] - baseline['pnl_usd']}
+        }
+    return report
@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+from config.config import Config
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because its circuit breaker is open"""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"Circuit open for {endpoint}, retry in {retry_in:.1f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class RetryPolicy:
+    """Jittered exponential backoff ("full jitter")"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5,
+                 max_delay: float = 10.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def get_delay(self, attempt: int) -> float:
+        """Delay before retry number `attempt` (1-based)"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker.
+
+    closed -> open after `failure_threshold` consecutive failures; open ->
+    half_open once `reset_timeout` has passed, letting a single trial call
+    through; the trial's outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, endpoint: str, failure_threshold: int = 5,
+                 reset_timeout: float = 30.0):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trial_in_progress = False
+
+        # Counters for export
+        self.total_calls = 0
+        self.total_failures = 0
+        self.total_rejected = 0
+
+    def allow_request(self) -> bool:
+        """Check whether a call may go through right now"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.total_rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self.trial_in_progress = False
+
+        if self.state == self.HALF_OPEN:
+            if self.trial_in_progress:
+                self.total_rejected += 1
+                return False
+            self.trial_in_progress = True
+
+        self.total_calls += 1
+        return True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.trial_in_progress = False
+
+    def record_failure(self):
+        self.total_failures += 1
+        self.consecutive_failures += 1
+        self.trial_in_progress = False
+        if (self.state == self.HALF_OPEN or
+                self.consecutive_failures >= self.failure_threshold):
+            if self.state != self.OPEN:
+                logging.warning(f"Circuit breaker opened for {self.endpoint}")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def retry_in(self) -> float:
+        """Seconds until an open circuit allows a trial call"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def get_state(self) -> Dict[str, Any]:
+        """Export breaker state"""
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'retry_in': round(self.retry_in(), 3),
+            'total_calls': self.total_calls,
+            'total_failures': self.total_failures,
+            'total_rejected': self.total_rejected
+        }
+
+
+class ResilienceManager:
+    """
+    Shared retry, circuit breaking and request hedging for external calls.
+
+    Endpoints are plain strings such as 'binance.ticker' or 'openai.chat';
+    a breaker is created for each on first use. Blocking SDK calls can be
+    passed with `blocking=True` and are run in a worker thread.
+    """
+
+    def __init__(self, retry_policy: Optional[RetryPolicy] = None,
+                 failure_threshold: Optional[int] = None,
+                 reset_timeout: Optional[float] = None):
+        self.retry_policy = retry_policy or RetryPolicy(
+            max_attempts=Config.RETRY_MAX_ATTEMPTS,
+            base_delay=Config.RETRY_BASE_DELAY,
+            max_delay=Config.RETRY_MAX_DELAY
+        )
+        self.failure_threshold = failure_threshold or Config.BREAKER_FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout or Config.BREAKER_RESET_TIMEOUT
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def get_breaker(self, endpoint: str) -> CircuitBreaker:
+        breaker = self.breakers.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(endpoint, self.failure_threshold,
+                                     self.reset_timeout)
+            self.breakers[endpoint] = breaker
+        return breaker
+
+    async def _attempt(self, breaker: CircuitBreaker,
+                       func: Callable[..., Any], args: tuple, kwargs: dict,
+                       blocking: bool, timeout: Optional[float]) -> Any:
+        """Make one call through the breaker"""
+        if not breaker.allow_request():
+            raise CircuitOpenError(breaker.endpoint, breaker.retry_in())
+        try:
+            if blocking:
+                call = asyncio.to_thread(func, *args, **kwargs)
+            else:
+                call = func(*args, **kwargs)
+            result = await asyncio.wait_for(call, timeout) if timeout else await call
+        except asyncio.CancelledError:
+            # A cancelled hedge says nothing about the endpoint's health
+            breaker.trial_in_progress = False
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        return result
+
+    async def _hedged_attempt(self, breaker: CircuitBreaker,
+                              func: Callable[..., Any], args: tuple,
+                              kwargs: dict, blocking: bool,
+                              timeout: Optional[float],
+                              hedge_delay: float) -> Any:
+        """Start a second identical request if the first is slow; first result wins"""
+        first = asyncio.ensure_future(
+            self._attempt(breaker, func, args, kwargs, blocking, timeout))
+        pending = {first}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=hedge_delay)
+            if done:
+                return first.result()
+
+            # Don't hedge into an open or half-open circuit
+            if breaker.state == CircuitBreaker.CLOSED:
+                pending.add(asyncio.ensure_future(
+                    self._attempt(breaker, func, args, kwargs, blocking, timeout)))
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(self, endpoint: str, func: Callable[..., Any], *args,
+                   idempotent: bool = False, blocking: bool = False,
+                   timeout: Optional[float] = None,
+                   hedge_delay: Optional[float] = None,
+                   retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+                   **kwargs) -> Any:
+        """
+        Call `func(*args, **kwargs)` with breaker protection.
+
+        Only idempotent calls are retried with backoff, since repeating a
+        create/update request could apply it twice. Hedging is opt-in: pass
+        `hedge_delay` (e.g. Config.HEDGE_DELAY) for idempotent reads only,
+        as a duplicate write still costs a request against rate limits.
+        Raises CircuitOpenError straight away while the endpoint's circuit
+        is open.
+        """
+        breaker = self.get_breaker(endpoint)
+        attempts = self.retry_policy.max_attempts if idempotent else 1
+
+        for attempt in range(1, attempts + 1):
+            try:
+                if idempotent and hedge_delay:
+                    return await self._hedged_attempt(
+                        breaker, func, args, kwargs, blocking, timeout, hedge_delay)
+                return await self._attempt(breaker, func, args, kwargs,
+                                           blocking, timeout)
+            except CircuitOpenError:
+                raise
+            except retry_on as e:
+                if attempt >= attempts:
+                    raise
+                delay = self.retry_policy.get_delay(attempt)
+                logging.warning(f"{endpoint} failed ({str(e)}), "
+                                f"retry {attempt}/{attempts - 1} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    def get_breaker_states(self) -> Dict[str, Dict[str, Any]]:
+        """Export the state of every breaker keyed by endpoint"""
+        return {name: breaker.get_state()
+                for name, breaker in self.breakers.items()}
+
+
+_default_manager: Optional[ResilienceManager] = None
+
+
+def get_resilience_manager() -> ResilienceManager:
+    """Get the process-wide resilience manager shared by all clients"""
+    global _default_manager
+    if _default_manager is None:
+        _default_manager = ResilienceManager()
+    return _default_manager
+
+
+async def resilient_call(endpoint: str, func: Callable[..., Any],
+                         *args, **kwargs) -> Any:
+    """Shortcut for get_resilience_manager().call(...)"""
+    return await get_resilience_manager().call(endpoint, func, *args, **kwargs)
@@ -0,0 +1,203 @@
+"""
+Hot-reloadable overrides for a subset of Config.
+
+A JSON file (Config.RUNTIME_CONFIG_PATH) holds overrides such as
+{"TRADING_PAIRS": ["BTCUSDT", "SOLUSDT"], "UPDATE_INTERVAL": 120}. It is
+polled for changes (one stat() call per interval), validated as a whole
+and applied all at once from the event loop, so no coroutine ever sees a
+half-applied file. Code keeps reading plain `Config.X` attributes; there
+is no lock on the read path. Keys removed from the file fall back to
+their defaults.
+
+Only settings that are read on every use are reloadable; settings
+captured at startup (clients, worker counts, paths) still need a restart.
+"""
+import asyncio
+import inspect
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
+from config.config import Config
+
+
+def _positive(value) -> bool:
+    return value > 0
+
+
+def _non_negative(value) -> bool:
+    return value >= 0
+
+
+def _percent(value) -> bool:
+    return 0 <= value <= 100
+
+
+def _rate(value) -> bool:
+    return 0 <= value <= 1
+
+
+def _pairs(value) -> bool:
+    return bool(value) and all(isinstance(p, str) and p.isalnum() and p.isupper() for p in value) \
+        and len(set(value)) == len(value)
+
+
+def _intervals(value) -> bool:
+    return all(isinstance(i, str) and i[:-1].isdigit() and i[-1] in 'mhdwM' for i in value)
+
+
+# Reloadable key -> (accepted types, constraint)
+RELOADABLE: Dict[str, Tuple[tuple, Callable[[Any], bool]]] = {
+    'TRADING_PAIRS': ((list,), _pairs),
+    'UPDATE_INTERVAL': ((int, float), _positive),
+    'STATE_SNAPSHOT_INTERVAL': ((int, float), _positive),
+    'MAX_CONCURRENT_TRADES': ((int,), _positive),
+    'MAX_DAILY_LOSS': ((int, float), _non_negative),
+    'MIN_CONFIDENCE_THRESHOLD': ((int, float), _percent),
+    'STREAM_CONFIDENCE_MARGIN': ((int, float), _percent),
+    'LADDER_MAX_CAPITAL': ((int, float), _positive),
+    'LADDER_MAX_STOP_OUT_RATE': ((int, float), _rate),
+    'LADDER_CHECK_HORIZON': ((int,), _positive),
+    'LADDER_CHECK_DAYS': ((int,), _positive),
+    'MIN_ORDER_VOLUME': ((int, float), _non_negative),
+    'ANALYSIS_CACHE_TTL': ((int, float), _non_negative),
+    'MULTI_TIMEFRAME_INTERVALS': ((list,), _intervals),
+    'AI_STREAMING': ((bool,), lambda value: True),
+    'GATE_ENABLED': ((bool,), lambda value: True),
+    'GATE_THRESHOLD': ((int, float), _rate),
+    'GATE_AUDIT_RATE': ((int, float), _rate),
+    'HEDGE_DELAY': ((int, float), _positive)
+}
+
+
+def validate_overrides(overrides: Any) -> List[str]:
+    """Problems with an overrides mapping (empty if it can be applied)"""
+    if not isinstance(overrides, dict):
+        return ['runtime config must be a JSON object']
+    problems = []
+    for key, value in overrides.items():
+        if key not in RELOADABLE:
+            problems.append(f"{key} is not a reloadable setting")
+            continue
+        types, check = RELOADABLE[key]
+        # bool is an int subclass; only accept it where a bool is expected
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            problems.append(f"{key} must be {' or '.join(t.__name__ for t in types)}")
+        elif not check(value):
+            problems.append(f"{key} has an invalid value: {value!r}")
+    return problems
+
+
+class RuntimeConfig:
+    """Versioned runtime overrides applied onto Config"""
+
+    def __init__(self, path: Union[str, Path, None] = None,
+                 poll_interval: Optional[float] = None):
+        self.path = Path(path or Config.RUNTIME_CONFIG_PATH)
+        self.poll_interval = poll_interval or Config.RUNTIME_CONFIG_POLL_INTERVAL
+        self.defaults = {key: getattr(Config, key) for key in RELOADABLE}
+        self.version = 0
+        self.overrides: Mapping[str, Any] = MappingProxyType({})
+        self.loaded_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.listeners: List[Callable[[Dict[str, Any]], Any]] = []
+        self._signature: Optional[Tuple[int, int]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], Any]):
+        """Call `listener(changes)` (sync or async) after each applied version"""
+        self.listeners.append(listener)
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def apply(self, overrides: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Validate and apply a complete set of overrides. Returns the changed
+        settings ({} if nothing changed), or None if the set was rejected.
+        """
+        problems = validate_overrides(overrides)
+        if problems:
+            self.last_error = '; '.join(problems)
+            logging.error(f"Rejected runtime config: {self.last_error}")
+            return None
+
+        target = dict(self.defaults, **overrides)
+        changes = {key: value for key, value in target.items() if getattr(Config, key) != value}
+        # No awaits below: the whole set lands between two event loop steps
+        for key, value in changes.items():
+            setattr(Config, key, value)
+        self.overrides = MappingProxyType(dict(overrides))
+        self.last_error = None
+        self.loaded_at = time.time()
+        if changes:
+            self.version += 1
+            logging.info(f"Runtime config v{self.version} applied: {', '.join(sorted(changes))}")
+        return changes
+
+    def reset(self):
+        """Drop all overrides and restore the defaults"""
+        self.apply({})
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Read the file and apply it; a missing file means no overrides"""
+        if not self.path.exists():
+            return self.apply({})
+        try:
+            overrides = json.loads(self.path.read_text())
+        except (OSError, ValueError) as e:
+            self.last_error = str(e)
+            logging.error(f"Could not read runtime config {self.path}: {str(e)}")
+            return None
+        return self.apply(overrides)
+
+    async def check(self) -> Optional[Dict[str, Any]]:
+        """Reload if the file changed since the last check and notify listeners"""
+        signature = self._file_signature()
+        if signature == self._signature:
+            return None
+        self._signature = signature
+        changes = self.load()
+        if changes:
+            for listener in self.listeners:
+                try:
+                    result = listener(changes)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    logging.error(f"Runtime config listener failed: {str(e)}")
+        return changes
+
+    async def _watch(self):
+        while True:
+            await self.check()
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'version': self.version,
+            'path': str(self.path),
+            'overrides': dict(self.overrides),
+            'loaded_at': self.loaded_at,
+            'last_error': self.last_error
+        }
@@ -0,0 +1,312 @@
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from config.config import Config
+
+# Coordinator <-> worker protocol: one JSON object per line.
+#   worker -> coordinator: register, heartbeat (carries the risk report)
+#   coordinator -> worker: assign (pairs and their known bot ids), halt
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+
+def parse_address(address: str) -> Tuple[str, Any]:
+    """'unix:/path/to.sock' -> ('unix', path); 'host:port' -> ('tcp', (host, port))"""
+    if address.startswith('unix:'):
+        return 'unix', address[len('unix:'):]
+    host, port = address.rsplit(':', 1)
+    return 'tcp', (host, int(port))
+
+
+def today() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+
+class ConsistentHashRing:
+    """Hash ring with virtual nodes; removing a node only moves its own keys"""
+
+    def __init__(self, virtual_nodes: int = 64):
+        self.virtual_nodes = virtual_nodes
+        self.nodes: set = set()
+        self._ring: List[Tuple[int, str]] = []
+        self._hashes: List[int] = []
+
+    def add_node(self, node: str):
+        if node in self.nodes:
+            return
+        self.nodes.add(node)
+        for i in range(self.virtual_nodes):
+            bisect.insort(self._ring, (_hash(f'{node}#{i}'), node))
+        self._hashes = [h for h, _ in self._ring]
+
+    def remove_node(self, node: str):
+        if node not in self.nodes:
+            return
+        self.nodes.discard(node)
+        self._ring = [(h, n) for h, n in self._ring if n != node]
+        self._hashes = [h for h, _ in self._ring]
+
+    def get_node(self, key: str) -> Optional[str]:
+        if not self._ring:
+            return None
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._ring)
+        return self._ring[index][1]
+
+    def assign(self, keys: Iterable[str]) -> Dict[str, List[str]]:
+        """Map every node to the (sorted) keys it owns"""
+        assignment: Dict[str, List[str]] = {node: [] for node in self.nodes}
+        for key in keys:
+            node = self.get_node(key)
+            if node is not None:
+                assignment[node].append(key)
+        for owned in assignment.values():
+            owned.sort()
+        return assignment
+
+
+async def _send(writer: asyncio.StreamWriter, message: Dict[str, Any]):
+    writer.write(json.dumps(message).encode() + b'\n')
+    await writer.drain()
+
+
+class ShardCoordinator:
+    """
+    Assigns trading pairs to worker processes and enforces global risk limits.
+
+    Workers register over TCP or a Unix socket. Pairs are spread over the
+    live workers with consistent hashing and rebalanced when a worker joins,
+    disconnects or misses heartbeats. Workers report their daily PnL per
+    pair with each heartbeat; once the combined loss reaches
+    `max_daily_loss` every worker is told to halt. The halt is not lifted
+    on the next trading day (workers stop their bots and stay halted); an
+    operator clears it by restarting the coordinator and workers.
+    """
+
+    def __init__(self, pairs: Optional[List[str]] = None,
+                 address: Optional[str] = None,
+                 max_daily_loss: Optional[float] = None,
+                 heartbeat_timeout: Optional[float] = None):
+        self.pairs = list(pairs if pairs is not None else Config.TRADING_PAIRS)
+        self.address = address or Config.SHARD_COORDINATOR_ADDRESS
+        self.max_daily_loss = max_daily_loss if max_daily_loss is not None else Config.MAX_DAILY_LOSS
+        self.heartbeat_timeout = heartbeat_timeout or Config.SHARD_HEARTBEAT_TIMEOUT
+        self.ring = ConsistentHashRing(Config.SHARD_VIRTUAL_NODES)
+        self.workers: Dict[str, asyncio.StreamWriter] = {}
+        self.last_seen: Dict[str, float] = {}
+        self.assignments: Dict[str, List[str]] = {}
+        self.known_bots: Dict[str, int] = {}  # pair -> 3Commas bot id
+        # worker -> latest risk report
+        self.risk_reports: Dict[str, Dict[str, Any]] = {}
+        # pair -> (date, PnL) from the latest report covering the pair. A
+        # dead worker's figures count until the pair's new owner, which
+        # takes over the same bot, reports it
+        self.pair_pnl: Dict[str, Tuple[str, float]] = {}
+        self.halted = False
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._monitor_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start listening for workers"""
+        kind, target = parse_address(self.address)
+        if kind == 'unix':
+            self._server = await asyncio.start_unix_server(self._handle_worker, path=target)
+        else:
+            self._server = await asyncio.start_server(self._handle_worker, *target)
+            if target[1] == 0:
+                # Bound to an ephemeral port; publish the real one
+                port = self._server.sockets[0].getsockname()[1]
+                self.address = f'{target[0]}:{port}'
+        self._monitor_task = asyncio.create_task(self._monitor_heartbeats())
+        logging.info(f"Shard coordinator listening on {self.address}")
+
+    async def stop(self):
+        if self._monitor_task:
+            self._monitor_task.cancel()
+        for writer in list(self.workers.values()):
+            writer.close()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle_worker(self, reader: asyncio.StreamReader,
+                             writer: asyncio.StreamWriter):
+        worker_id = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                if message['type'] == 'register':
+                    worker_id = message['worker_id']
+                    self.workers[worker_id] = writer
+                    self.last_seen[worker_id] = time.monotonic()
+                    self.ring.add_node(worker_id)
+                    logging.info(f"Worker {worker_id} joined")
+                    await self.rebalance()
+                    if self.halted:
+                        await _send(writer, {'type': 'halt', 'reason': 'daily loss limit reached'})
+                elif message['type'] == 'heartbeat' and worker_id:
+                    self.last_seen[worker_id] = time.monotonic()
+                    await self._record_risk(worker_id, message)
+        except (ConnectionError, json.JSONDecodeError, KeyError) as e:
+            logging.warning(f"Worker {worker_id} connection error: {str(e)}")
+        finally:
+            if worker_id and self.workers.get(worker_id) is writer:
+                await self.remove_worker(worker_id)
+            writer.close()
+
+    async def remove_worker(self, worker_id: str):
+        """Drop a worker and hand its pairs to the survivors"""
+        self.workers.pop(worker_id, None)
+        self.last_seen.pop(worker_id, None)
+        self.assignments.pop(worker_id, None)
+        self.ring.remove_node(worker_id)
+        logging.warning(f"Worker {worker_id} left, rebalancing")
+        await self.rebalance()
+
+    async def rebalance(self):
+        """Recompute the assignment and notify workers whose pairs changed"""
+        assignment = self.ring.assign(self.pairs)
+        for worker_id, pairs in assignment.items():
+            if self.assignments.get(worker_id) == pairs:
+                continue
+            self.assignments[worker_id] = pairs
+            writer = self.workers.get(worker_id)
+            if writer is None:
+                continue
+            try:
+                await _send(writer, {
+                    'type': 'assign',
+                    'pairs': pairs,
+                    'bots': {p: self.known_bots[p] for p in pairs if p in self.known_bots}
+                })
+            except ConnectionError:
+                logging.warning(f"Could not send assignment to {worker_id}")
+
+    async def _record_risk(self, worker_id: str, message: Dict[str, Any]):
+        self.known_bots.update(message.get('bots', {}))
+        risk = message.get('risk')
+        if risk:
+            self.risk_reports[worker_id] = risk
+            for pair, pnl in (risk.get('pair_pnl') or {}).items():
+                self.pair_pnl[pair] = (risk.get('date'), pnl)
+
+        if not self.halted and self.get_daily_pnl() <= -self.max_daily_loss:
+            self.halted = True
+            logging.critical(
+                f"Global daily loss {self.get_daily_pnl():.2f} reached limit "
+                f"{self.max_daily_loss}, halting all workers"
+            )
+            await self.broadcast({'type': 'halt', 'reason': 'daily loss limit reached'})
+
+    def get_daily_pnl(self) -> float:
+        """Combined PnL for today, counting each pair once"""
+        date = today()
+        total = sum(pnl for day, pnl in self.pair_pnl.values() if day == date)
+        # Reports without a per-pair breakdown count as a whole
+        return total + sum(report.get('daily_pnl', 0.0)
+                           for report in self.risk_reports.values()
+                           if report.get('date') == date and 'pair_pnl' not in report)
+
+    async def broadcast(self, message: Dict[str, Any]):
+        for writer in list(self.workers.values()):
+            try:
+                await _send(writer, message)
+            except ConnectionError:
+                pass
+
+    async def _monitor_heartbeats(self):
+        """Evict workers that stopped sending heartbeats"""
+        while True:
+            await asyncio.sleep(self.heartbeat_timeout / 3)
+            now = time.monotonic()
+            for worker_id, seen in list(self.last_seen.items()):
+                if now - seen > self.heartbeat_timeout:
+                    logging.warning(f"Worker {worker_id} missed heartbeats")
+                    writer = self.workers.get(worker_id)
+                    await self.remove_worker(worker_id)
+                    if writer:
+                        writer.close()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'workers': sorted(self.workers),
+            'assignments': self.assignments,
+            'daily_pnl': self.get_daily_pnl(),
+            'max_daily_loss': self.max_daily_loss,
+            'halted': self.halted
+        }
+
+
+class ShardWorker:
+    """
+    Worker side of the coordinator protocol.
+
+    `on_assign(pairs, bots)` is awaited whenever the coordinator changes this
+    worker's pairs, `on_halt(reason)` when the global loss limit is hit, and
+    `risk_provider()` supplies the payload of each heartbeat.
+    """
+
+    def __init__(self, worker_id: str,
+                 on_assign: Callable[[List[str], Dict[str, int]], Awaitable[None]],
+                 on_halt: Callable[[str], Awaitable[None]],
+                 risk_provider: Callable[[], Dict[str, Any]],
+                 address: Optional[str] = None,
+                 heartbeat_interval: Optional[float] = None):
+        self.worker_id = worker_id
+        self.on_assign = on_assign
+        self.on_halt = on_halt
+        self.risk_provider = risk_provider
+        self.address = address or Config.SHARD_COORDINATOR_ADDRESS
+        self.heartbeat_interval = heartbeat_interval or Config.SHARD_HEARTBEAT_INTERVAL
+        self.pairs: List[str] = []
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def run(self):
+        """Connect, register and serve coordinator messages until disconnected"""
+        kind, target = parse_address(self.address)
+        if kind == 'unix':
+            reader, self._writer = await asyncio.open_unix_connection(target)
+        else:
+            reader, self._writer = await asyncio.open_connection(*target)
+
+        await _send(self._writer, {'type': 'register', 'worker_id': self.worker_id})
+        heartbeat = asyncio.create_task(self._heartbeat_loop())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    logging.warning("Lost connection to shard coordinator")
+                    break
+                message = json.loads(line)
+                if message['type'] == 'assign':
+                    self.pairs = message['pairs']
+                    logging.info(f"Assigned pairs: {', '.join(self.pairs) or 'none'}")
+                    await self.on_assign(self.pairs, message.get('bots', {}))
+                elif message['type'] == 'halt':
+                    await self.on_halt(message.get('reason', ''))
+        finally:
+            heartbeat.cancel()
+            self._writer.close()
+
+    async def _heartbeat_loop(self):
+        while True:
+            report = self.risk_provider()
+            await _send(self._writer, {
+                'type': 'heartbeat',
+                'risk': report.get('risk'),
+                'bots': report.get('bots', {})
+            })
+            await asyncio.sleep(self.heartbeat_interval)
+
+    def close(self):
+        if self._writer:
+            self._writer.close()
@@ -0,0 +1,169 @@
+import json
+import logging
+import math
+import random
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from config.config import Config
+
+FEATURES = ('trend', 'rsi_distance', 'volatility', 'sma_distance', 'change_24h')
+
+# Hand-tuned starting point: a neutral trend, RSI near 50, low volatility
+# and price hugging the SMA score well under 0.5; a directional move with
+# stretched RSI scores well over it.
+DEFAULT_WEIGHTS = {
+    'trend': 1.5,
+    'rsi_distance': 2.0,
+    'volatility': 1.0,
+    'sma_distance': 1.0,
+    'change_24h': 1.0
+}
+DEFAULT_BIAS = -2.5
+
+
+def extract_features(market_data: Dict[str, Any]) -> Tuple[float, ...]:
+    """Scale a market data snapshot into the gate's feature vector"""
+    indicators = market_data.get('indicators') or {}
+    return (
+        0.0 if market_data.get('trend', 'neutral') == 'neutral' else 1.0,
+        abs(indicators.get('rsi_14', 50.0) - 50.0) / 50.0,
+        market_data.get('volatility', 0.0) or 0.0,
+        abs(indicators.get('price_vs_sma', 0.0)) / 2.0,
+        abs(market_data.get('price_change_24h', 0.0) or 0.0) / 5.0
+    )
+
+
+class SignalGate:
+    """
+    Cheap local model that decides whether a snapshot is worth sending to
+    the LLMs.
+
+    A logistic score over a few indicator features. Starts from hand-tuned
+    weights and can be refit on (snapshot, did the LLMs trade) samples.
+    A small random share of rejected snapshots is escalated anyway
+    (`audit_rate`) so agreement with the LLMs can also be measured on the
+    pairs the gate would have skipped.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None,
+                 bias: Optional[float] = None,
+                 threshold: Optional[float] = None,
+                 audit_rate: Optional[float] = None):
+        weights = weights or DEFAULT_WEIGHTS
+        self.weights = tuple(weights[name] for name in FEATURES)
+        self.bias = DEFAULT_BIAS if bias is None else bias
+        self.threshold = Config.GATE_THRESHOLD if threshold is None else threshold
+        self.audit_rate = Config.GATE_AUDIT_RATE if audit_rate is None else audit_rate
+
+        # Counters for reporting
+        self.evaluated = 0
+        self.escalated = 0
+        self.audited = 0
+        # (gate said escalate, LLM said trade) -> count
+        self.outcomes = {(True, True): 0, (True, False): 0,
+                         (False, True): 0, (False, False): 0}
+
+    def score(self, market_data: Dict[str, Any]) -> float:
+        """Probability-like score that the LLMs would recommend a trade"""
+        z = self.bias
+        for weight, value in zip(self.weights, extract_features(market_data)):
+            z += weight * value
+        return 1.0 / (1.0 + math.exp(-max(-60.0, min(60.0, z))))
+
+    def evaluate(self, market_data: Dict[str, Any]) -> Tuple[bool, bool, float]:
+        """
+        Score a snapshot. Returns (gate_escalates, audit, score); the LLMs
+        should be called if either flag is set.
+        """
+        score = self.score(market_data)
+        escalate = score >= self.threshold
+        audit = not escalate and random.random() < self.audit_rate
+
+        self.evaluated += 1
+        if escalate:
+            self.escalated += 1
+        elif audit:
+            self.audited += 1
+        return escalate, audit, score
+
+    def record_outcome(self, gate_escalated: bool, should_trade: bool):
+        """Record what the LLMs decided for a snapshot the gate scored"""
+        self.outcomes[(gate_escalated, bool(should_trade))] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Escalation rate and agreement with LLM decisions"""
+        tp = self.outcomes[(True, True)]
+        fp = self.outcomes[(True, False)]
+        fn = self.outcomes[(False, True)]
+        tn = self.outcomes[(False, False)]
+        judged = tp + fp + fn + tn
+        return {
+            'evaluated': self.evaluated,
+            'escalated': self.escalated,
+            'audited': self.audited,
+            'escalation_rate': self.escalated / self.evaluated if self.evaluated else 0.0,
+            'agreement': (tp + tn) / judged if judged else None,
+            # Share of escalations the LLMs actually traded on
+            'precision': tp / (tp + fp) if tp + fp else None,
+            # Share of LLM trades the gate would have let through (from audits)
+            'recall': tp / (tp + fn) if tp + fn else None,
+            'outcomes': {'true_positive': tp, 'false_positive': fp,
+                         'false_negative': fn, 'true_negative': tn}
+        }
+
+    def fit(self, samples: Sequence[Tuple[Dict[str, Any], bool]],
+            epochs: int = 500, learning_rate: float = 0.5,
+            l2: float = 0.001) -> float:
+        """
+        Refit the weights with logistic regression on (market_data, traded)
+        samples from the decision journal or backtests. Returns the final
+        training log loss.
+        """
+        import numpy as np
+
+        X = np.array([extract_features(md) for md, _ in samples], dtype=float)
+        y = np.array([1.0 if traded else 0.0 for _, traded in samples])
+        w = np.array(self.weights, dtype=float)
+        b = float(self.bias)
+
+        for _ in range(epochs):
+            p = 1.0 / (1.0 + np.exp(-np.clip(X @ w + b, -60, 60)))
+            error = p - y
+            w -= learning_rate * (X.T @ error / len(y) + l2 * w)
+            b -= learning_rate * float(error.mean())
+
+        self.weights = tuple(float(v) for v in w)
+        self.bias = b
+        p = np.clip(1.0 / (1.0 + np.exp(-(X @ w + b))), 1e-9, 1 - 1e-9)
+        return float(-(y * np.log(p) + (1 - y) * np.log(1 - p)).mean())
+
+    def save(self, path: Union[str, Path]):
+        """Write the model weights as JSON"""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps({
+            'weights': dict(zip(FEATURES, self.weights)),
+            'bias': self.bias,
+            'threshold': self.threshold
+        }, indent=2))
+
+    @classmethod
+    def load(cls, path: Union[str, Path, None] = None) -> 'SignalGate':
+        """Load fitted weights if present, otherwise use the defaults"""
+        path = Path(path or Config.GATE_MODEL_PATH)
+        if path.exists():
+            try:
+                model = json.loads(path.read_text())
+                return cls(model['weights'], model['bias'], model.get('threshold'))
+            except (ValueError, KeyError) as e:
+                logging.error(f"Invalid gate model {path}: {str(e)}, using defaults")
+        return cls()
+
+
+def agreement_report(gate: SignalGate, samples: List[Tuple[Dict[str, Any], bool]]) -> Dict[str, Any]:
+    """Score labelled samples offline and report agreement with the labels"""
+    offline = SignalGate(dict(zip(FEATURES, gate.weights)), gate.bias,
+                         gate.threshold, audit_rate=0.0)
+    for market_data, traded in samples:
+        escalate, _, _ = offline.evaluate(market_data)
+        offline.record_outcome(escalate, traded)
+    return offline.get_stats()
@@ -0,0 +1,88 @@
+import logging
+import marshal
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+# File layout: magic, format version, CRC32 of the payload, then the
+# marshal-encoded state dict. Snapshots hold only core types (dict, list,
+# tuple, str, int, float, bool, None, bytes), which keeps them compact and
+# fast to load. marshal itself silently writes some other objects (NumPy
+# scalars come back as bytes), so the state is checked before encoding.
+MAGIC = b'CTBS'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHI')
+
+_SCALARS = (str, int, float, bool, type(None), bytes)
+
+
+def plain(value: Any, path: str = 'state') -> Any:
+    """
+    Copy of `value` with NumPy scalars and arrays converted to built-in
+    types; raises TypeError on anything else that isn't a core type
+    """
+    # Exact types: np.float64 subclasses float but marshal can't encode it
+    if type(value) in _SCALARS:
+        return value
+    if isinstance(value, dict):
+        return {plain(k, path): plain(v, f"{path}.{k}") for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = [plain(v, f"{path}[{i}]") for i, v in enumerate(value)]
+        return items if isinstance(value, list) else tuple(items)
+    # NumPy scalars and arrays
+    if hasattr(value, 'tolist') and hasattr(value, 'dtype'):
+        return plain(value.tolist(), path)
+    raise TypeError(f"{path}: {type(value).__name__} is not a snapshot type")
+
+
+class StateStore:
+    """Binary snapshot file for runtime state used on warm restart"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+
+    def save(self, state: Dict[str, Any]) -> bool:
+        """Atomically write a state snapshot"""
+        try:
+            payload = marshal.dumps(plain(state))
+            header = HEADER.pack(MAGIC, FORMAT_VERSION, zlib.crc32(payload))
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+            with open(tmp_path, 'wb') as f:
+                f.write(header)
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            # Readers never see a half-written snapshot
+            os.replace(tmp_path, self.path)
+            return True
+
+        except Exception as e:
+            logging.error(f"Error saving state snapshot: {str(e)}")
+            return False
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Load the last snapshot, or None if missing or corrupt"""
+        try:
+            if not self.path.exists():
+                return None
+
+            data = self.path.read_bytes()
+            magic, version, checksum = HEADER.unpack_from(data)
+            payload = data[HEADER.size:]
+
+            if magic != MAGIC or version != FORMAT_VERSION:
+                logging.warning(f"Ignoring state snapshot with unknown format: {self.path}")
+                return None
+            if zlib.crc32(payload) != checksum:
+                logging.warning(f"Ignoring corrupt state snapshot: {self.path}")
+                return None
+
+            return marshal.loads(payload)
+
+        except Exception as e:
+            logging.error(f"Error loading state snapshot: {str(e)}")
+            return None
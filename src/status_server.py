@@ -0,0 +1,173 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+from config.config import Config
+from .records import json_default
+from .sharding import parse_address
+
+# Read-only status service for the local machine:
+#   GET /                 dashboard (HTML, updated over SSE)
+#   GET /status           full snapshot as JSON
+#   GET /status/<section> one top-level section (pairs, bots, pnl, timings, ...)
+#   GET /events           server-sent events, one full snapshot per change
+
+DASHBOARD = b"""<!doctype html>
+<html><head><meta charset="utf-8"><title>Trading bot status</title>
+<style>body{font:13px monospace;margin:1em}table{border-collapse:collapse}
+td,th{padding:2px 10px;text-align:right}th{border-bottom:1px solid #999}</style></head>
+<body><h3 id="head">connecting...</h3><table id="pairs"></table><pre id="raw"></pre>
+<script>
+const cols = ['pair', 'price', 'change_24h', 'regime', 'decision', 'confidence', 'bot_id', 'latency'];
+new EventSource('/events').onmessage = (e) => {
+  const s = JSON.parse(e.data);
+  document.getElementById('head').textContent =
+    `${s.running ? 'running' : 'stopped'}${s.halted ? ' (HALTED)' : ''} - daily PnL ${s.pnl.daily_pnl.toFixed(2)} - ${new Date(s.generated_at * 1000).toLocaleTimeString()}`;
+  const rows = Object.entries(s.pairs).map(([pair, p]) => cols.map((c) =>
+    c === 'pair' ? pair : c === 'latency' ? (s.timings.pairs[pair] ?? '') : (p[c] ?? '')));
+  document.getElementById('pairs').innerHTML = '<tr>' + cols.map((c) => `<th>${c}</th>`).join('') + '</tr>' +
+    rows.map((r) => '<tr>' + r.map((v) => `<td>${v}</td>`).join('') + '</tr>').join('');
+  document.getElementById('raw').textContent = JSON.stringify({timings: s.timings.stages, llm: s.llm}, null, 1);
+};
+</script></body></html>"""
+
+REASONS = {200: 'OK', 404: 'Not Found', 405: 'Method Not Allowed', 400: 'Bad Request'}
+
+
+class StatusServer:
+    """
+    Serves status snapshots to local readers without touching the trading loop.
+
+    `snapshot` must only read in-memory state. It is called at most once
+    per `refresh` seconds however many clients are connected, and the
+    JSON is encoded once and shared by every reader; SSE clients are woken
+    when the encoded snapshot changes and always get the latest one, so a
+    slow reader skips versions instead of queueing them.
+    """
+
+    def __init__(self, snapshot: Callable[[], Dict[str, Any]],
+                 address: Optional[str] = None, refresh: Optional[float] = None):
+        self.snapshot = snapshot
+        self.address = address or Config.STATUS_ADDRESS
+        self.refresh = refresh or Config.STATUS_REFRESH_INTERVAL
+        self.version = 0
+        self.clients = 0
+        self.requests = 0
+        self._data: Dict[str, Any] = {}
+        self._body = b'{}'
+        self._rendered_at: Optional[float] = None
+        self._changed = asyncio.Condition()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._publish_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        kind, target = parse_address(self.address)
+        if kind == 'unix':
+            self._server = await asyncio.start_unix_server(self._handle, path=target)
+        else:
+            self._server = await asyncio.start_server(self._handle, *target)
+            if target[1] == 0:
+                port = self._server.sockets[0].getsockname()[1]
+                self.address = f'{target[0]}:{port}'
+        self._publish_task = asyncio.create_task(self._publish_loop())
+        logging.info(f"Status server listening on {self.address}")
+
+    async def stop(self):
+        if self._publish_task:
+            self._publish_task.cancel()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def render(self) -> bytes:
+        """Encoded snapshot, rebuilt at most once per refresh interval"""
+        now = time.monotonic()
+        if self._rendered_at is None or now - self._rendered_at >= self.refresh:
+            self._rendered_at = now
+            try:
+                data = self.snapshot()
+                body = json.dumps(data, default=json_default).encode()
+            except Exception as e:
+                logging.error(f"Error building status snapshot: {str(e)}")
+                return self._body
+            if body != self._body:
+                self._data, self._body = data, body
+                self.version += 1
+        return self._body
+
+    async def _publish_loop(self):
+        """Wake SSE clients when the snapshot changes"""
+        while True:
+            if self.clients:
+                version = self.version
+                self.render()
+                if self.version != version:
+                    async with self._changed:
+                        self._changed.notify_all()
+            await asyncio.sleep(self.refresh)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await asyncio.wait_for(reader.readline(), 5)
+            # Headers are read and ignored
+            while (await asyncio.wait_for(reader.readline(), 5)).strip():
+                pass
+            parts = request.decode('latin-1').split()
+            if len(parts) < 2:
+                return await self._respond(writer, 400, b'{"error": "bad request"}')
+            method, path = parts[0], parts[1].split('?', 1)[0].rstrip('/') or '/'
+            self.requests += 1
+            if method != 'GET':
+                return await self._respond(writer, 405, b'{"error": "read-only"}')
+            if path == '/':
+                return await self._respond(writer, 200, DASHBOARD, 'text/html; charset=utf-8')
+            if path == '/events':
+                return await self._stream(writer)
+            if path == '/status':
+                return await self._respond(writer, 200, self.render())
+            if path.startswith('/status/'):
+                self.render()
+                section = self._data.get(path[len('/status/'):])
+                if section is not None:
+                    return await self._respond(writer, 200, json.dumps(section, default=json_default).encode())
+            await self._respond(writer, 404, b'{"error": "not found"}')
+        except (ConnectionError, asyncio.TimeoutError, UnicodeDecodeError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, body: bytes,
+                       content_type: str = 'application/json'):
+        writer.write(
+            f'HTTP/1.1 {status} {REASONS[status]}\r\n'
+            f'Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n'
+            'Cache-Control: no-store\r\nConnection: close\r\n\r\n'.encode() + body
+        )
+        await writer.drain()
+
+    async def _stream(self, writer: asyncio.StreamWriter):
+        writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n'
+                     b'Cache-Control: no-store\r\nConnection: close\r\n\r\n')
+        self.clients += 1
+        try:
+            seen = None
+            while True:
+                body = self.render()
+                if self.version != seen:
+                    seen = self.version
+                    writer.write(b'data: ' + body + b'\n\n')
+                    await writer.drain()
+                async with self._changed:
+                    await self._changed.wait_for(lambda: self.version != seen)
+        finally:
+            self.clients -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'address': self.address,
+            'version': self.version,
+            'clients': self.clients,
+            'requests': self.requests
+        }
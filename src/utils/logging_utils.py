@@ -13,6 +13,9 @@ def setup_logging(name: str = 'TradingBot', log_dir: str = 'logs') -> logging.Lo
     # Create logger
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
+    # Loggers are process-wide; calling this again must not stack handlers
+    if getattr(logger, '_trading_handlers', False):
+        return logger
 
     # Create file handler
     log_file = os.path.join(log_dir, f'trading_{datetime.now().strftime("%Y%m%d")}.log')
@@ -33,5 +36,6 @@ def setup_logging(name: str = 'TradingBot', log_dir: str = 'logs') -> logging.Lo
     # Add handlers to logger
     logger.addHandler(file_handler)
     logger.addHandler(console_handler)
+    logger._trading_handlers = True
 
     return logger
\ No newline at end of file
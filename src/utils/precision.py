@@ -0,0 +1,216 @@
+"""
+Exchange precision rules (tick size, step size, min notional) as an
+indexed table, with rounding done on integers.
+
+Each symbol's filters are parsed once from Binance `exchangeInfo` into
+NumPy columns. Prices and quantities are scaled to integer units of
+10**-decimals, so rounding to a tick or step is an integer floor and
+no per-call Decimal or format-string construction is needed. Bulk
+validation works on whole arrays of orders at once.
+"""
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+import numpy as np
+
+# validate_orders() problem flags
+MIN_QTY = 1
+MAX_QTY = 2
+MIN_NOTIONAL = 4
+PRICE_RANGE = 8
+UNKNOWN_SYMBOL = 16
+
+FLAG_NAMES = {
+    MIN_QTY: 'quantity below minimum',
+    MAX_QTY: 'quantity above maximum',
+    MIN_NOTIONAL: 'notional below minimum',
+    PRICE_RANGE: 'price outside allowed range',
+    UNKNOWN_SYMBOL: 'unknown symbol'
+}
+
+_COLUMNS = ('tick_size', 'step_size', 'min_price', 'max_price',
+            'min_qty', 'max_qty', 'min_notional')
+
+
+def decimals_of(value: str) -> int:
+    """Decimal places of a Binance filter string ('0.01000000' -> 2)"""
+    if '.' not in value:
+        return 0
+    return len(value.rstrip('0').split('.')[1])
+
+
+def parse_symbol_filters(symbol_info: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the filters we use from one exchangeInfo symbol entry"""
+    filters = {f['filterType']: f for f in symbol_info.get('filters', [])}
+    price = filters.get('PRICE_FILTER', {})
+    lot = filters.get('LOT_SIZE', {})
+    notional = filters.get('NOTIONAL') or filters.get('MIN_NOTIONAL') or {}
+    return {
+        'symbol': symbol_info['symbol'],
+        'tick_size': price.get('tickSize', '0.00000001'),
+        'step_size': lot.get('stepSize', '0.00000001'),
+        'min_price': price.get('minPrice', '0'),
+        'max_price': price.get('maxPrice', '0'),
+        'min_qty': lot.get('minQty', '0'),
+        'max_qty': lot.get('maxQty', '0'),
+        'min_notional': notional.get('minNotional', '0')
+    }
+
+
+class PrecisionTable:
+    """Symbol filters indexed by symbol, stored column-wise"""
+
+    def __init__(self, rows: Sequence[Dict[str, Any]], loaded_at: Optional[float] = None):
+        self.rows = list(rows)
+        self.loaded_at = loaded_at or time.time()
+        self.index = {row['symbol']: i for i, row in enumerate(self.rows)}
+        for column in _COLUMNS:
+            setattr(self, column, np.array([float(row[column]) for row in self.rows]))
+
+        # Integer scaling: prices in units of 10**-price_decimals, etc.
+        self.price_decimals = np.array([decimals_of(row['tick_size']) for row in self.rows], dtype=np.int64)
+        self.qty_decimals = np.array([decimals_of(row['step_size']) for row in self.rows], dtype=np.int64)
+        self.price_scale = 10.0 ** self.price_decimals
+        self.qty_scale = 10.0 ** self.qty_decimals
+        self.tick_units = np.rint(self.tick_size * self.price_scale).astype(np.int64)
+        self.step_units = np.rint(self.step_size * self.qty_scale).astype(np.int64)
+        # Format strings are built once per symbol
+        self.price_formats = [f'{{:.{d}f}}' for d in self.price_decimals]
+        self.qty_formats = [f'{{:.{d}f}}' for d in self.qty_decimals]
+
+    @classmethod
+    def from_exchange_info(cls, exchange_info: Dict[str, Any]) -> 'PrecisionTable':
+        return cls([parse_symbol_filters(s) for s in exchange_info.get('symbols', [])])
+
+    def save(self, path: Union[str, Path]):
+        """Cache the parsed filters (a few KB instead of the full exchangeInfo)"""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps({'loaded_at': self.loaded_at, 'symbols': self.rows}))
+
+    @classmethod
+    def load(cls, path: Union[str, Path], max_age: float) -> Optional['PrecisionTable']:
+        """Load cached filters if the cache is younger than `max_age` seconds"""
+        try:
+            cached = json.loads(Path(path).read_text())
+        except (OSError, ValueError):
+            return None
+        if time.time() - cached.get('loaded_at', 0) > max_age:
+            return None
+        return cls(cached['symbols'], cached['loaded_at'])
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.index
+
+    def _ids(self, symbols: Iterable[str]) -> np.ndarray:
+        return np.array([self.index.get(s, -1) for s in symbols], dtype=np.int64)
+
+    @staticmethod
+    def _to_units(values: np.ndarray, scale: np.ndarray, up: bool = False) -> np.ndarray:
+        """Scale to integer units, absorbing float noise like 0.1 + 0.2"""
+        scaled = values * scale
+        nearest = np.rint(scaled)
+        outward = np.ceil(scaled) if up else np.floor(scaled)
+        return np.where(np.abs(scaled - nearest) < 1e-6, nearest, outward).astype(np.int64)
+
+    def round_prices(self, ids: np.ndarray, prices: np.ndarray, up: bool = False) -> np.ndarray:
+        """Round prices down (or up) to each symbol's tick size"""
+        units = self._to_units(np.asarray(prices, dtype=float), self.price_scale[ids], up)
+        tick = self.tick_units[ids]
+        units = -(-units // tick) * tick if up else units // tick * tick
+        return units / self.price_scale[ids]
+
+    def round_quantities(self, ids: np.ndarray, quantities: np.ndarray) -> np.ndarray:
+        """Round quantities down to each symbol's step size"""
+        units = self._to_units(np.asarray(quantities, dtype=float), self.qty_scale[ids])
+        step = self.step_units[ids]
+        return units // step * step / self.qty_scale[ids]
+
+    # Single-order helpers
+
+    def round_price(self, symbol: str, price: float, up: bool = False) -> float:
+        i = self.index[symbol]
+        return float(self.round_prices(np.array([i]), np.array([price]), up)[0])
+
+    def round_quantity(self, symbol: str, quantity: float) -> float:
+        i = self.index[symbol]
+        return float(self.round_quantities(np.array([i]), np.array([quantity]))[0])
+
+    def quantity_for_amount(self, symbol: str, price: float, amount: float) -> float:
+        """Largest valid quantity costing at most `amount` at `price`"""
+        return self.round_quantity(symbol, amount / price)
+
+    def format_price(self, symbol: str, price: float) -> str:
+        return self.price_formats[self.index[symbol]].format(price)
+
+    def format_quantity(self, symbol: str, quantity: float) -> str:
+        return self.qty_formats[self.index[symbol]].format(quantity)
+
+    def get_min_notional(self, symbol: str) -> float:
+        i = self.index.get(symbol)
+        return 0.0 if i is None else float(self.min_notional[i])
+
+    def validate_orders(self, symbols: Sequence[str], prices: Sequence[float],
+                        quantities: Sequence[float]) -> Dict[str, np.ndarray]:
+        """
+        Round and check many orders at once.
+
+        Returns arrays: 'price' and 'quantity' rounded down to tick/step,
+        'notional', 'flags' (bitwise MIN_QTY | MAX_QTY | ...) and 'valid'.
+        """
+        ids = self._ids(symbols)
+        known = ids >= 0
+        safe = np.where(known, ids, 0)
+        price = self.round_prices(safe, prices)
+        quantity = self.round_quantities(safe, quantities)
+        notional = price * quantity
+
+        max_price, max_qty = self.max_price[safe], self.max_qty[safe]
+        flags = np.zeros(len(ids), dtype=np.int64)
+        flags |= np.where(quantity < self.min_qty[safe], MIN_QTY, 0)
+        flags |= np.where((max_qty > 0) & (quantity > max_qty), MAX_QTY, 0)
+        flags |= np.where(notional < self.min_notional[safe] - 1e-9, MIN_NOTIONAL, 0)
+        flags |= np.where((price < self.min_price[safe]) |
+                          ((max_price > 0) & (price > max_price)), PRICE_RANGE, 0)
+        flags = np.where(known, flags, UNKNOWN_SYMBOL)
+        return {
+            'price': price,
+            'quantity': quantity,
+            'notional': notional,
+            'flags': flags,
+            'valid': flags == 0
+        }
+
+
+def describe_flags(flags: int) -> List[str]:
+    """Human-readable problems for a validate_orders() flag value"""
+    return [name for flag, name in FLAG_NAMES.items() if flags & flag]
+
+
+_table: Optional[PrecisionTable] = None
+
+
+def get_precision_table(exchange_info: Optional[Dict[str, Any]] = None,
+                        cache_path: Union[str, Path, None] = None,
+                        max_age: float = 86400) -> Optional[PrecisionTable]:
+    """
+    Process-wide table: from memory, then the on-disk cache, then parsed
+    from `exchange_info` if given. Returns None if none is available, in
+    which case the caller should fetch exchangeInfo and call again.
+    """
+    global _table
+    if _table is not None and time.time() - _table.loaded_at <= max_age:
+        return _table
+    if cache_path and exchange_info is None:
+        _table = PrecisionTable.load(cache_path, max_age)
+        return _table
+    if exchange_info is None:
+        return None
+    _table = PrecisionTable.from_exchange_info(exchange_info)
+    if cache_path:
+        try:
+            _table.save(cache_path)
+        except OSError as e:
+            logging.warning(f"Could not cache exchange filters: {str(e)}")
+    return _table
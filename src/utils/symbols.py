@@ -0,0 +1,125 @@
+"""
+Unified symbol model.
+
+Pairs are identified internally by their Binance-style name ('BTCUSDT'),
+which is what TRADING_PAIRS, caches and bot mappings use. SymbolTable
+maps that name to and from each venue's own format ('USDT_BTC' on
+3Commas, 'BTC-USDT' on Coinbase, 'XBTUSDT' on Kraken) and caches every
+mapping in both directions, so conversions on hot paths are dict lookups.
+"""
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+# Quote assets tried (longest first) when splitting a concatenated symbol
+QUOTE_ASSETS = ('FDUSD', 'USDT', 'USDC', 'BUSD', 'TUSD', 'DAI',
+                'BTC', 'ETH', 'BNB', 'EUR', 'GBP', 'TRY', 'USD')
+
+# Venue symbol layout; '' means base and quote are concatenated
+VENUE_SEPARATORS = {
+    'binance': '',
+    'kraken': '',
+    'coinbase': '-',
+    '3commas': '_'
+}
+# Venues that put the quote asset first
+QUOTE_FIRST = {'3commas'}
+# Venue-specific asset codes
+ASSET_ALIASES = {
+    'kraken': {'BTC': 'XBT', 'DOGE': 'XDG'}
+}
+
+
+class Symbol(NamedTuple):
+    base: str
+    quote: str
+
+    @property
+    def name(self) -> str:
+        return self.base + self.quote
+
+
+def _split(symbol: str) -> Optional[Symbol]:
+    for quote in QUOTE_ASSETS:
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return Symbol(symbol[:-len(quote)], quote)
+    return None
+
+
+class SymbolTable:
+    """Bidirectional, cached symbol mapping across venues"""
+
+    def __init__(self):
+        self.symbols: Dict[str, Symbol] = {}
+        self._to_venue: Dict[Tuple[str, str], str] = {}
+        self._from_venue: Dict[Tuple[str, str], str] = {}
+
+    def register(self, base: str, quote: str) -> str:
+        """Add a pair with known base and quote assets; returns its name"""
+        symbol = Symbol(base.upper(), quote.upper())
+        self.symbols[symbol.name] = symbol
+        return symbol.name
+
+    def load_exchange_info(self, exchange_info: Dict[str, Any]):
+        """Register exact base/quote assets from Binance exchangeInfo"""
+        for info in exchange_info.get('symbols', []):
+            if info.get('baseAsset') and info.get('quoteAsset'):
+                self.register(info['baseAsset'], info['quoteAsset'])
+
+    def parse(self, name: str) -> Symbol:
+        """Base and quote of an internal pair name"""
+        symbol = self.symbols.get(name)
+        if symbol is None:
+            symbol = _split(name)
+            if symbol is None:
+                raise ValueError(f"Cannot determine the quote asset of {name}")
+            self.symbols[name] = symbol
+        return symbol
+
+    def to_venue(self, name: str, venue: str) -> str:
+        """Internal pair name -> the venue's symbol"""
+        key = (venue, name)
+        venue_symbol = self._to_venue.get(key)
+        if venue_symbol is None:
+            base, quote = self.parse(name)
+            aliases = ASSET_ALIASES.get(venue, {})
+            base, quote = aliases.get(base, base), aliases.get(quote, quote)
+            parts = (quote, base) if venue in QUOTE_FIRST else (base, quote)
+            venue_symbol = VENUE_SEPARATORS[venue].join(parts)
+            self._to_venue[key] = venue_symbol
+            self._from_venue[(venue, venue_symbol)] = name
+        return venue_symbol
+
+    def from_venue(self, venue_symbol: str, venue: str) -> str:
+        """The venue's symbol -> internal pair name"""
+        key = (venue, venue_symbol)
+        name = self._from_venue.get(key)
+        if name is None:
+            separator = VENUE_SEPARATORS[venue]
+            if separator:
+                first, second = venue_symbol.split(separator, 1)
+                base, quote = (second, first) if venue in QUOTE_FIRST else (first, second)
+            else:
+                # Undo aliases before splitting, e.g. XBTUSDT -> BTCUSDT
+                for asset, alias in ASSET_ALIASES.get(venue, {}).items():
+                    if venue_symbol.startswith(alias):
+                        venue_symbol = asset + venue_symbol[len(alias):]
+                        break
+                symbol = self.symbols.get(venue_symbol) or _split(venue_symbol)
+                if symbol is None:
+                    raise ValueError(f"Cannot parse {venue} symbol {key[1]}")
+                base, quote = symbol
+            reverse = {alias: asset for asset, alias in ASSET_ALIASES.get(venue, {}).items()}
+            name = self.register(reverse.get(base, base), reverse.get(quote, quote))
+            self._from_venue[key] = name
+            self._to_venue.setdefault((venue, name), key[1])
+        return name
+
+
+_table: Optional[SymbolTable] = None
+
+
+def get_symbol_table() -> SymbolTable:
+    """Process-wide symbol table"""
+    global _table
+    if _table is None:
+        _table = SymbolTable()
+    return _table
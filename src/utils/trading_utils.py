@@ -1,6 +1,12 @@
 from decimal import Decimal, ROUND_DOWN
+from functools import lru_cache
 from typing import Union
 
+@lru_cache(maxsize=None)
+def _quantum(decimals: int) -> Decimal:
+    """Quantize template for a number of decimals, built once"""
+    return Decimal(1).scaleb(-decimals)
+
 def calculate_position_size(
     account_size: float,
     risk_percentage: float,
@@ -39,7 +45,7 @@ def calculate_order_quantity(
     
     # Round down to avoid exceeding available funds
     return quantity.quantize(
-        Decimal(f"0.{'0' * decimals}"),
+        _quantum(decimals),
         rounding=ROUND_DOWN
     )
 
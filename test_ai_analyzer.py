@@ -0,0 +1,82 @@
+import asyncio
+from types import SimpleNamespace as NS
+from config.config import Config
+from src.ai_analyzer import AIAnalyzer
+
+
+class FakeStream:
+    """Async iterator over pre-recorded stream events"""
+
+    def __init__(self, events, delay=0.0):
+        self.events = list(events)
+        self.delay = delay
+        self.consumed = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.consumed >= len(self.events):
+            raise StopAsyncIteration
+        await asyncio.sleep(self.delay)
+        self.consumed += 1
+        return self.events[self.consumed - 1]
+
+    async def close(self):
+        self.closed = True
+
+
+def gpt_chunks(text, size=4):
+    return [NS(choices=[NS(delta=NS(content=text[i:i + size]))]) for i in range(0, len(text), size)]
+
+
+def claude_events(text, size=4):
+    return [NS(type='content_block_delta', delta=NS(type='input_json_delta', partial_json=text[i:i + size]))
+            for i in range(0, len(text), size)]
+
+
+def make_analyzer(gpt_stream, claude_stream):
+    analyzer = AIAnalyzer()
+
+    async def gpt_create(**kwargs):
+        assert kwargs['stream']
+        return gpt_stream
+
+    async def claude_create(**kwargs):
+        assert kwargs['stream']
+        return claude_stream
+
+    analyzer._openai_client = NS(chat=NS(completions=NS(create=gpt_create)))
+    analyzer._claude_client = NS(messages=NS(create=claude_create))
+    return analyzer
+
+
+def test_hold_cuts_off_both_streams(monkeypatch):
+    monkeypatch.setattr(Config, 'AI_STREAMING', True)
+    hold = '{"decision": "HOLD", "confidence": 60, "stop_loss": 1, "take_profit": 2, "risk": 3}'
+    buy = '{"decision": "BUY", "confidence": 90, "stop_loss": 1, "take_profit": 2, "risk": 3}'
+    gpt_stream = FakeStream(gpt_chunks(hold))
+    claude_stream = FakeStream(claude_events(buy), delay=0.05)
+    analyzer = make_analyzer(gpt_stream, claude_stream)
+
+    analysis = asyncio.run(analyzer.analyze_market({'current_price': 100}))
+
+    assert analysis['should_trade'] is False
+    assert analysis['early_exit'] is True
+    assert analysis['gpt_analysis']['direction'] == 'HOLD'
+    assert gpt_stream.closed and gpt_stream.consumed < len(gpt_stream.events)
+    # The slower Claude request was abandoned instead of read to the end
+    assert claude_stream.consumed < len(claude_stream.events)
+
+
+def test_full_streams_are_combined(monkeypatch):
+    monkeypatch.setattr(Config, 'AI_STREAMING', True)
+    buy = '{"decision": "BUY", "confidence": 90, "stop_loss": 1, "take_profit": 2, "risk": 3}'
+    analyzer = make_analyzer(FakeStream(gpt_chunks(buy)), FakeStream(claude_events(buy)))
+
+    analysis = asyncio.run(analyzer.analyze_market({'current_price': 100}))
+
+    assert analysis['should_trade'] is True
+    assert analysis['take_profit'] == 2.0
+    assert analysis['stop_loss'] == 1.0
@@ -0,0 +1,79 @@
+from src.ai_schema import ANALYSIS_TOOL, StreamingDecisionParser, parse_analysis
+
+COMPLETE = {'direction': 'BUY', 'source': 'gpt', 'confidence': 80.0,
+            'stop_loss': 1.0, 'take_profit': 1.5, 'risk': 4}
+
+
+def test_legacy_line_format():
+    text = "DECISION: BUY\nCONFIDENCE: 80%\nSTOP_LOSS: 1.0\nTAKE_PROFIT: 1.5\nRISK: 4"
+    assert parse_analysis(text, 'gpt') == COMPLETE
+
+
+def test_clean_json():
+    text = '{"decision": "BUY", "confidence": 80, "stop_loss": 1.0, "take_profit": 1.5, "risk": 4}'
+    assert parse_analysis(text, 'gpt') == COMPLETE
+
+
+def test_repairs_common_json_defects():
+    text = (
+        "Here is my analysis:\n```json\n"
+        "{decision: buy, confidence: 80%, 'stop_loss': 1.0, take_profit: \"1.5%\", risk: 4,}\n"
+        "```"
+    )
+    assert parse_analysis(text, 'gpt') == COMPLETE
+
+
+def test_tool_call_input_with_aliases():
+    data = {'Direction': '[sell]', 'Confidence': '90', 'Stop Loss': 2, 'take-profit': 3, 'risk_level': 6.4}
+    result = parse_analysis(data, 'claude')
+    assert result['direction'] == 'SELL'
+    assert result['risk'] == 6
+    assert 'partial' not in result
+
+
+def test_invalid_fields_give_partial_result():
+    text = "DECISION: HOLD\nCONFIDENCE: very high\nSTOP_LOSS: 1.0\nRISK: 42"
+    result = parse_analysis(text, 'gpt')
+    assert result['direction'] == 'HOLD'
+    assert result['stop_loss'] == 1.0
+    assert result['partial'] is True
+    assert sorted(result['missing']) == ['confidence', 'risk', 'take_profit']
+
+
+def test_truncated_json_keeps_what_arrived():
+    result = parse_analysis('{"decision": "HOLD", "confidence": 40', 'gpt')
+    assert result['direction'] == 'HOLD'
+    assert result['confidence'] == 40.0
+
+
+def test_no_decision_is_rejected():
+    assert parse_analysis('I cannot help with that.', 'gpt') is None
+    assert parse_analysis('{"decision": "MAYBE", "confidence": 50}', 'gpt') is None
+
+
+def test_tool_schema_requires_every_field():
+    assert sorted(ANALYSIS_TOOL['input_schema']['required']) == [
+        'confidence', 'decision', 'risk', 'stop_loss', 'take_profit'
+    ]
+
+
+def test_streaming_parser_waits_for_complete_numbers():
+    parser = StreamingDecisionParser()
+    for chunk in ('{"decision": "BU', 'Y", "confidence": 4', '5', ', "stop_loss"'):
+        parser.feed(chunk)
+        if chunk == '5':
+            # "45" could still become "450"; not decided yet
+            assert parser.confidence is None
+    assert parser.decision == 'BUY'
+    assert parser.confidence == 45.0
+    assert parser.should_stop(50)
+    assert not parser.should_stop(40)
+
+
+def test_streaming_parser_stops_on_hold_in_line_format():
+    parser = StreamingDecisionParser()
+    parser.feed('DECISION: HOLD\nCONF')
+    assert parser.should_stop(50)
+    result = parser.result('gpt')
+    assert result['direction'] == 'HOLD'
+    assert result['partial'] is True
@@ -0,0 +1,66 @@
+import subprocess
+import sys
+from src.cli import HEAVY_MODULES, IMPORT_TIME_BUDGET, build_parser, measure_import_time
+
+
+def test_cli_import_stays_within_budget():
+    # Best of three to keep scheduler noise out of the measurement
+    best = min(measure_import_time('src.cli') for _ in range(3))
+    assert best <= IMPORT_TIME_BUDGET, f"import src.cli took {best * 1000:.0f}ms"
+
+
+def test_cli_does_not_import_heavy_sdks():
+    code = (
+        "import sys, src, src.cli, config.config; "
+        "from src.cli import HEAVY_MODULES; "
+        "print(','.join(m for m in HEAVY_MODULES if m in sys.modules))"
+    )
+    loaded = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True, check=True
+    ).stdout.strip()
+    assert loaded == '', f"heavy modules imported eagerly: {loaded}"
+
+
+def test_component_modules_defer_sdk_imports():
+    code = (
+        "import sys, src.market_data, src.ai_analyzer, src.bot_manager; "
+        "print(','.join(m for m in ('binance', 'py3cw', 'openai', 'anthropic') "
+        "if m in sys.modules))"
+    )
+    loaded = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True, check=True
+    ).stdout.strip()
+    assert loaded == ''
+
+
+def test_subcommands_parse():
+    parser = build_parser()
+    assert parser.parse_args(['scan', '--pairs', 'BTCUSDT']).pairs == ['BTCUSDT']
+    assert parser.parse_args(['backtest', '--days', '7']).days == 7
+    assert parser.parse_args(['check-services']).func.__name__ == 'cmd_check_services'
+    assert parser.parse_args(['bench']).func.__name__ == 'cmd_bench'
+    assert 'numpy' in HEAVY_MODULES
+
+
+def test_run_logs_to_trading_log(tmp_path, monkeypatch):
+    import logging
+    import main
+    from src import cli
+
+    async def run_bot():
+        logging.getLogger('TradingBot').info('started')
+    monkeypatch.setattr(main, 'main', run_bot)
+    monkeypatch.chdir(tmp_path)
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    try:
+        assert cli.main(['run']) == 0
+        for handler in root.handlers:
+            handler.flush()
+        assert 'TradingBot - INFO - started' in (tmp_path / 'logs' / 'trading.log').read_text()
+    finally:
+        for handler in root.handlers:
+            if handler not in handlers:
+                handler.close()
+        root.handlers[:] = handlers
+        root.setLevel(level)
@@ -0,0 +1,121 @@
+import time
+import numpy as np
+import pytest
+from src.data_quality import DataQualityGuard, find_gaps, find_outliers
+
+HOUR = 3_600_000
+NOW = 1_700_000_000.0
+
+
+def candles(closes, start=None):
+    start = start if start is not None else int(NOW * 1000) // HOUR * HOUR - (len(closes) - 1) * HOUR
+    return [[start + i * HOUR, str(c), str(c * 1.001), str(c * 0.999), str(c), '10.0', 0]
+            for i, c in enumerate(closes)]
+
+
+def ticker(price):
+    return {'last': price, 'timestamp': NOW * 1000 - 1000}
+
+
+def test_clean_data_passes_untouched():
+    rng = np.random.default_rng(0)
+    closes = list(100 * np.exp(np.cumsum(rng.normal(0, 0.005, 24))))
+    klines = candles(closes)
+    guard = DataQualityGuard()
+
+    checked, report = guard.check('BTCUSDT', ticker(closes[-1]), klines, now=NOW)
+    assert checked is klines and report['issues'] == []
+
+
+def test_isolated_print_is_repaired_but_level_shift_is_not():
+    closes = [100.0] * 10 + [130.0] + [100.0] * 5 + [110.0] * 8
+    guard = DataQualityGuard()
+
+    outliers, median = find_outliers(np.array(closes), 3, 6.0)
+    assert outliers.tolist().index(True) == 10 and outliers.sum() == 1
+
+    repaired, report = guard.check('BTCUSDT', ticker(110.0), candles(closes), now=NOW)
+    assert float(repaired[10][4]) == 100.0
+    assert not report['blocked'] and guard.repaired == 1
+
+
+def test_missing_candles_are_filled_flat():
+    closes = [100.0 + i for i in range(24)]
+    klines = candles(closes)
+    del klines[5]
+    missing, ordered = find_gaps(np.array([k[0] for k in klines]), HOUR)
+    assert ordered and missing.tolist()[4] == 1
+
+    repaired, _ = DataQualityGuard().check('BTCUSDT', ticker(123.0), klines, now=NOW)
+    assert len(repaired) == len(klines)
+    assert np.all(np.diff([row[0] for row in repaired]) == HOUR)
+    filler = repaired[4]  # the filled candle, after trimming back to the original length
+    assert filler[1] == filler[4] == 104.0 and filler[5] == 0.0
+
+
+@pytest.mark.parametrize('mutate, issue', [
+    (lambda k, t: k.reverse(), 'out_of_order'),
+    (lambda k, t: [row.__setitem__(0, row[0] - 5 * HOUR) for row in k], 'stale_klines'),
+    (lambda k, t: t.update(timestamp=(NOW - 600) * 1000), 'stale_ticker'),
+    (lambda k, t: t.update(last=90.0), 'ticker_mismatch'),
+    (lambda k, t: k[3].__setitem__(4, '-1'), 'malformed'),
+    (lambda k, t: [k[i].__setitem__(4, '150') for i in (3, 9, 15)], 'too_many_repairs'),
+])
+def test_bad_data_blocks_the_pair(mutate, issue):
+    klines, tick = candles([100.0] * 24), ticker(100.0)
+    mutate(klines, tick)
+    guard = DataQualityGuard()
+
+    checked, report = guard.check('BTCUSDT', tick, klines, now=NOW)
+    assert checked is None and report['blocked']
+    assert issue in guard.get_stats()['issues']
+
+
+def test_check_is_cheap():
+    klines = candles(list(np.linspace(100, 110, 24)))
+    guard = DataQualityGuard()
+    started = time.perf_counter()
+    for _ in range(200):
+        guard.check('BTCUSDT', ticker(110.0), klines, now=NOW)
+    # Generous bound for slow CI; typically well under 100us per check
+    assert (time.perf_counter() - started) / 200 < 0.002
+
+
+class FakeBinance:
+    """Public Binance client answering with flat, current candles"""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_ticker(self, symbol):
+        self.calls.append(symbol)
+        return {'lastPrice': '100', 'priceChangePercent': '0', 'volume': '1000',
+                'highPrice': '101', 'lowPrice': '99', 'closeTime': time.time() * 1000}
+
+    def get_klines(self, symbol, interval, limit):
+        start = int(time.time() * 1000) // HOUR * HOUR - (limit - 1) * HOUR
+        return [[start + i * HOUR, '100', '100.1', '99.9', '100', '10.0', 0] for i in range(limit)]
+
+
+def test_market_data_cache_is_per_pair_and_unmodified():
+    import asyncio
+    from datetime import timedelta
+    from src.market_data import MarketDataManager
+    manager = MarketDataManager()
+    manager._client = FakeBinance()
+    manager.order_flow = type('Flow', (), {'get_features': lambda self, symbol: {'spread_bps': 1.0}})()
+
+    async def run():
+        first = await manager.get_market_data('AUSDT')
+        assert first['order_flow'] == {'spread_bps': 1.0}
+        assert 'order_flow' not in manager.cached_data['AUSDT']
+        await manager.get_market_data('AUSDT')
+        assert manager.client.calls == ['AUSDT']
+
+        # A fresh fetch of another pair doesn't make a stale one fresh again
+        manager.updated_at['AUSDT'] -= timedelta(minutes=5)
+        await manager.get_market_data('BUSDT')
+        await manager.get_market_data('AUSDT')
+        assert manager.client.calls == ['AUSDT', 'BUSDT', 'AUSDT']
+
+    asyncio.run(run())
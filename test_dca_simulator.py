@@ -0,0 +1,106 @@
+import asyncio
+import numpy as np
+import pytest
+from src.bot_manager import LADDER_DEFAULTS, BotManager
+from src.dca_simulator import (
+    OPEN, STOP_LOSS, TAKE_PROFIT,
+    check_ladder, ladder_levels, ladder_matrix, simulate_ladders
+)
+
+
+def reference(prices, config):
+    """Plain loop simulation of a single ladder"""
+    base, so_vol, step, mvc, msc, max_so, tp, sl = config
+    entry = prices[0]
+    levels, deviation, stepsize = [], 0.0, step
+    for k in range(int(max_so)):
+        deviation += stepsize
+        stepsize *= msc
+        levels.append((entry * (1 - deviation / 100), so_vol * mvc ** k))
+
+    cost, qty, fills = base, base / entry, 0
+    for i, price in enumerate(prices):
+        while fills < len(levels) and price <= levels[fills][0]:
+            level, volume = levels[fills]
+            cost += volume
+            qty += volume / level
+            fills += 1
+        if i == 0:
+            continue
+        avg = cost / qty
+        if price >= avg * (1 + tp / 100):
+            return fills, avg, cost, i, TAKE_PROFIT
+        if sl and price <= avg * (1 - sl / 100):
+            return fills, avg, cost, i, STOP_LOSS
+    return fills, cost / qty, cost, -1, OPEN
+
+
+def test_matches_reference_on_random_paths():
+    rng = np.random.default_rng(3)
+    configs = np.column_stack([
+        rng.uniform(5, 20, 300),        # base_order_volume
+        rng.uniform(5, 20, 300),        # safety_order_volume
+        rng.uniform(0.5, 3, 300),       # safety_order_step_percentage
+        rng.uniform(1, 2, 300),         # martingale_volume_coefficient
+        rng.uniform(1, 1.5, 300),       # martingale_step_coefficient
+        rng.integers(0, 8, 300),        # max_safety_orders
+        rng.uniform(0.5, 3, 300),       # take_profit
+        rng.choice([0, 2, 5, 10], 300)  # stop_loss_percentage
+    ])
+    for _ in range(5):
+        prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 400)))
+        prices[0] = 100
+        result = simulate_ladders(prices, configs)
+        for i, config in enumerate(configs):
+            fills, avg, cost, exit_index, reason = reference(prices, config)
+            assert result['fills'][i] == fills
+            assert result['avg_entry'][i] == pytest.approx(avg)
+            assert result['capital_at_risk'][i] == pytest.approx(cost)
+            assert result['exit_index'][i] == exit_index
+            assert result['exit_reason'][i] == reason
+
+
+def test_ladder_levels_and_capital():
+    configs = ladder_matrix([dict(LADDER_DEFAULTS, max_safety_orders=3,
+                                  martingale_step_coefficient=2.0,
+                                  stop_loss_percentage=None)])
+    deviations, volumes = ladder_levels(configs)
+
+    assert deviations[0].tolist() == [2.5, 7.5, 17.5]
+    assert volumes[0].tolist() == [5, 7.5, 11.25]
+    result = simulate_ladders([100, 97, 101], configs)
+    assert result['max_capital'][0] == pytest.approx(5 + 5 + 7.5 + 11.25)
+    assert result['fills'][0] == 1
+    assert result['exit_reason'][0] == TAKE_PROFIT
+
+
+def test_check_ladder_flags_capital_and_stop_outs():
+    crash = np.linspace(100, 80, 100)
+    settings = dict(LADDER_DEFAULTS, stop_loss_percentage=1.0)
+
+    assert check_ladder(settings, crash) == []
+    problems = check_ladder(settings, crash, max_capital=10, max_stop_out_rate=0.5)
+    assert len(problems) == 2
+    assert 'tie up 17.50' in problems[0]
+    assert 'stops out in 100%' in problems[1]
+
+
+def test_apply_ai_recommendations_rejects_bad_ladder(monkeypatch):
+    manager = BotManager()
+    sent = []
+
+    async def update(bot_id, settings):
+        sent.append(settings)
+        return True
+
+    monkeypatch.setattr(manager, 'update_bot_settings', update)
+    recommendations = {'should_trade': True, 'take_profit': 2.0, 'stop_loss': 1.0,
+                       'average_confidence': 80}
+
+    crash = list(np.linspace(100, 80, 100))
+    assert asyncio.run(manager.apply_ai_recommendations(1, recommendations, crash)) is False
+    assert not sent
+
+    rally = list(np.linspace(100, 120, 100))
+    assert asyncio.run(manager.apply_ai_recommendations(1, recommendations, rally)) is True
+    assert sent[0]['take_profit'] == 2.0
@@ -0,0 +1,125 @@
+import asyncio
+import pytest
+from src.exchanges import (
+    BinanceAdapter, CoinbaseAdapter, KrakenAdapter, MarketAggregator, merge_klines
+)
+from src.utils.symbols import SymbolTable
+
+# Recorded public API responses (trimmed)
+BINANCE_TICKER = {
+    'symbol': 'BTCUSDT', 'priceChangePercent': '1.250', 'lastPrice': '60000.00',
+    'bidPrice': '59999.99', 'askPrice': '60000.00', 'volume': '12000.5',
+    'highPrice': '60500.00', 'lowPrice': '59000.00'
+}
+BINANCE_KLINES = [
+    [1700000000000, '59900.0', '60100.0', '59800.0', '60000.0', '100.0', 1700003599999],
+    [1700003600000, '60000.0', '60200.0', '59900.0', '60100.0', '300.0', 1700007199999]
+]
+KRAKEN_TICKER = {'error': [], 'result': {'XBTUSDT': {
+    'a': ['60010.00000', '1', '1.000'], 'b': ['60005.00000', '2', '2.000'],
+    'c': ['60008.00000', '0.001'], 'v': ['50.1', '250.2'], 'p': ['60000', '59900'],
+    't': [1000, 5000], 'l': ['59100.0', '58900.0'], 'h': ['60400.0', '60600.0'], 'o': '59500.0'
+}}}
+KRAKEN_OHLC = {'error': [], 'result': {'XBTUSDT': [
+    [1700000000, '59950.0', '60300.0', '59700.0', '60050.0', '60000.0', '100.0', 50],
+    [1700003600, '60050.0', '60150.0', '59950.0', '60200.0', '60100.0', '100.0', 40],
+    [1700007200, '60200.0', '60250.0', '60150.0', '60220.0', '60200.0', '1.0', 3]
+], 'last': 1700007200}}
+COINBASE_TICKER = {'ask': '60020.00', 'bid': '60019.50', 'volume': '900.1',
+                   'price': '60020.00', 'size': '0.01', 'time': '2023-11-14T22:13:20Z'}
+COINBASE_STATS = {'open': '59000.00', 'high': '60700.00', 'low': '58800.00',
+                  'last': '60020.00', 'volume': '900.1'}
+COINBASE_CANDLES = [[1700003600, 59900.0, 60300.0, 60000.0, 60150.0, 0.0],
+                    [1700000000, 59850.0, 60050.0, 59950.0, 60010.0, 0.0]]
+
+
+class FakeBinanceClient:
+    def get_ticker(self, symbol):
+        assert symbol == 'BTCUSDT'
+        return BINANCE_TICKER
+
+    def get_klines(self, symbol, interval, limit):
+        return BINANCE_KLINES
+
+
+def recorded(responses):
+    async def fetch(url, params):
+        key = url.rsplit('/', 1)[-1]
+        if isinstance(responses.get(key), Exception):
+            raise responses[key]
+        return responses[key]
+    return fetch
+
+
+def test_symbol_mapping_round_trips():
+    table = SymbolTable()
+    assert table.to_venue('BTCUSDT', '3commas') == 'USDT_BTC'
+    assert table.to_venue('BTCUSDT', 'kraken') == 'XBTUSDT'
+    assert table.to_venue('ETHBTC', 'coinbase') == 'ETH-BTC'
+    assert table.from_venue('USDT_SOL', '3commas') == 'SOLUSDT'
+    assert table.from_venue('XBTUSDC', 'kraken') == 'BTCUSDC'
+    assert table.from_venue('DOGE-USD', 'coinbase') == 'DOGEUSD'
+    for name in ('BTCUSDT', 'ETHBTC', 'SOLFDUSD'):
+        for venue in ('binance', 'kraken', 'coinbase', '3commas'):
+            assert table.from_venue(table.to_venue(name, venue), venue) == name
+
+    # Exact assets from exchangeInfo win over suffix guessing
+    table.load_exchange_info({'symbols': [{'symbol': 'USDCUSDT', 'baseAsset': 'USDC', 'quoteAsset': 'USDT'}]})
+    assert table.to_venue('USDCUSDT', '3commas') == 'USDT_USDC'
+    with pytest.raises(ValueError):
+        table.parse('NOPE')
+
+
+def test_adapters_parse_recorded_responses():
+    kraken = KrakenAdapter(SymbolTable(), fetch=recorded({'Ticker': KRAKEN_TICKER, 'OHLC': KRAKEN_OHLC}))
+    coinbase = CoinbaseAdapter(SymbolTable(), fetch=recorded(
+        {'ticker': COINBASE_TICKER, 'stats': COINBASE_STATS, 'candles': COINBASE_CANDLES}))
+
+    async def run():
+        return (await kraken.get_ticker('BTCUSDT'), await kraken.get_klines('BTCUSDT', limit=2),
+                await coinbase.get_ticker('BTCUSDT'), await coinbase.get_klines('BTCUSDT'))
+
+    kraken_ticker, kraken_klines, coinbase_ticker, coinbase_klines = asyncio.run(run())
+    assert kraken_ticker['last'] == 60008.0 and kraken_ticker['bid'] == 60005.0
+    assert kraken_ticker['volume_24h'] == 250.2
+    assert kraken_klines[0] == [1700003600000, 60050.0, 60150.0, 59950.0, 60200.0, 100.0]
+    assert coinbase_ticker['change_24h'] == pytest.approx((60020 / 59000 - 1) * 100)
+    # Coinbase candles are newest first with low/high before open/close
+    assert coinbase_klines[0] == [1700000000000, 59950.0, 60050.0, 59850.0, 60010.0, 0.0]
+
+    with pytest.raises(ValueError):
+        KrakenAdapter.parse_ticker({'error': ['EQuery:Unknown asset pair']}, 'FOOUSDT')
+
+
+def test_merge_klines_on_primary_times():
+    merged = merge_klines({
+        'binance': [row[:6] for row in BINANCE_KLINES],
+        'kraken': KrakenAdapter.parse_klines(KRAKEN_OHLC)
+    }, 'binance')
+
+    # Kraken's extra candle has no Binance counterpart and is left out
+    assert [row[0] for row in merged] == [1700000000000, 1700003600000]
+    first = merged[0]
+    assert first[2] == 60300.0 and first[3] == 59700.0  # widest high / low
+    assert first[4] == pytest.approx((60000.0 * 100 + 60050.0 * 100) / 200)
+    assert first[5] == 200.0
+
+
+def test_aggregator_reports_best_prices_and_survives_a_failing_venue(monkeypatch):
+    symbols = SymbolTable()
+    aggregator = MarketAggregator([
+        BinanceAdapter(FakeBinanceClient, symbols),
+        KrakenAdapter(symbols, fetch=recorded({'Ticker': KRAKEN_TICKER, 'OHLC': KRAKEN_OHLC})),
+        CoinbaseAdapter(symbols, fetch=recorded({'ticker': ValueError('down'), 'stats': COINBASE_STATS,
+                                                 'candles': ValueError('down')}))
+    ])
+    monkeypatch.setattr(aggregator.primary.resilience.retry_policy, 'max_attempts', 1)
+
+    snapshot = asyncio.run(aggregator.get_snapshot('BTCUSDT'))
+    venues = snapshot['cross_venue']
+
+    assert snapshot['ticker']['venue'] == 'binance'
+    assert venues['venues'] == 2 and set(venues['prices']) == {'binance', 'kraken'}
+    assert venues['best_bid_venue'] == 'kraken' and venues['best_ask_venue'] == 'binance'
+    assert venues['spread_bps'] == pytest.approx((60008 / 60000 - 1) * 1e4)
+    assert len(snapshot['klines']) == 2
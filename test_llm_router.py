@@ -0,0 +1,178 @@
+import asyncio
+from src.llm_router import LLMProvider, LLMRouter, ProviderStats, combine_analyses
+from src.prompt_builder import PromptRequest
+
+PROMPT = PromptRequest('system', 'BTCUSDT px=50000', max_tokens=100,
+                       input_tokens=200, sections=['market'])
+
+
+def answer(direction, confidence, **extra):
+    return dict({'direction': direction, 'confidence': confidence,
+                 'take_profit': 2.0, 'stop_loss': 1.0}, **extra)
+
+
+def fake_provider(name, result, delay=0.0, input_cost=0.0, weight=1.0):
+    """Provider that answers `result` after `delay` and records the calls"""
+    calls = []
+
+    async def call(prompt, model):
+        calls.append(model)
+        await asyncio.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    provider = LLMProvider(name, f'{name}-model', call, input_cost=input_cost, weight=weight)
+    provider.calls = calls
+    return provider
+
+
+def test_provider_stats_percentiles_and_errors():
+    stats = ProviderStats(window=10)
+    for latency in (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9):
+        stats.record(latency, True, cost=0.01)
+    stats.record(5.0, False)
+
+    assert stats.percentile(50) == 0.5
+    assert stats.percentile(95) == 0.9
+    assert stats.error_rate == 0.1
+    assert stats.get_stats()['cost'] == 0.09
+
+
+def test_rank_prefers_cheap_fast_healthy_providers():
+    cheap = fake_provider('cheap', None, input_cost=0.001)
+    pricey = fake_provider('pricey', None, input_cost=0.01)
+    slow = fake_provider('slow', None)
+    failing = fake_provider('failing', None)
+    for _ in range(5):
+        slow.stats.record(10.0, True)
+        failing.stats.record(0.1, False)
+    router = LLMRouter([failing, slow, pricey, cheap], latency_slo=5.0, quorum=2,
+                       consensus='unanimous', max_error_rate=0.5)
+
+    assert [p.name for p in router.rank(PROMPT)] == ['cheap', 'pricey', 'slow', 'failing']
+
+
+def test_slow_provider_is_hedged_to_meet_slo():
+    fast = fake_provider('fast', answer('BUY', 90))
+    slow = fake_provider('slow', answer('BUY', 90), delay=1.0)
+    spare = fake_provider('spare', answer('BUY', 80), input_cost=1.0)
+    spare.stats.record(0.05, True)
+    router = LLMRouter([fast, slow, spare], latency_slo=0.2, quorum=2, consensus='unanimous')
+
+    analysis = asyncio.run(router.decide(PROMPT))
+
+    assert router.hedges == 1
+    assert spare.calls == ['spare-model']
+    assert analysis['should_trade'] is True
+    assert analysis['slow_analysis'] is None
+    assert analysis['average_confidence'] == 85
+
+
+def test_failed_provider_is_replaced_by_spare():
+    broken = fake_provider('broken', RuntimeError('503'))
+    ok = fake_provider('ok', answer('SELL', 80))
+    spare = fake_provider('spare', answer('SELL', 90), input_cost=1.0)
+    router = LLMRouter([broken, ok, spare], latency_slo=5.0, quorum=2, consensus='unanimous')
+
+    analysis = asyncio.run(router.decide(PROMPT))
+
+    assert spare.calls
+    assert analysis['recommended_direction'] == 'SELL'
+    assert analysis['should_trade'] is True
+    assert router.get_stats()['providers']['broken']['error_rate'] == 1.0
+
+
+def test_spare_slower_than_slo_is_not_hedged():
+    first = fake_provider('first', answer('BUY', 90), delay=0.05)
+    second = fake_provider('second', answer('BUY', 80), delay=0.05)
+    spare = fake_provider('spare', answer('BUY', 70), input_cost=1.0)
+    for _ in range(5):
+        spare.stats.record(1.0, True)
+    router = LLMRouter([first, second, spare], latency_slo=0.2, quorum=2, consensus='unanimous')
+
+    analysis = asyncio.run(router.decide(PROMPT))
+
+    assert router.hedges == 0
+    assert spare.calls == []
+    assert analysis['should_trade'] is True
+
+
+def test_last_spare_used_for_failover_is_not_hedged_again():
+    broken = fake_provider('broken', RuntimeError('503'))
+    slow = fake_provider('slow', answer('BUY', 90), delay=0.3)
+    spare = fake_provider('spare', answer('BUY', 80), delay=0.2, input_cost=1.0)
+    router = LLMRouter([broken, slow, spare], latency_slo=0.2, quorum=2, consensus='unanimous')
+
+    analysis = asyncio.run(router.decide(PROMPT))
+
+    assert router.hedges == 0
+    assert analysis['should_trade'] is True
+    assert analysis['average_confidence'] == 85
+
+
+def test_early_hold_settles_unanimous_vote():
+    hold = fake_provider('hold', answer('HOLD', 40, early_exit=True))
+    slow = fake_provider('slow', answer('BUY', 95), delay=1.0)
+    router = LLMRouter([hold, slow], latency_slo=5.0, quorum=2, consensus='unanimous')
+
+    analysis = asyncio.run(asyncio.wait_for(router.decide(PROMPT), 0.5))
+
+    assert analysis['should_trade'] is False
+    assert analysis['early_exit'] is True
+
+
+def test_consensus_rules():
+    analyses = {
+        'a': answer('BUY', 90),
+        'b': answer('BUY', 80),
+        'c': dict(answer('SELL', 95), take_profit=5.0)
+    }
+
+    assert combine_analyses(analyses, 'unanimous')['should_trade'] is False
+
+    majority = combine_analyses(analyses, 'majority')
+    assert majority['should_trade'] is True
+    assert majority['average_confidence'] == 85
+    assert majority['take_profit'] == 2.0
+
+    weighted = combine_analyses(analyses, 'weighted', {'a': 1.0, 'b': 1.0, 'c': 3.0})
+    assert weighted['recommended_direction'] == 'SELL'
+    assert weighted['average_confidence'] == 57
+    assert weighted['should_trade'] is False
+    assert weighted['take_profit'] == 5.0
+
+    assert combine_analyses({'a': None}, 'majority') is None
+
+
+def test_quorum_can_be_overridden_per_decision():
+    cheap = fake_provider('cheap', answer('BUY', 90), input_cost=0.001)
+    dear = fake_provider('dear', answer('BUY', 90), input_cost=0.01)
+    router = LLMRouter([cheap, dear], latency_slo=5, quorum=2)
+
+    asyncio.run(router.decide(PROMPT))
+    assert len(cheap.calls) == 1 and len(dear.calls) == 1
+
+
+def test_reduced_quorum_only_rules_trades_out():
+    cheap = fake_provider('cheap', answer('HOLD', 40), input_cost=0.001)
+    dear = fake_provider('dear', answer('BUY', 90), input_cost=0.01)
+    router = LLMRouter([cheap, dear], latency_slo=5, quorum=2, consensus='unanimous')
+
+    # One HOLD settles a reduced-quorum decision
+    hold = asyncio.run(router.decide(PROMPT, quorum=1))
+    assert not hold['should_trade'] and not dear.calls
+
+    # One model wanting to trade is not enough: the second is asked too
+    # (the first isn't asked again) and the consensus rule applies
+    cheap = fake_provider('cheap', answer('BUY', 90), input_cost=0.001)
+    dear = fake_provider('dear', answer('SELL', 85), input_cost=0.01)
+    router = LLMRouter([cheap, dear], latency_slo=5, quorum=2, consensus='unanimous')
+    split = asyncio.run(router.decide(PROMPT, quorum=1))
+    assert len(cheap.calls) == 1 and len(dear.calls) == 1
+    assert not split['should_trade']
+    assert router.get_stats()['decisions'] == 1
+
+    dear = fake_provider('dear', answer('BUY', 80), input_cost=0.01)
+    router = LLMRouter([cheap, dear], latency_slo=5, quorum=2, consensus='unanimous')
+    assert asyncio.run(router.decide(PROMPT, quorum=1))['should_trade']
@@ -0,0 +1,126 @@
+import asyncio
+import numpy as np
+import pytest
+from config.config import Config
+from src.bot_manager import BotManager
+from src.market_data import MarketDataManager
+from src.memory import MemoryProfiler, soak
+from src.paper_trading import PaperBotManager, PaperEngine
+from src.portfolio import IncrementalCovariance
+from src.records import Indicators, MarketSnapshot
+from src.utils.logging_utils import setup_logging
+
+
+def test_records_read_like_dicts():
+    snapshot = MarketSnapshot(symbol='BTCUSDT', current_price=50000.0,
+                              indicators=Indicators(rsi_14=55.0, sma_20=49000.0))
+    assert snapshot['symbol'] == 'BTCUSDT'
+    assert snapshot.get('regime') is None and 'regime' not in snapshot
+    assert snapshot['indicators'].get('rsi_14') == 55.0
+    assert not hasattr(snapshot, '__dict__')
+    with pytest.raises(KeyError):
+        snapshot['unknown'] = 1
+
+    restored = MarketSnapshot.from_dict(snapshot.to_dict())
+    assert restored == snapshot
+    assert isinstance(restored['indicators'], Indicators)
+
+
+def test_caches_are_bounded(monkeypatch):
+    monkeypatch.setattr(Config, 'MARKET_CACHE_SIZE', 2)
+    monkeypatch.setattr(Config, 'DEAL_HISTORY_SIZE', 3)
+    market_data = MarketDataManager()
+    for symbol in ('AUSDT', 'BUSDT', 'AUSDT', 'CUSDT'):
+        market_data.store(symbol, MarketSnapshot(symbol=symbol), None)
+    # Least recently updated pair dropped first
+    assert list(market_data.cached_data) == ['AUSDT', 'CUSDT']
+
+    manager = BotManager()
+    manager._record_deals([{'id': i} for i in range(5, 0, -1)])
+    manager._record_deals([{'id': 5}, {'id': 6}])
+    assert [deal['id'] for deal in manager.deal_history] == [4, 5, 6]
+    assert manager._seen_deals == {4, 5, 6}
+
+
+def test_removed_slots_are_reused(monkeypatch):
+    covariance = IncrementalCovariance(halflife=10)
+    for step in range(3):
+        covariance.update({'AUSDT': 100 + step, 'BUSDT': 50 - step})
+    slot = covariance.index['AUSDT']
+    covariance.remove('AUSDT')
+    covariance.update({'CUSDT': 10.0, 'BUSDT': 48.0})
+    assert covariance.index['CUSDT'] == slot
+    assert covariance.observations[slot] == 0
+
+    manager = PaperBotManager(PaperEngine(fee_rate=0))
+
+    async def run():
+        for pair in ('AUSDT', 'BUSDT', 'CUSDT'):
+            await manager.create_bot(pair)
+        manager.prune_bots(['CUSDT'])
+        await manager.create_bot('DUSDT')
+
+    monkeypatch.setattr(Config, 'INACTIVE_BOTS_KEPT', 0)
+    asyncio.run(run())
+    assert set(manager.active_bots) == {'CUSDT', 'DUSDT'}
+    assert manager.engine.count == 3
+
+
+def test_pruned_live_bot_is_reused_when_its_pair_returns(monkeypatch):
+    manager = BotManager()
+    calls = []
+
+    async def request(entity, action='', action_id=None, payload=None, **kwargs):
+        calls.append((action, action_id))
+        return None, {'id': 100 + len(calls)} if action == 'create_bot' else {}
+
+    async def account():
+        return {'id': 1}
+    monkeypatch.setattr(manager, '_request', request)
+    monkeypatch.setattr(manager, 'get_account_info', account)
+    monkeypatch.setattr(Config, 'INACTIVE_BOTS_KEPT', 0)
+
+    async def run():
+        bot = await manager.create_bot('AUSDT')
+        manager.prune_bots([])
+        assert manager.active_bots == {} and manager.retired_bots == {'AUSDT': bot['id']}
+        again = await manager.create_bot('AUSDT')
+        return bot, again
+
+    bot, again = asyncio.run(run())
+    assert again['id'] == bot['id']
+    assert calls == [('create_bot', None), ('enable', str(bot['id']))]
+    assert manager.active_bots == {'AUSDT': bot['id']} and not manager.retired_bots
+
+
+def test_setup_logging_is_idempotent(tmp_path):
+    logger = setup_logging('MemoryTest', str(tmp_path))
+    handlers = list(logger.handlers)
+    assert setup_logging('MemoryTest', str(tmp_path)).handlers == handlers
+    for handler in handlers:
+        handler.close()
+        logger.removeHandler(handler)
+
+
+def test_profiler_reports_growth():
+    profiler = MemoryProfiler()
+    profiler.start()
+    try:
+        kept = [np.zeros(1000) for _ in range(100)]
+        report = profiler.report(5)
+        assert report['tracing'] and report['top']
+        assert sum(site['size_diff_kb'] for site in report['growth']) > 700
+    finally:
+        profiler.stop()
+    assert kept and not profiler.get_stats()['tracing']
+
+
+def test_month_of_cycles_keeps_memory_flat():
+    # Hourly cycles for a simulated month, pairs rotating daily, through
+    # process_trading_pair with in-process Binance, 3Commas and LLM clients
+    result = soak(cycles=720, interval=3600, churn_every=24, samples=8)
+    assert result['simulated_days'] == 30
+    assert result['decisions'] and result['llm_calls'] and result['bot_updates']
+    later = result['samples'][len(result['samples']) // 2:]
+    assert (later[-1]['traced_mb'] - later[0]['traced_mb']) * 1024 < 150
+    assert result['rss_growth_mb'] < 8
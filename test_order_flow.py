@@ -0,0 +1,113 @@
+import asyncio
+import random
+import pytest
+from src.order_flow import OrderBook, OrderFlowManager, TradeFlow
+
+
+def brute_force(trades, now, seconds):
+    window = [t for t in trades if t[0] > now - seconds]
+    buy = sum(q for _, _, q, side in window if side > 0)
+    sell = sum(q for _, _, q, side in window if side < 0)
+    notional = sum(p * q for _, p, q, _ in window)
+    return len(window), buy, sell, notional
+
+
+def test_rolling_windows_match_brute_force():
+    random.seed(7)
+    flow = TradeFlow(capacity=10000, windows=[5, 30])
+    trades = []
+    ts = 1000.0
+    for _ in range(2000):
+        ts += random.random() * 0.2
+        trade = (ts, 100 + random.gauss(0, 1), random.random(), random.choice((1, -1)))
+        trades.append(trade)
+        flow.append(*trade)
+
+    features = flow.get_features(ts)
+    for seconds in (5, 30):
+        count, buy, sell, notional = brute_force(trades, ts, seconds)
+        stats = features[f'{seconds}s']
+        assert stats['trades'] == count
+        assert stats['volume'] == pytest.approx(buy + sell)
+        assert stats['trade_imbalance'] == pytest.approx((buy - sell) / (buy + sell))
+        assert stats['vwap'] == pytest.approx(notional / (buy + sell))
+
+
+def test_ring_buffer_overwrite_evicts_from_windows():
+    flow = TradeFlow(capacity=4, windows=[1000])
+    for i in range(10):
+        flow.append(float(i), 100.0 + i, 1.0, 1)
+
+    stats = flow.get_features(9.0)['1000s']
+    assert len(flow) == 4
+    assert stats['trades'] == 4
+    assert stats['vwap'] == pytest.approx((106 + 107 + 108 + 109) / 4)
+
+
+def test_windows_expire_without_new_trades():
+    flow = TradeFlow(capacity=16, windows=[10])
+    flow.append(0.0, 100.0, 1.0, -1)
+
+    assert flow.get_features(5.0)['10s']['trade_imbalance'] == -1.0
+    assert flow.get_features(20.0)['10s'] == {
+        'volume': 0.0, 'trade_imbalance': None, 'vwap': None, 'trades': 0
+    }
+
+
+def test_order_book_features():
+    book = OrderBook(levels=2)
+    book.update(
+        bids=[['99.9', '3'], ['99.8', '1'], ['99.7', '50']],
+        asks=[['100.1', '1'], ['100.2', '1']],
+        ts=10.0
+    )
+
+    features = book.get_features(now=12.0)
+    assert features['mid_price'] == pytest.approx(100.0)
+    assert features['spread_bps'] == pytest.approx(20.0)
+    assert features['book_imbalance'] == pytest.approx((4 - 2) / 6)
+    assert features['book_age'] == pytest.approx(2.0)
+
+
+def test_manager_dispatches_combined_stream_messages():
+    manager = OrderFlowManager(['BTCUSDT'])
+    assert manager.get_features('BTCUSDT') is None
+
+    manager.handle_message({'stream': 'btcusdt@depth10@100ms', 'data': {
+        'bids': [['100', '2']], 'asks': [['101', '2']]
+    }})
+    manager.handle_message({'stream': 'btcusdt@aggTrade', 'data': {
+        'T': 1e15, 'p': '100.5', 'q': '2', 'm': True
+    }})
+    manager.handle_message({'stream': 'ethusdt@aggTrade', 'data': {
+        'T': 1e15, 'p': '1', 'q': '1', 'm': False
+    }})
+
+    features = manager.get_features('BTCUSDT')
+    assert features['book_imbalance'] == 0.0
+    assert features['windows']['60s']['trade_imbalance'] == -1.0
+    assert 'ETHUSDT' not in manager.trackers
+
+
+def test_manager_started_without_symbols_streams_once_assigned(monkeypatch):
+    manager = OrderFlowManager([])
+    subscribed = []
+
+    async def run():
+        subscribed.append(manager._streams())
+        await asyncio.Event().wait()
+    monkeypatch.setattr(manager, '_run', run)
+
+    async def main():
+        manager.start()
+        assert manager._task is None
+        manager.set_symbols(['BTCUSDT'])
+        await asyncio.sleep(0)
+        manager.set_symbols([])
+        assert manager._task is None
+        manager.set_symbols(['ETHUSDT'])
+        await asyncio.sleep(0)
+        await manager.stop()
+
+    asyncio.run(main())
+    assert [streams[0] for streams in subscribed] == ['btcusdt@aggTrade', 'ethusdt@aggTrade']
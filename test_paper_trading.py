@@ -0,0 +1,76 @@
+import asyncio
+import numpy as np
+import pytest
+from src.bot_manager import LADDER_DEFAULTS
+from src.dca_simulator import STOP_LOSS, TAKE_PROFIT, ladder_matrix, simulate_ladders
+from src.paper_trading import PaperBotManager, PaperEngine
+
+LADDER = dict(LADDER_DEFAULTS, base_order_volume=10, safety_order_volume=10,
+              max_safety_orders=3, take_profit=1.5, stop_loss_percentage=8)
+
+
+def test_deals_match_the_vectorized_simulator():
+    rng = np.random.default_rng(3)
+    engine = PaperEngine(fee_rate=0)
+    configs = [dict(LADDER, safety_order_step_percentage=step, take_profit=tp)
+               for step in (0.5, 1.0, 2.0) for tp in (0.5, 1.0, 3.0)]
+    rows = [engine.add_bot('BTCUSDT', config) for config in configs]
+
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, 500)))
+    expected = simulate_ladders(prices, ladder_matrix(configs))
+    engine.replay('BTCUSDT', prices)
+
+    for row, reason, pnl, fills in zip(rows, expected['exit_reason'], expected['pnl'], expected['fills']):
+        first = engine.history[row][0] if engine.history[row] else None
+        if reason == TAKE_PROFIT:
+            assert first['close_reason'] == 'take_profit'
+            assert first['final_profit'] == pytest.approx(pnl)
+            assert first['completed_safety_orders_count'] == fills
+        elif reason == STOP_LOSS:
+            # Paper stop losses fill at the tick price, not the exact level
+            assert first['close_reason'] == 'stop_loss'
+            assert first['final_profit'] <= pnl + 1e-9
+
+
+def test_manager_interface_and_stats():
+    manager = PaperBotManager(PaperEngine(fee_rate=0))
+
+    async def run():
+        bot = await manager.create_bot('ETHUSDT')
+        assert manager.active_bots['ETHUSDT'] == bot['id']
+        assert await manager.update_bot_settings(bot['id'], LADDER)
+        assert manager.get_ladder(bot['id'])['take_profit'] == 1.5
+
+        manager.engine.replay('ETHUSDT', [100, 99, 101.6, 100])
+        deals = await manager.get_bot_deals(bot['id'])
+        stats = await manager.get_bot_stats(bot['id'])
+        assert deals[0]['close_reason'] == 'take_profit'
+        assert stats['profits_in_usd']['today_usd_profit'] == pytest.approx(deals[0]['final_profit'])
+        assert await manager.get_active_deals_count() == 1  # a new deal opened at 100
+
+        manager.on_price('ETHUSDT', 90)
+        assert await manager.panic_sell_bot(bot['id'])
+        assert (await manager.get_bot_deals(bot['id']))[0]['close_reason'] == 'panic_sell'
+        assert await manager.get_active_deals_count() == 0
+        # Stopped bots don't open new deals
+        manager.on_price('ETHUSDT', 95)
+        assert await manager.get_active_deals_count() == 0
+        assert not await manager.update_bot_settings(999, LADDER)
+
+    asyncio.run(run())
+
+
+def test_many_bots_share_each_tick():
+    engine = PaperEngine(fee_rate=0.001)
+    for i in range(2000):
+        engine.add_bot('BTCUSDT' if i % 2 else 'ETHUSDT',
+                       dict(LADDER, safety_order_step_percentage=0.5 + i % 7 * 0.25))
+    rng = np.random.default_rng(4)
+    for price in 100 * np.exp(np.cumsum(rng.normal(0, 0.003, 1000))):
+        engine.on_price('BTCUSDT', float(price))
+        engine.on_price('ETHUSDT', float(price) * 0.05)
+
+    assert engine.ticks == 2000
+    assert engine.completed[:engine.count].sum() > 0
+    fees = sum(deal['fees'] for history in engine.history for deal in history)
+    assert fees > 0
@@ -0,0 +1,80 @@
+import asyncio
+from src.pipeline import TradingPipeline
+
+
+def test_slow_stage_does_not_block_fast_pairs():
+    """A slow analysis for one pair must not hold up the others"""
+    async def run():
+        finished = []
+
+        async def fetch(item):
+            return item
+
+        async def analyze(item):
+            if item['pair'] == 'SLOWUSDT':
+                await asyncio.sleep(0.5)
+            return item
+
+        async def report(item):
+            finished.append(item['pair'])
+            return item
+
+        pipeline = TradingPipeline()
+        pipeline.add_stage('market_data', fetch, workers=2)
+        pipeline.add_stage('analysis', analyze, workers=2)
+        pipeline.add_stage('status', report)
+        pipeline.start()
+
+        for pair in ('SLOWUSDT', 'BTCUSDT', 'ETHUSDT'):
+            assert await pipeline.submit(pair)
+
+        # Resubmitting an in-flight pair is refused
+        assert not await pipeline.submit('SLOWUSDT')
+
+        await asyncio.sleep(0.1)
+        assert finished == ['BTCUSDT', 'ETHUSDT']
+
+        await pipeline.join()
+        stats = pipeline.get_stats()
+        await pipeline.stop()
+        return finished, stats, pipeline
+
+    finished, stats, pipeline = asyncio.run(run())
+    assert finished[-1] == 'SLOWUSDT'
+    assert stats['analysis']['processed'] == 3
+    assert stats['analysis']['max_service_time'] >= 0.5
+    assert stats['status']['queue_depth'] == 0
+    assert not pipeline.in_flight
+
+
+def test_dropped_and_failed_items_complete():
+    """Items dropped or failing mid-pipeline are no longer in flight"""
+    async def run():
+        async def fetch(item):
+            if item['pair'] == 'BADUSDT':
+                raise RuntimeError('boom')
+            if item['pair'] == 'NODATA':
+                return None
+            return item
+
+        async def analyze(item):
+            return item
+
+        pipeline = TradingPipeline()
+        pipeline.add_stage('market_data', fetch)
+        pipeline.add_stage('analysis', analyze)
+        pipeline.start()
+        for pair in ('BADUSDT', 'NODATA', 'BTCUSDT'):
+            await pipeline.submit(pair)
+        await pipeline.join()
+        stats = pipeline.get_stats()
+        await pipeline.stop()
+        return stats, pipeline
+
+    stats, pipeline = asyncio.run(run())
+    assert stats['market_data']['errors'] == 1
+    assert stats['market_data']['dropped'] == 1
+    # Dropped items did not complete the stage
+    assert stats['market_data']['processed'] == 1
+    assert stats['analysis']['processed'] == 1
+    assert set(pipeline.last_latency) == {'BADUSDT', 'NODATA', 'BTCUSDT'}
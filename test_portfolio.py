@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from config.config import Config
+from src.bot_manager import LADDER_DEFAULTS
+from src.dca_simulator import capital_multiplier
+from src.portfolio import IncrementalCovariance, PortfolioAllocator
+
+
+def ewma_covariance(returns, alpha):
+    """Reference: the same EWMA recursion over the full history"""
+    mean = np.zeros(returns.shape[1])
+    cov = np.zeros((returns.shape[1],) * 2)
+    for r in returns:
+        diff = r - mean
+        mean = mean + alpha * diff
+        cov = (1 - alpha) * (cov + alpha * np.outer(diff, diff))
+    return cov
+
+
+def test_incremental_covariance_matches_reference():
+    rng = np.random.default_rng(1)
+    pairs = [f'P{i}USDT' for i in range(20)]
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (200, len(pairs))), axis=0))
+    estimator = IncrementalCovariance(halflife=50)
+    for row in prices:
+        estimator.update(dict(zip(pairs, row)))
+
+    expected = ewma_covariance(np.diff(np.log(prices), axis=0), estimator.alpha)
+    assert np.allclose(estimator.get(pairs), expected)
+    assert estimator.warm(pairs)
+
+
+def test_covariance_state_round_trip():
+    estimator = IncrementalCovariance(halflife=10)
+    for price in (100, 101, 99, 102):
+        estimator.update({'BTCUSDT': price, 'ETHUSDT': price / 20})
+
+    restored = IncrementalCovariance(halflife=10)
+    restored.restore_state(estimator.get_state())
+    assert np.allclose(restored.get(['BTCUSDT', 'ETHUSDT']), estimator.get(['BTCUSDT', 'ETHUSDT']))
+    assert restored.last_price == estimator.last_price
+
+
+def candidate(allocator, pair, confidence, volatility, stop_loss=1.0):
+    allocator.observe_analysis(
+        pair, {'current_price': 1.0, 'volatility': volatility},
+        {'should_trade': True, 'average_confidence': confidence, 'stop_loss': stop_loss}
+    )
+
+
+def test_allocation_respects_limits(monkeypatch):
+    monkeypatch.setattr(Config, 'MAX_CONCURRENT_TRADES', 2)
+    monkeypatch.setattr(Config, 'MAX_DAILY_LOSS', 1.0)
+    monkeypatch.setattr(Config, 'LADDER_MAX_CAPITAL', 1000)
+    monkeypatch.setattr(Config, 'MIN_ORDER_VOLUME', 1)
+    allocator = PortfolioAllocator()
+    candidate(allocator, 'BTCUSDT', 90, 0.5)
+    candidate(allocator, 'ETHUSDT', 80, 1.0)
+    candidate(allocator, 'XRPUSDT', 76, 0.2)
+    allocator.observe_analysis('SOLUSDT', {'current_price': 1.0}, {'should_trade': False})
+
+    multiplier = capital_multiplier(LADDER_DEFAULTS)
+    allocation = allocator.allocate(multiplier)
+
+    # Only the two most confident pairs get capital
+    assert set(allocation) == {'BTCUSDT', 'ETHUSDT'}
+    # Lower volatility and higher confidence get the larger share
+    assert allocation['BTCUSDT']['risk_share'] > allocation['ETHUSDT']['risk_share']
+    # Losing every selected ladder at its stop stays within the daily budget
+    worst_loss = sum(a['capital'] * 0.01 for a in allocation.values())
+    assert worst_loss <= Config.MAX_DAILY_LOSS + 0.01
+
+    # Realized losses today shrink what is left to risk
+    reduced = allocator.allocate(multiplier, daily_pnl=-0.5)
+    assert reduced['BTCUSDT']['capital'] == pytest.approx(allocation['BTCUSDT']['capital'] / 2, rel=0.01)
+    assert allocator.allocate(multiplier, daily_pnl=-1.0) == {}
+
+
+def test_correlated_pairs_share_risk(monkeypatch):
+    monkeypatch.setattr(Config, 'PORTFOLIO_MIN_OBSERVATIONS', 5)
+    rng = np.random.default_rng(2)
+    allocator = PortfolioAllocator(IncrementalCovariance(halflife=100))
+    common = np.cumsum(rng.normal(0, 0.01, 300))
+    independent = np.cumsum(rng.normal(0, 0.01, 300))
+    for a, b in zip(common, independent):
+        for pair, price in (('BTCUSDT', a), ('WBTCUSDT', a + rng.normal(0, 1e-4)), ('XRPUSDT', b)):
+            allocator.observe_price(pair, 100 * np.exp(price))
+        allocator.step()
+    for pair in ('BTCUSDT', 'WBTCUSDT', 'XRPUSDT'):
+        candidate(allocator, pair, 80, 1.0)
+
+    monkeypatch.setattr(Config, 'LADDER_MAX_CAPITAL', 1e9)
+    monkeypatch.setattr(Config, 'MIN_ORDER_VOLUME', 0)
+    allocation = allocator.allocate(1.0)
+
+    # The two near-identical pairs together get about what XRP gets alone
+    together = allocation['BTCUSDT']['risk_share'] + allocation['WBTCUSDT']['risk_share']
+    assert together == pytest.approx(allocation['XRPUSDT']['risk_share'], rel=0.25)
@@ -0,0 +1,96 @@
+from decimal import Decimal, ROUND_DOWN
+import numpy as np
+import pytest
+from src.utils import precision
+from src.utils.precision import (
+    MIN_NOTIONAL, MIN_QTY, PRICE_RANGE, UNKNOWN_SYMBOL,
+    PrecisionTable, describe_flags, get_precision_table
+)
+from src.utils.trading_utils import calculate_order_quantity
+
+EXCHANGE_INFO = {'symbols': [
+    {'symbol': 'BTCUSDT', 'filters': [
+        {'filterType': 'PRICE_FILTER', 'minPrice': '0.01000000',
+         'maxPrice': '1000000.00000000', 'tickSize': '0.01000000'},
+        {'filterType': 'LOT_SIZE', 'minQty': '0.00001000',
+         'maxQty': '9000.00000000', 'stepSize': '0.00001000'},
+        {'filterType': 'NOTIONAL', 'minNotional': '5.00000000'}
+    ]},
+    {'symbol': 'SHIBUSDT', 'filters': [
+        {'filterType': 'PRICE_FILTER', 'minPrice': '0.00000001',
+         'maxPrice': '1.00000000', 'tickSize': '0.00000001'},
+        {'filterType': 'LOT_SIZE', 'minQty': '1.00',
+         'maxQty': '92141578.00', 'stepSize': '1.00'},
+        {'filterType': 'MIN_NOTIONAL', 'minNotional': '5.00000000'}
+    ]},
+    {'symbol': 'XRPUSDT', 'filters': [
+        {'filterType': 'PRICE_FILTER', 'minPrice': '0.00010000',
+         'maxPrice': '10000.00000000', 'tickSize': '0.00010000'},
+        {'filterType': 'LOT_SIZE', 'minQty': '0.10000000',
+         'maxQty': '9222449.00000000', 'stepSize': '0.10000000'}
+    ]}
+]}
+
+
+def decimal_floor(value, step):
+    return float((Decimal(repr(value)) / Decimal(step)).to_integral_value(ROUND_DOWN) * Decimal(step))
+
+
+def test_rounding_matches_decimal():
+    table = PrecisionTable.from_exchange_info(EXCHANGE_INFO)
+    rng = np.random.default_rng(5)
+    for symbol, tick, step, scale in (('BTCUSDT', '0.01', '0.00001', 60000),
+                                      ('SHIBUSDT', '0.00000001', '1', 0.00002),
+                                      ('XRPUSDT', '0.0001', '0.1', 0.5)):
+        for value in rng.uniform(0.5, 2, 200) * scale:
+            value = float(value)
+            assert table.round_price(symbol, value) == decimal_floor(value, tick)
+            assert table.round_quantity(symbol, value) == decimal_floor(value, step)
+
+
+def test_float_noise_is_absorbed():
+    table = PrecisionTable.from_exchange_info(EXCHANGE_INFO)
+
+    assert table.round_quantity('XRPUSDT', 0.1 + 0.2) == 0.3
+    assert table.round_price('BTCUSDT', 1.005 * 1000) == 1005.0
+    assert table.round_price('BTCUSDT', 100.001, up=True) == 100.01
+    assert table.format_price('SHIBUSDT', 0.00001234) == '0.00001234'
+    assert table.format_quantity('BTCUSDT', 0.5) == '0.50000'
+
+
+def test_validate_orders_in_bulk():
+    table = PrecisionTable.from_exchange_info(EXCHANGE_INFO)
+    result = table.validate_orders(
+        ['BTCUSDT', 'BTCUSDT', 'SHIBUSDT', 'XRPUSDT', 'DOGEUSDT'],
+        [60000.129, 60000.0, 0.00002, 0.00005, 1.0],
+        [0.000123456, 0.00005, 100000.9, 10, 1]
+    )
+
+    assert result['price'].tolist()[:2] == [60000.12, 60000.0]
+    assert result['quantity'].tolist()[:3] == [0.00012, 0.00005, 100000.0]
+    assert result['valid'].tolist() == [True, False, False, False, False]
+    assert result['flags'][1] == MIN_NOTIONAL
+    assert result['flags'][2] == MIN_NOTIONAL
+    assert result['flags'][3] == PRICE_RANGE
+    assert result['flags'][4] == UNKNOWN_SYMBOL
+    assert describe_flags(MIN_QTY | MIN_NOTIONAL) == ['quantity below minimum', 'notional below minimum']
+
+
+def test_table_is_cached_in_memory_and_on_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(precision, '_table', None)
+    cache = tmp_path / 'filters.json'
+
+    assert get_precision_table(cache_path=cache) is None
+    table = get_precision_table(EXCHANGE_INFO, cache_path=cache)
+    assert get_precision_table(cache_path=cache) is table
+
+    monkeypatch.setattr(precision, '_table', None)
+    reloaded = get_precision_table(cache_path=cache)
+    assert reloaded is not table
+    assert reloaded.get_min_notional('BTCUSDT') == 5.0
+    assert reloaded.get_min_notional('XRPUSDT') == 0.0
+
+
+def test_calculate_order_quantity_unchanged():
+    assert calculate_order_quantity(60000, 5, decimals=5) == Decimal('0.00008')
+    assert calculate_order_quantity(3, 10) == Decimal('3.33333333')
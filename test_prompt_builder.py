@@ -0,0 +1,87 @@
+from config.config import Config
+from src.prompt_builder import PromptBuilder, count_tokens
+
+SNAPSHOT = {
+    'symbol': 'BTCUSDT',
+    'current_price': 50000.0,
+    'price_change_24h': 2.5,
+    'volume_24h': 1234567890.0,
+    'trend': 'bullish',
+    'volatility': 0.42,
+    'indicators': {'rsi_14': 55.25, 'price_vs_sma': 1.2}
+}
+
+TIMEFRAMES = {
+    '4h': {'trend': 'bullish', 'rsi_14': 61.0, 'price_vs_sma': 2.4},
+    '1d': {'trend': 'neutral', 'rsi_14': 52.5, 'price_vs_sma': 0.3}
+}
+
+
+def test_system_block_is_shared_across_pairs():
+    builder = PromptBuilder()
+    btc = builder.build(SNAPSHOT)
+    eth = builder.build(dict(SNAPSHOT, symbol='ETHUSDT', current_price=3000.0))
+
+    assert btc.system == eth.system
+    assert btc.user != eth.user
+    assert btc.digest != eth.digest
+    assert builder.build(SNAPSHOT).digest == btc.digest
+
+
+def test_data_section_is_compact():
+    prompt = PromptBuilder().build(SNAPSHOT)
+
+    assert prompt.user == (
+        'BTCUSDT px=50000 chg24h=2.5 vol24h=1.23e+09 trend=bullish '
+        'volat=0.42 rsi=55.25 vs_sma=1.2'
+    )
+    assert prompt.sections == ['market']
+    assert prompt.max_tokens == Config.AI_MAX_OUTPUT_TOKENS
+    assert prompt.input_tokens == count_tokens(prompt.system) + count_tokens(prompt.user)
+
+
+def test_timeframes_included_within_budget():
+    prompt = PromptBuilder(token_budget=1000).build(dict(SNAPSHOT, timeframes=TIMEFRAMES))
+
+    assert prompt.sections == ['market', 'timeframes']
+    assert 'tf 4h: trend=bullish rsi=61 vs_sma=2.4' in prompt.user
+    assert 'tf 1d: trend=neutral rsi=52.5 vs_sma=0.3' in prompt.user
+
+
+def test_optional_context_dropped_over_budget():
+    builder = PromptBuilder()
+    full = builder.build(dict(SNAPSHOT, timeframes=TIMEFRAMES))
+    tight = PromptBuilder(token_budget=full.input_tokens - 1).build(
+        dict(SNAPSHOT, timeframes=TIMEFRAMES)
+    )
+
+    assert tight.sections == ['market']
+    assert 'tf ' not in tight.user
+    assert tight.input_tokens < full.input_tokens
+
+    # Market data is always kept, even if it alone exceeds the budget
+    assert PromptBuilder(token_budget=1).build(SNAPSHOT).sections == ['market']
+
+
+def test_provider_payloads(monkeypatch):
+    prompt = PromptBuilder().build(SNAPSHOT)
+
+    assert prompt.openai_messages() == [
+        {'role': 'system', 'content': prompt.system},
+        {'role': 'user', 'content': prompt.user}
+    ]
+    monkeypatch.setattr(Config, 'AI_PROMPT_CACHING', True)
+    # Too short to be cached: no marker that would never take effect
+    assert prompt.system_tokens < Config.AI_PROMPT_CACHE_MIN_TOKENS
+    assert prompt.anthropic_system() == prompt.system
+    monkeypatch.setattr(Config, 'AI_PROMPT_CACHE_MIN_TOKENS', prompt.system_tokens)
+    system = prompt.anthropic_system()
+    assert system[0]['text'] == prompt.system
+    assert system[0]['cache_control'] == {'type': 'ephemeral'}
+    monkeypatch.setattr(Config, 'AI_PROMPT_CACHING', False)
+    assert prompt.anthropic_system() == prompt.system
+
+
+def test_output_format_follows_structured_setting():
+    assert '"decision"' in PromptBuilder(structured=True).system
+    assert 'DECISION: [BUY/SELL/HOLD]' in PromptBuilder(structured=False).system
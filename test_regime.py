@@ -0,0 +1,95 @@
+import asyncio
+import numpy as np
+import pytest
+from config.config import Config
+from src.bot_manager import BotManager
+from src.regime import RANGING, TRENDING, VOLATILE, RegimeClassifier, get_policy
+
+HOUR = 3_600_000
+
+
+def candles(closes, start=0):
+    # The last candle is the open one and is ignored by the classifier
+    return [[start + i * HOUR, c, c, c, c, 1.0] for i, c in enumerate(list(closes) + [closes[-1]])]
+
+
+def path(seed, drift, vol, n=200):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(drift, vol, n)))
+
+
+def test_classifies_synthetic_markets():
+    classifier = RegimeClassifier(min_dwell=1)
+    assert classifier.update('RANGE', candles(path(1, 0.0, 0.003)))['regime'] == RANGING
+    assert classifier.update('TREND', candles(path(2, 0.004, 0.003)))['regime'] == TRENDING
+
+    calm_then_wild = np.concatenate([path(3, 0.0, 0.002, 150), path(4, 0.0, 0.02, 20) * 1.0])
+    assert classifier.update('WILD', candles(calm_then_wild))['regime'] == VOLATILE
+
+
+def test_incremental_updates_match_one_batch():
+    closes = path(5, 0.001, 0.005, 100)
+    batch, incremental = RegimeClassifier(), RegimeClassifier()
+    batch.update('BTCUSDT', candles(closes))
+    # A rolling 24-candle window, one new candle at a time
+    for end in range(24, 101):
+        incremental.update('BTCUSDT', candles(closes[:end])[-25:])
+
+    assert incremental.states['BTCUSDT'].observations == 99
+    assert incremental.get('BTCUSDT')['volatility'] == pytest.approx(batch.get('BTCUSDT')['volatility'])
+    assert incremental.get('BTCUSDT')['trend'] == pytest.approx(batch.get('BTCUSDT')['trend'])
+
+
+def test_state_survives_snapshot_file(tmp_path):
+    from src.state_store import StateStore
+    closes = path(6, 0.001, 0.005, 60)
+    classifier = RegimeClassifier(min_dwell=1)
+    classifier.update('BTCUSDT', candles(closes[:40])[-25:])
+
+    store = StateStore(tmp_path / 'state.bin')
+    assert store.save({'regime': classifier.get_state()})
+    restored = RegimeClassifier(min_dwell=1)
+    restored.restore_state(store.load()['regime'])
+    assert isinstance(restored.states['BTCUSDT'].last_time, float)
+
+    classifier.update('BTCUSDT', candles(closes[:45])[-25:])
+    assert restored.update('BTCUSDT', candles(closes[:45])[-25:]) == classifier.get('BTCUSDT')
+    assert restored.states['BTCUSDT'].observations == classifier.states['BTCUSDT'].observations
+
+
+def test_regime_switch_needs_min_dwell():
+    classifier = RegimeClassifier(min_dwell=3)
+    closes = list(path(6, 0.0, 0.002, 100))
+    classifier.update('BTCUSDT', candles(closes))
+    assert classifier.get('BTCUSDT')['regime'] == RANGING
+
+    seen = []
+    for i in range(4):
+        closes.append(closes[-1] * (1.06 if i % 2 else 0.94))
+        seen.append(classifier.update('BTCUSDT', candles(closes)[-25:])['regime'])
+    assert seen == [RANGING, RANGING, VOLATILE, VOLATILE]
+
+    restored = RegimeClassifier()
+    restored.restore_state(classifier.get_state())
+    assert restored.get('BTCUSDT') == classifier.get('BTCUSDT')
+
+
+def test_policy_ladder_preset_is_applied(monkeypatch):
+    monkeypatch.setattr(Config, 'REGIME_ENABLED', True)
+    manager = BotManager()
+    sent = []
+
+    async def update(bot_id, settings):
+        sent.append(settings)
+        return True
+
+    monkeypatch.setattr(manager, 'update_bot_settings', update)
+    recommendations = {'should_trade': True, 'take_profit': 2.0, 'stop_loss': 1.0,
+                       'average_confidence': 90}
+    ladder = get_policy(VOLATILE)['ladder']
+    assert asyncio.run(manager.apply_ai_recommendations(1, recommendations, ladder=ladder))
+
+    assert sent[0]['safety_order_step_percentage'] == ladder['safety_order_step_percentage']
+    assert sent[0]['max_safety_orders'] == 1  # the preset caps the confidence-based value
+    monkeypatch.setattr(Config, 'REGIME_ENABLED', False)
+    assert get_policy(VOLATILE) == {}
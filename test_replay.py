@@ -0,0 +1,118 @@
+import asyncio
+from types import SimpleNamespace as NS
+import numpy as np
+import pytest
+from config.config import Config
+from src.ai_analyzer import AIAnalyzer
+from src.decision_log import DecisionRecorder, load_records
+from src.replay import compare, run_replay, simulate_returns
+
+BUY = '{"decision": "BUY", "confidence": 80, "stop_loss": 1, "take_profit": 2, "risk": 3}'
+
+
+def snapshot(price, hour):
+    return {'symbol': 'BTCUSDT', 'current_price': price, 'price_change_24h': 1.0,
+            'volume_24h': 1e9, 'high_24h': price * 1.01, 'low_24h': price * 0.99,
+            'trend': 'bullish', 'volatility': 0.4, 'timestamp': f'2024-01-01T{hour:02d}:00:00',
+            'indicators': {'rsi_14': 55.0, 'sma_20': price, 'price_vs_sma': 0.5}}
+
+
+def fake_clients(analyzer):
+    async def gpt_create(**kwargs):
+        return NS(choices=[NS(message=NS(content=BUY))])
+
+    async def claude_create(**kwargs):
+        return NS(content=[NS(type='tool_use', input={'decision': 'BUY', 'confidence': 80,
+                                                       'stop_loss': 1, 'take_profit': 2, 'risk': 3})])
+
+    analyzer._openai_client = NS(chat=NS(completions=NS(create=gpt_create)))
+    analyzer._claude_client = NS(messages=NS(create=claude_create))
+
+
+def test_decision_log_round_trip_skips_torn_block(tmp_path):
+    path = tmp_path / 'decisions.log'
+    recorder = DecisionRecorder(path, block_size=2)
+    for i in range(5):
+        recorder.add({'i': i})
+    recorder.close()
+    with open(path, 'ab') as f:
+        f.write(b'CTBD\x01\x00')  # a block cut short by a crash
+
+    assert [r['i'] for r in load_records(path)] == [0, 1, 2, 3, 4]
+
+
+def test_analyzer_records_raw_responses(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'AI_STREAMING', False)
+    analyzer = AIAnalyzer()
+    fake_clients(analyzer)
+    analyzer.recorder = DecisionRecorder(tmp_path / 'decisions.log')
+
+    async def run():
+        # Two pairs at once must not mix up their responses
+        return await asyncio.gather(*(analyzer.analyze_market(snapshot(p, 0)) for p in (100.0, 200.0)))
+
+    asyncio.run(run())
+    analyzer.recorder.close()
+    records = load_records(tmp_path / 'decisions.log')
+
+    assert [r['market_data']['current_price'] for r in records] == [100.0, 200.0]
+    assert records[0]['responses']['gpt'] == {'raw': BUY, 'source': 'gpt'}
+    assert records[0]['responses']['claude']['raw']['decision'] == 'BUY'
+    assert records[0]['analysis']['should_trade'] and 'gpt_analysis' not in records[0]['analysis']
+    assert records[0]['digest'] != records[1]['digest']
+
+
+def test_replay_compares_versions_on_cached_responses(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'AI_STREAMING', False)
+    analyzer = AIAnalyzer()
+    fake_clients(analyzer)
+    analyzer.recorder = DecisionRecorder(tmp_path / 'decisions.log')
+    # Price rises 1% an hour: entries reach their 2% take profit two hours
+    # later, except the second to last (marked at +1%) and the last (no exit)
+    for hour in range(8):
+        asyncio.run(analyzer.analyze_market(snapshot(100.0 * 1.01 ** hour, hour)))
+    analyzer.recorder.close()
+
+    # Re-stamp record times one hour apart for the PnL simulation
+    path = tmp_path / 'decisions.log'
+    recorded = load_records(path)
+    stamped = DecisionRecorder(tmp_path / 'stamped.log')
+    for i, record in enumerate(recorded):
+        stamped.add(dict(record, time=3600.0 * i))
+    stamped.close()
+
+    report = run_replay(tmp_path / 'stamped.log', {
+        'same': {},
+        'strict': {'config': {'MIN_CONFIDENCE_THRESHOLD': 85}}
+    }, horizon=4 * 3600)
+    versions = report['versions']
+
+    assert report['records'] == 8
+    assert versions['recorded']['trades'] == 8 and versions['recorded']['simulated_trades'] == 7
+    assert versions['recorded']['pnl_usd'] == pytest.approx((6 * 2 + 1) / 100 * Config.BASE_TRADE_AMOUNT)
+    assert versions['same']['calls'] == {'cached': 16, 'missed': 0, 'live': 0}
+    assert versions['same']['vs_recorded']['agreement'] == 1.0
+    assert versions['same']['vs_recorded']['pnl_diff_usd'] == 0.0
+    strict = versions['strict']['vs_recorded']
+    assert versions['strict']['trades'] == 0 and strict['skipped'] == 8 and strict['agreement'] == 0.0
+    assert strict['confidence_shift'] == 0.0
+    assert strict['pnl_diff_usd'] == pytest.approx(-versions['recorded']['pnl_usd'])
+
+
+def test_simulated_exits_and_comparison():
+    records = [{'symbol': 'ETHUSDT', 'time': t, 'market_data': {'current_price': p}}
+               for t, p in enumerate([100.0, 99.5, 98.9, 100.5, 101.0])]
+    trade = {'should_trade': True, 'direction': 'BUY', 'confidence': 80.0,
+             'take_profit': 1.0, 'stop_loss': 1.0}
+    hold = dict(trade, should_trade=False, direction='HOLD', confidence=40.0)
+
+    returns = simulate_returns(records, [trade, trade, None, hold, trade], horizon=10)
+    assert returns[0] == pytest.approx(-1.0)  # stop loss at 98.9 before the recovery
+    assert returns[1] == pytest.approx(1.0)  # take profit at 100.5
+    assert np.isnan(returns[2:]).all()  # no decision, no trade, no later price to exit on
+    # Neither level within the horizon: marked at the last price
+    assert simulate_returns(records, [trade] + [None] * 4, horizon=1)[0] == pytest.approx(-0.5)
+
+    diff = compare([trade, trade, None], [hold, trade, trade])
+    assert diff['compared'] == 2 and diff['agreement'] == 0.5
+    assert diff['skipped'] == 1 and diff['confidence_shift'] == pytest.approx(-20.0)
@@ -0,0 +1,129 @@
+import asyncio
+import time
+import pytest
+from config.config import Config
+from src.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilienceManager,
+    RetryPolicy
+)
+
+
+def make_manager(**kwargs) -> ResilienceManager:
+    return ResilienceManager(
+        retry_policy=RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.002),
+        **kwargs
+    )
+
+
+def test_retries_idempotent_calls_until_success():
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError('reset')
+        return 'ok'
+
+    manager = make_manager()
+    result = asyncio.run(manager.call('test.read', flaky, idempotent=True, hedge_delay=0))
+    assert result == 'ok'
+    assert len(calls) == 3
+
+
+def test_non_idempotent_calls_are_not_retried():
+    calls = []
+
+    async def create():
+        calls.append(1)
+        raise ConnectionError('reset')
+
+    manager = make_manager()
+    with pytest.raises(ConnectionError):
+        asyncio.run(manager.call('test.create', create))
+    assert len(calls) == 1
+
+
+def test_open_circuit_fails_fast():
+    async def slow_failure():
+        await asyncio.sleep(0.05)
+        raise TimeoutError('upstream timeout')
+
+    manager = make_manager(failure_threshold=2, reset_timeout=60)
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(TimeoutError):
+                await manager.call('test.down', slow_failure)
+        started = time.perf_counter()
+        with pytest.raises(CircuitOpenError):
+            await manager.call('test.down', slow_failure)
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(run())
+    assert elapsed < 0.01
+    state = manager.get_breaker_states()['test.down']
+    assert state['state'] == CircuitBreaker.OPEN
+    assert state['total_rejected'] == 1
+
+
+def test_half_open_trial_closes_circuit():
+    breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=0)
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # Reset timeout has passed: exactly one trial call goes through
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_hedged_request_returns_first_result():
+    calls = []
+
+    async def read():
+        calls.append(1)
+        # The first request stalls, the hedge answers quickly
+        await asyncio.sleep(1.0 if len(calls) == 1 else 0.01)
+        return len(calls)
+
+    manager = make_manager()
+
+    async def run():
+        started = time.perf_counter()
+        result = await manager.call('test.hedge', read, idempotent=True, hedge_delay=0.02)
+        return result, time.perf_counter() - started
+
+    result, elapsed = asyncio.run(run())
+    assert result == 2
+    assert elapsed < 0.5
+
+
+def test_only_reads_are_hedged(monkeypatch):
+    from src.bot_manager import BotManager
+    monkeypatch.setattr(Config, 'HEDGE_DELAY', 0.01)
+    calls = []
+
+    class SlowThreeCommas:
+        def request(self, entity, action, action_id=None, payload=None):
+            calls.append(action)
+            time.sleep(0.1)
+            return None, {}
+
+    manager = BotManager()
+    manager._p3cw = SlowThreeCommas()
+    manager.resilience = make_manager()
+
+    async def run():
+        await manager.start_bot(1)
+        await manager.stop_bot(1)
+        await manager.get_bot_stats(1)
+
+    asyncio.run(run())
+    # Writes go out once; a slow read gets a hedge
+    assert calls.count('enable') == 1 and calls.count('disable') == 1
+    assert calls.count('stats') == 2
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import os
+import pytest
+from config.config import Config
+from src.runtime_config import RuntimeConfig, validate_overrides
+
+
+@pytest.fixture
+def runtime(tmp_path):
+    runtime = RuntimeConfig(tmp_path / 'runtime.json', poll_interval=0.01)
+    yield runtime
+    runtime.reset()
+
+
+def write(runtime, overrides, mtime):
+    runtime.path.write_text(json.dumps(overrides))
+    # Explicit mtimes so consecutive writes are always seen as changes
+    os.utime(runtime.path, ns=(mtime, mtime))
+
+
+def test_validation_rejects_whole_file():
+    assert validate_overrides({'UPDATE_INTERVAL': 60, 'TRADING_PAIRS': ['BTCUSDT']}) == []
+    problems = validate_overrides({
+        'UPDATE_INTERVAL': -1,
+        'MAX_CONCURRENT_TRADES': True,
+        'TRADING_PAIRS': ['btcusdt'],
+        'PIPELINE_WORKERS': {}
+    })
+    assert len(problems) == 4
+    assert validate_overrides([1, 2]) == ['runtime config must be a JSON object']
+
+
+def test_reload_applies_and_reverts(runtime):
+    default_interval = Config.UPDATE_INTERVAL
+    seen = []
+    runtime.add_listener(seen.append)
+
+    async def run():
+        assert await runtime.check() is None  # no file yet
+        write(runtime, {'UPDATE_INTERVAL': 7, 'TRADING_PAIRS': ['SOLUSDT']}, 1_000_000_000)
+        await runtime.check()
+        assert Config.UPDATE_INTERVAL == 7 and Config.TRADING_PAIRS == ['SOLUSDT']
+        assert runtime.version == 1
+
+        # Unchanged file: nothing is re-read
+        assert await runtime.check() is None
+
+        # An invalid file keeps the previous version in full
+        write(runtime, {'UPDATE_INTERVAL': 9, 'LADDER_CHECK_DAYS': 'seven'}, 2_000_000_000)
+        await runtime.check()
+        assert Config.UPDATE_INTERVAL == 7 and runtime.version == 1
+        assert 'LADDER_CHECK_DAYS' in runtime.get_stats()['last_error']
+
+        # Keys removed from the file go back to their defaults
+        write(runtime, {'TRADING_PAIRS': ['SOLUSDT']}, 3_000_000_000)
+        await runtime.check()
+        assert Config.UPDATE_INTERVAL == default_interval
+        assert runtime.version == 2
+
+    asyncio.run(run())
+    assert seen == [{'UPDATE_INTERVAL': 7, 'TRADING_PAIRS': ['SOLUSDT']},
+                    {'UPDATE_INTERVAL': default_interval}]
+
+
+def test_watcher_notifies_async_listeners(runtime):
+    changes = []
+
+    async def listener(change):
+        changes.append(change)
+
+    async def run():
+        runtime.add_listener(listener)
+        runtime.start()
+        write(runtime, {'GATE_ENABLED': False}, 1_000_000_000)
+        for _ in range(100):
+            if changes:
+                break
+            await asyncio.sleep(0.01)
+        await runtime.stop()
+
+    asyncio.run(run())
+    assert changes == [{'GATE_ENABLED': False}]
+
+
+def test_pair_removed_then_re_added_resumes_its_bot(monkeypatch):
+    from main import TradingBot
+    for key, value in {'EXECUTION_BACKEND': 'paper', 'ORDER_FLOW_ENABLED': False,
+                       'STATUS_ENABLED': False, 'RECORD_DECISIONS': False,
+                       'TRADING_PAIRS': ['BTCUSDT', 'ETHUSDT']}.items():
+        monkeypatch.setattr(Config, key, value)
+    bot = TradingBot()
+    engine = bot.bot_manager.engine
+
+    async def run():
+        await bot.set_pairs(['BTCUSDT', 'ETHUSDT'])
+        eth = bot.bot_manager.active_bots['ETHUSDT']
+        await bot._on_config_change({'TRADING_PAIRS': ['BTCUSDT']})
+        assert not engine.enabled[bot.bot_manager.rows[eth]]
+        await bot._on_config_change({'TRADING_PAIRS': ['BTCUSDT', 'ETHUSDT']})
+        assert bot.bot_manager.active_bots['ETHUSDT'] == eth
+        assert engine.enabled[bot.bot_manager.rows[eth]]
+
+        # A halted process keeps re-added bots stopped
+        await bot.halt('test')
+        await bot._on_config_change({'TRADING_PAIRS': ['BTCUSDT']})
+        await bot._on_config_change({'TRADING_PAIRS': ['BTCUSDT', 'ETHUSDT']})
+        assert not engine.enabled[bot.bot_manager.rows[eth]]
+
+    asyncio.run(run())
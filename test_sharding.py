@@ -0,0 +1,151 @@
+import asyncio
+from src.sharding import ConsistentHashRing, ShardCoordinator, ShardWorker, today
+
+PAIRS = [f'{base}USDT' for base in ('BTC', 'ETH', 'BNB', 'SOL', 'XRP', 'ADA', 'DOGE', 'DOT', 'LTC', 'LINK')]
+
+
+def test_ring_moves_only_the_removed_nodes_keys():
+    ring = ConsistentHashRing(virtual_nodes=64)
+    for node in ('w1', 'w2', 'w3'):
+        ring.add_node(node)
+    keys = [f'PAIR{i}' for i in range(300)]
+    before = {key: ring.get_node(key) for key in keys}
+    assert all(len(owned) > 50 for owned in ring.assign(keys).values())
+
+    ring.remove_node('w2')
+    after = {key: ring.get_node(key) for key in keys}
+    moved = [key for key in keys if before[key] != after[key]]
+    assert moved and all(before[key] == 'w2' for key in moved)
+    assert 'w2' not in after.values()
+
+
+class FakeWorker:
+    """Stands in for a TradingBot behind a ShardWorker"""
+
+    def __init__(self, worker_id: str, address: str, daily_pnl: float = 0.0):
+        self.pairs = []
+        self.halted = None
+        self.daily_pnl = daily_pnl
+        self.client = ShardWorker(
+            worker_id,
+            on_assign=self.on_assign,
+            on_halt=self.on_halt,
+            risk_provider=self.risk_report,
+            address=address,
+            heartbeat_interval=0.02
+        )
+
+    async def on_assign(self, pairs, bots):
+        self.pairs = pairs
+
+    async def on_halt(self, reason):
+        self.halted = reason
+
+    def risk_report(self):
+        return {'risk': {'date': today(), 'daily_pnl': self.daily_pnl}, 'bots': {}}
+
+
+async def wait_for(condition, timeout=2.0):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError('condition not met')
+
+
+def test_rebalances_when_a_worker_dies():
+    async def run():
+        coordinator = ShardCoordinator(PAIRS, address='127.0.0.1:0',
+                                       max_daily_loss=100, heartbeat_timeout=1)
+        await coordinator.start()
+        workers = [FakeWorker(f'w{i}', coordinator.address) for i in range(3)]
+        tasks = [asyncio.create_task(w.client.run()) for w in workers]
+
+        await wait_for(lambda: sorted(p for w in workers for p in w.pairs) == sorted(PAIRS))
+
+        # Kill one worker: the survivors pick up all of its pairs
+        workers[0].client.close()
+        await wait_for(lambda: sorted(p for w in workers[1:] for p in w.pairs) == sorted(PAIRS))
+
+        for task in tasks:
+            task.cancel()
+        await coordinator.stop()
+
+    asyncio.run(run())
+
+
+def test_global_daily_loss_halts_every_worker():
+    async def run():
+        coordinator = ShardCoordinator(PAIRS, address='127.0.0.1:0',
+                                       max_daily_loss=100, heartbeat_timeout=1)
+        await coordinator.start()
+        # Neither worker is over the limit alone, together they are
+        workers = [FakeWorker('w1', coordinator.address, daily_pnl=-60),
+                   FakeWorker('w2', coordinator.address, daily_pnl=-50)]
+        tasks = [asyncio.create_task(w.client.run()) for w in workers]
+
+        await wait_for(lambda: all(w.halted for w in workers))
+        assert coordinator.get_status()['halted']
+        assert coordinator.get_daily_pnl() == -110
+
+        for task in tasks:
+            task.cancel()
+        await coordinator.stop()
+
+    asyncio.run(run())
+
+
+def test_reassigned_pair_loss_is_counted_once():
+    coordinator = ShardCoordinator(PAIRS, address='127.0.0.1:0', max_daily_loss=100)
+
+    def heartbeat(pair_pnl):
+        return {'risk': {'date': today(), 'daily_pnl': sum(pair_pnl.values()),
+                         'pair_pnl': pair_pnl}}
+
+    async def run():
+        await coordinator._record_risk('w1', heartbeat({'BTCUSDT': -60, 'ETHUSDT': -10}))
+        # w1 died; w2 took over BTCUSDT and its bot, whose PnL includes w1's loss
+        await coordinator._record_risk('w2', heartbeat({'BTCUSDT': -65, 'SOLUSDT': -5}))
+
+    asyncio.run(run())
+    assert coordinator.get_daily_pnl() == -80
+    assert not coordinator.halted
+
+
+def paper_bot(monkeypatch):
+    from config.config import Config
+    from main import TradingBot
+    for key, value in {'EXECUTION_BACKEND': 'paper', 'ORDER_FLOW_ENABLED': False,
+                       'STATUS_ENABLED': False, 'RECORD_DECISIONS': False}.items():
+        monkeypatch.setattr(Config, key, value)
+    return TradingBot(pairs=[])
+
+
+def test_worker_pnl_refreshes_without_an_analysis(monkeypatch):
+    bot = paper_bot(monkeypatch)
+
+    async def no_data(pair):
+        return None
+    monkeypatch.setattr(bot.market_data, 'get_market_data', no_data)
+
+    async def run():
+        await bot.set_pairs(['BTCUSDT'])
+        row = bot.bot_manager.rows[bot.bot_manager.active_bots['BTCUSDT']]
+        bot.bot_manager.engine.profit_today[row] = -42.0
+        # Blocked before analysis; the PnL is still picked up
+        await bot.process_trading_pair('BTCUSDT')
+
+    asyncio.run(run())
+    assert bot.get_risk_report()['risk']['pair_pnl'] == {'BTCUSDT': -42.0}
+
+
+def test_halted_worker_creates_no_bots(monkeypatch):
+    bot = paper_bot(monkeypatch)
+
+    async def run():
+        await bot.set_pairs(['BTCUSDT'])
+        await bot.halt('daily loss limit reached')
+        await bot.set_pairs(['BTCUSDT', 'ETHUSDT'], known_bots={})
+
+    asyncio.run(run())
+    assert list(bot.bot_manager.active_bots) == ['BTCUSDT']
@@ -0,0 +1,65 @@
+import random
+import time
+from src.signal_gate import SignalGate, agreement_report
+
+QUIET = {
+    'current_price': 50000, 'price_change_24h': 0.3, 'trend': 'neutral', 'volatility': 0.2,
+    'indicators': {'rsi_14': 51.0, 'price_vs_sma': 0.1}
+}
+ACTIVE = {
+    'current_price': 50000, 'price_change_24h': 4.0, 'trend': 'bullish', 'volatility': 1.2,
+    'indicators': {'rsi_14': 72.0, 'price_vs_sma': 1.5}
+}
+
+
+def test_default_gate_separates_quiet_from_active_markets():
+    gate = SignalGate(audit_rate=0.0)
+    assert gate.evaluate(QUIET)[0] is False
+    assert gate.evaluate(ACTIVE)[0] is True
+    assert gate.get_stats()['escalation_rate'] == 0.5
+
+
+def test_scoring_takes_microseconds():
+    gate = SignalGate()
+    started = time.perf_counter()
+    for _ in range(10000):
+        gate.score(ACTIVE)
+    assert (time.perf_counter() - started) / 10000 < 50e-6
+
+
+def test_agreement_tracking():
+    gate = SignalGate(audit_rate=0.0)
+    gate.record_outcome(True, True)
+    gate.record_outcome(True, False)
+    gate.record_outcome(False, False)
+    gate.record_outcome(False, True)
+    stats = gate.get_stats()
+    assert stats['agreement'] == 0.5
+    assert stats['precision'] == 0.5
+    assert stats['recall'] == 0.5
+
+
+def test_fit_learns_from_journal(tmp_path):
+    rng = random.Random(7)
+    samples = []
+    for _ in range(400):
+        rsi = rng.uniform(20, 80)
+        snapshot = {
+            'trend': rng.choice(['bullish', 'bearish', 'neutral']),
+            'volatility': rng.uniform(0, 1.5),
+            'price_change_24h': rng.uniform(-5, 5),
+            'indicators': {'rsi_14': rsi, 'price_vs_sma': rng.uniform(-2, 2)}
+        }
+        # The "LLMs" here only trade on stretched RSI
+        samples.append((snapshot, abs(rsi - 50) > 20))
+
+    gate = SignalGate(audit_rate=0.0)
+    before = agreement_report(gate, samples)['agreement']
+    gate.fit(samples)
+    after = agreement_report(gate, samples)['agreement']
+    assert after > before
+    assert after > 0.85
+
+    gate.save(tmp_path / 'gate.json')
+    loaded = SignalGate.load(tmp_path / 'gate.json')
+    assert loaded.weights == gate.weights
@@ -0,0 +1,65 @@
+import time
+import numpy as np
+from src.state_store import StateStore
+
+
+def sample_state() -> dict:
+    return {
+        'saved_at': time.time(),
+        'bot_manager': {
+            'active_bots': {'BTCUSDT': 101, 'ETHUSDT': 102},
+            'applied_settings': {101: {'take_profit': 1.5, 'stop_loss_percentage': 1.0}}
+        },
+        'market_data': {
+            'cached_data': {'BTCUSDT': {'current_price': 50000.0, 'indicators': {'rsi_14': 55.2}}},
+            'last_update': time.time()
+        },
+        'ai_analyzer': {'analysis_cache': {}}
+    }
+
+
+def test_round_trip(tmp_path):
+    store = StateStore(tmp_path / 'state.bin')
+    state = sample_state()
+    assert store.save(state)
+    assert store.load() == state
+    assert not (tmp_path / 'state.bin.tmp').exists()
+
+
+def test_numpy_values_are_saved_as_builtins(tmp_path):
+    store = StateStore(tmp_path / 'state.bin')
+    assert store.save({'last_time': np.float64(1.5), 'count': np.int64(3),
+                       'cov': np.eye(2), 'pairs': ('BTCUSDT', np.float32(0.5))})
+    state = store.load()
+    assert state == {'last_time': 1.5, 'count': 3, 'cov': [[1.0, 0.0], [0.0, 1.0]],
+                     'pairs': ('BTCUSDT', 0.5)}
+    assert type(state['last_time']) is float and type(state['count']) is int
+
+    # Anything else is refused instead of written in a form that won't load back
+    assert not store.save({'when': object()})
+    assert store.load() == state
+
+
+def test_missing_or_corrupt_snapshot_is_ignored(tmp_path):
+    store = StateStore(tmp_path / 'state.bin')
+    assert store.load() is None
+
+    store.save(sample_state())
+    data = bytearray(store.path.read_bytes())
+    data[-1] ^= 0xFF
+    store.path.write_bytes(bytes(data))
+    assert store.load() is None
+
+
+def test_restore_is_fast(tmp_path):
+    store = StateStore(tmp_path / 'state.bin')
+    state = sample_state()
+    state['market_data']['cached_data'] = {
+        f'PAIR{i}USDT': {'current_price': float(i), 'indicators': {'rsi_14': 50.0}}
+        for i in range(500)
+    }
+    store.save(state)
+
+    started = time.perf_counter()
+    assert store.load() == state
+    assert time.perf_counter() - started < 0.05
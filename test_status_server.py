@@ -0,0 +1,74 @@
+import asyncio
+import json
+from src.status_server import StatusServer
+
+
+async def get(address, path, method='GET'):
+    host, port = address.rsplit(':', 1)
+    reader, writer = await asyncio.open_connection(host, int(port))
+    writer.write(f'{method} {path} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, body = response.split(b'\r\n\r\n', 1)
+    return int(head.split()[1]), body
+
+
+def make_server(refresh=60):
+    calls = []
+
+    def snapshot():
+        calls.append(1)
+        return {'pairs': {'BTCUSDT': {'price': 60000.0, 'decision': 'BUY'}},
+                'pnl': {'daily_pnl': 1.5}, 'cycle': len(calls)}
+
+    return StatusServer(snapshot, address='127.0.0.1:0', refresh=refresh), calls
+
+
+def test_concurrent_readers_share_one_snapshot():
+    server, calls = make_server()
+
+    async def run():
+        await server.start()
+        try:
+            responses = await asyncio.gather(*(get(server.address, '/status') for _ in range(50)))
+            section = await get(server.address, '/status/pairs')
+            missing = await get(server.address, '/status/nope')
+            write = await get(server.address, '/status', method='POST')
+            page = await get(server.address, '/')
+            return responses, section, missing, write, page
+        finally:
+            await server.stop()
+
+    responses, section, missing, write, page = asyncio.run(run())
+    assert {status for status, _ in responses} == {200}
+    assert json.loads(responses[0][1])['pnl']['daily_pnl'] == 1.5
+    # Built once for all readers within the refresh interval
+    assert len(calls) == 1 and server.requests == 54
+    assert section == (200, json.dumps({'BTCUSDT': {'price': 60000.0, 'decision': 'BUY'}}).encode())
+    assert missing[0] == 404 and write[0] == 405
+    assert page[0] == 200 and b'EventSource' in page[1]
+
+
+def test_events_stream_pushes_new_snapshots():
+    server, calls = make_server(refresh=0.02)
+
+    async def run():
+        await server.start()
+        host, port = server.address.rsplit(':', 1)
+        reader, writer = await asyncio.open_connection(host, int(port))
+        writer.write(b'GET /events HTTP/1.1\r\n\r\n')
+        await reader.readuntil(b'\r\n\r\n')
+        events = []
+        for _ in range(3):
+            line = await asyncio.wait_for(reader.readuntil(b'\n\n'), 2)
+            events.append(json.loads(line[len(b'data: '):]))
+        clients = server.clients
+        writer.close()
+        await server.stop()
+        return events, clients
+
+    events, clients = asyncio.run(run())
+    assert clients == 1
+    cycles = [event['cycle'] for event in events]
+    assert cycles == sorted(set(cycles))